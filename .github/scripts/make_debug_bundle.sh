@@ -41,6 +41,11 @@ cp -f "$RUN_DIR/assistant_feed.json"      "$FULL/assistant_feed.json"      || tr
 cp -f "$RUN_DIR/summary.md"               "$FULL/summary.md"               || true
 cp -f "$RUN_DIR/exports/selection_breakdown.json" "$FULL/selection_breakdown.json" || true
 cp -f "$RUN_DIR/exports/feedback_targets.json"   "$FULL/feedback_targets.json"   || true
+cp -f "$RUN_DIR/heartbeat.log"            "$FULL/heartbeat.log"            || true
+
+# span trace (ENGINE_TRACE), Chrome trace-event JSON; open in ui.perfetto.dev
+TRACE_FILE="${ENGINE_TRACE:-$RUN_DIR/trace.json}"
+cp -f "$TRACE_FILE"                       "$FULL/$(basename "$TRACE_FILE")" || true
 
 # copy inputs & caches
 cp -f data/user/ratings.csv               "$FULL/data/user/ratings.csv"    || true
@@ -0,0 +1 @@
+"""Benchmarks and local stand-ins used to measure the engine's hot paths."""
@@ -0,0 +1,33 @@
+# bench/_util.py
+from __future__ import annotations
+import math, shutil, tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from engine import cache_backend, tmdb
+
+@contextmanager
+def isolated_cache(kind: str = "files") -> Iterator[Path]:
+    """Point the process-wide cache store (and TMDB's memory tier) at a throwaway dir."""
+    tmp = Path(tempfile.mkdtemp(prefix="bench-cache-"))
+    prev = (cache_backend.CACHE_BACKEND, cache_backend.CACHE_ROOT)
+    cache_backend.configure(kind, tmp)
+    tmdb._mem.clear()
+    try:
+        yield tmp
+    finally:
+        cache_backend.close_all()
+        cache_backend.CACHE_BACKEND, cache_backend.CACHE_ROOT = prev
+        tmdb._mem.clear()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def exponent(points: List[Tuple[int, float]]) -> Optional[float]:
+    """Least-squares slope of log(y) against log(n): ~1 linear, ~2 quadratic."""
+    pts = [(math.log(n), math.log(t)) for n, t in points if n > 0 and t > 0]
+    if len(pts) < 2:
+        return None
+    mx = sum(x for x, _ in pts) / len(pts)
+    my = sum(y for _, y in pts) / len(pts)
+    den = sum((x - mx) ** 2 for x, _ in pts)
+    return round(sum((x - mx) * (y - my) for x, y in pts) / den, 3) if den else None
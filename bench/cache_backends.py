@@ -0,0 +1,102 @@
+# bench/cache_backends.py
+"""
+Per-file JSON cache vs. the single-file SQLite store.
+
+    python -m bench.cache_backends --entries 20000 --lookups 5000
+
+Writes --entries synthetic TMDB-detail-sized payloads into each backend, then
+times random-key lookups (hits and misses) the way a warm enrich pass does.
+Reports open/put/get latency percentiles, ops/s and the on-disk footprint
+(file count matters for actions/cache save/restore).
+"""
+from __future__ import annotations
+import argparse, json, os, random, time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from engine import cache_backend
+from ._util import isolated_cache
+
+def _payload(i: int) -> Dict[str, Any]:
+    return {
+        "id": i,
+        "title": f"Synthetic Title {i}",
+        "overview": "lorem ipsum dolor sit amet " * 20,
+        "genres": [{"id": g, "name": f"Genre {g}"} for g in range(i % 4 + 1)],
+        "credits": {"cast": [{"id": i * 10 + c, "name": f"Actor {c}", "character": f"Role {c}"} for c in range(12)]},
+        "keywords": {"keywords": [{"id": k, "name": f"kw{k}"} for k in range(15)]},
+        "vote_average": (i % 90) / 10.0,
+    }
+
+def _pct(xs: List[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p * (len(xs) - 1))))]
+
+def _footprint(root: Path) -> Dict[str, int]:
+    files = 0
+    size = 0
+    for dirpath, _, names in os.walk(root):
+        for n in names:
+            files += 1
+            size += os.path.getsize(os.path.join(dirpath, n))
+    return {"files": files, "bytes": size}
+
+def _run(kind: str, entries: int, lookups: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    with isolated_cache(kind) as root:
+        store = cache_backend.store()
+        put_ms: List[float] = []
+        t0 = time.perf_counter()
+        for i in range(entries):
+            t = time.perf_counter()
+            store.put("tmdb", f"k{i:08d}", _payload(i), ttl_s=14 * 86400)
+            put_ms.append((time.perf_counter() - t) * 1000.0)
+        put_wall = time.perf_counter() - t0
+
+        # reopen so lookups start from a cold handle, like a fresh run
+        cache_backend.configure(kind, root)
+        store = cache_backend.store()
+        keys = [f"k{rng.randrange(entries * 5 // 4):08d}" for _ in range(lookups)]  # ~20% misses
+        get_ms: List[float] = []
+        hits = 0
+        t0 = time.perf_counter()
+        for k in keys:
+            t = time.perf_counter()
+            if store.get("tmdb", k) is not None:
+                hits += 1
+            get_ms.append((time.perf_counter() - t) * 1000.0)
+        get_wall = time.perf_counter() - t0
+        cache_backend.close_all()
+        disk = _footprint(root)
+
+    return {
+        "backend": kind,
+        "entries": entries,
+        "put": {"wall_s": round(put_wall, 3), "ops_per_s": round(entries / put_wall, 1) if put_wall else None,
+                "p50_ms": round(_pct(put_ms, 0.50), 4), "p95_ms": round(_pct(put_ms, 0.95), 4)},
+        "get": {"lookups": lookups, "hits": hits, "wall_s": round(get_wall, 3),
+                "ops_per_s": round(lookups / get_wall, 1) if get_wall else None,
+                "p50_ms": round(_pct(get_ms, 0.50), 4), "p95_ms": round(_pct(get_ms, 0.95), 4)},
+        "disk": disk,
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entries", type=int, default=20000)
+    ap.add_argument("--lookups", type=int, default=5000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    files = _run("files", args.entries, args.lookups, args.seed)
+    sqlite = _run("sqlite", args.entries, args.lookups, args.seed)
+    print(json.dumps({
+        "files": files,
+        "sqlite": sqlite,
+        "get_speedup": round(sqlite["get"]["ops_per_s"] / files["get"]["ops_per_s"], 2)
+                       if files["get"]["ops_per_s"] and sqlite["get"]["ops_per_s"] else None,
+        "files_avoided": files["disk"]["files"] - sqlite["disk"]["files"],
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
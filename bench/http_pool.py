@@ -0,0 +1,62 @@
+# bench/http_pool.py
+"""
+Pooled keep-alive sessions vs. a bare requests.get per call.
+
+    python -m bench.http_pool --calls 300 --connect-delay-ms 20
+
+Every call is a TMDB cache miss (distinct ids, empty cache dir) served by the
+local stand-in, which sleeps --connect-delay-ms once per new connection to
+model the TCP+TLS handshake a real api.themoviedb.org call pays.
+"""
+from __future__ import annotations
+import argparse, json, time
+from typing import Any, Dict
+
+import requests
+
+from engine import sessions, tmdb
+from ._util import isolated_cache
+from .tmdb_stub import StubServer
+
+def _run(mode: str, calls: int, connect_delay_ms: float) -> Dict[str, Any]:
+    orig_get, orig_base = sessions.get, tmdb._TMDb_V3
+    sessions.close_all()
+    with StubServer(connect_delay_ms=connect_delay_ms) as srv, isolated_cache():
+        tmdb._TMDb_V3 = srv.base_url
+        if mode == "bare":
+            sessions.get = lambda url, **kw: requests.get(url, **kw)
+        try:
+            t0 = time.perf_counter()
+            for i in range(1, calls + 1):
+                tmdb.get_details("movie", i)
+            wall = time.perf_counter() - t0
+        finally:
+            sessions.get, tmdb._TMDb_V3 = orig_get, orig_base
+            sessions.close_all()
+        return {
+            "mode": mode,
+            "calls": calls,
+            "wall_s": round(wall, 3),
+            "ms_per_call": round(wall * 1000.0 / max(1, calls), 3),
+            "server_connections": srv.state.connections,
+            "server_requests": srv.state.requests,
+        }
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=300)
+    ap.add_argument("--connect-delay-ms", type=float, default=20.0)
+    args = ap.parse_args()
+    bare = _run("bare", args.calls, args.connect_delay_ms)
+    pooled = _run("pooled", args.calls, args.connect_delay_ms)
+    saved = bare["wall_s"] - pooled["wall_s"]
+    print(json.dumps({
+        "bare": bare,
+        "pooled": pooled,
+        "handshakes_avoided": bare["server_connections"] - pooled["server_connections"],
+        "wall_saved_s": round(saved, 3),
+        "speedup": round(bare["wall_s"] / pooled["wall_s"], 2) if pooled["wall_s"] else None,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# bench/micro.py
+"""
+Micro-benchmarks for the engine's hot pure-Python functions.
+
+    python -m bench.micro --sizes 1000,10000,100000 --out micro.json
+    python -m bench.micro --only norm_title --baseline micro-main.json
+
+Each case runs at each input size n (items, titles, rows or seen pairs, see
+"n" in the report) on deterministic bench.synth inputs built before the clock
+starts. Reported per size: best and median seconds per call over repeated
+calls (GC off while timing, like timeit), items/s and calls/s, and the peak
+and retained traced allocation of one extra call under tracemalloc. Per
+case, "exponent" is the least-squares slope of log(time) against log(n):
+~1 is linear, ~2 quadratic. Cases whose cost grows with the product of two
+inputs cap n (max_n) and say so instead of running for hours.
+
+The JSON is stable across runs of the same commit (sizes, seeds, case
+names), so two reports diff cleanly; --baseline adds each case's time ratio
+against an earlier report. A case whose module fails to import is reported
+with its error rather than aborting the suite.
+"""
+from __future__ import annotations
+import argparse, gc, importlib, json, os, platform, re, shutil, statistics, subprocess, sys, tempfile, time
+import tracemalloc
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import synth
+from ._util import exponent
+
+_TMP = Path(tempfile.mkdtemp(prefix="bench-micro-"))
+SEEN_ROWS = 1500        # ratings rows behind every seen index
+SEEN_UNIVERSE = 5000    # ids the ratings rows are drawn from
+FUZZY_SEEN_ROWS = 500   # seen_index.filter_unseen fuzzy-matches every item against every pair
+
+# ---------- inputs (built once per size, outside the timed region) ----------
+
+@lru_cache(maxsize=None)
+def _pool(n: int) -> List[Dict[str, Any]]:
+    return synth.pool_items(n)
+
+@lru_cache(maxsize=None)
+def _enriched(n: int) -> List[Dict[str, Any]]:
+    return synth.enriched_items(n)
+
+@lru_cache(maxsize=None)
+def _titles(n: int) -> List[str]:
+    # the shapes normalizers meet: articles, punctuation, sequels, parentheses, accents
+    deco = ["{}", "The {}", "{}: Part II", "{} (2019)", "{} & Friends", "Café {}", "{}!", "{} - Director's Cut"]
+    return [deco[i % len(deco)].format(it["title"]) for i, it in enumerate(_pool(n))]
+
+@lru_cache(maxsize=None)
+def _ratings_csv(rows: int) -> Path:
+    path = _TMP / f"ratings-{rows}.csv"
+    synth.write_ratings_csv(path, rows, universe=SEEN_UNIVERSE)
+    return path
+
+@lru_cache(maxsize=None)
+def _pool_file(n: int) -> Path:
+    path = _TMP / f"pool-{n}.jsonl"
+    synth.write_pool(path, n)
+    return path
+
+def _model() -> Dict[str, Any]:
+    from engine import profile
+    return profile.build_user_model(_ratings_csv(SEEN_ROWS), _TMP / "exports")
+
+# ---------- cases: setup(n) -> zero-arg callable ----------
+
+def _matches_seen_by_title(n: int) -> Callable[[], Any]:
+    from engine import seen_index
+    pairs = [(seen_index._norm_title(t), 2000 + i % 25) for i, t in enumerate(_titles(n))]
+    # a miss walks every pair, which is what most pool titles do
+    return lambda: seen_index._matches_seen_by_title("Nothing Like It At All", 2021, pairs)
+
+def _seen_index_filter_unseen(n: int) -> Callable[[], Any]:
+    from engine import seen_index
+    ids, titles = seen_index._parse_csv_seen(str(_ratings_csv(FUZZY_SEEN_ROWS)))
+    idx = seen_index._build_index(ids, titles)
+    pool = _pool(n)
+    return lambda: seen_index.filter_unseen(pool, idx)
+
+def _filtering_filter_seen(n: int) -> Callable[[], Any]:
+    from engine import filtering
+    idx = filtering.build_seen_index(_ratings_csv(SEEN_ROWS))
+    pool = _pool(n)
+    return lambda: filtering.filter_seen(pool, idx)
+
+def _exclusions_filter_unseen(n: int) -> Callable[[], Any]:
+    from engine import exclusions
+    idx = exclusions.load_seen_index(_ratings_csv(SEEN_ROWS))
+    pool = _pool(n)
+    return lambda: exclusions.filter_unseen(pool, idx)
+
+def _normalizer(mod: str, attr: str) -> Callable[[int], Callable[[], Any]]:
+    def setup(n: int) -> Callable[[], Any]:
+        fn: Any = importlib.import_module(f"engine.{mod}")
+        for part in attr.split("."):
+            fn = getattr(fn, part)
+        titles = _titles(n)
+        return lambda: [fn(t) for t in titles]
+    return setup
+
+def _score_items(n: int) -> Callable[[], Any]:
+    from engine import scoring
+    items, model = _enriched(n), _model()
+    return lambda: scoring.score_items(items, model, {})
+
+def _rank_candidates(n: int) -> Callable[[], Any]:
+    from engine import rank
+    items = _enriched(n)
+    weights = {"audience_weight": 0.65, "critic_weight": 0.35, "novelty_weight": 0.15, "commitment_cost_scale": 1.0}
+    taste = {g: 0.5 + (i % 7) / 14.0 for i, (_, g) in enumerate(synth.GENRES)}
+    return lambda: rank.rank_candidates(items, weights, taste)
+
+def _apply_personalization(n: int) -> Callable[[], Any]:
+    from engine import personalize
+    items = _enriched(n)
+    taste = {"genre_weights": {g: 0.3 + (i % 5) / 10.0 for i, (_, g) in enumerate(synth.GENRES)}}
+    return lambda: personalize.apply_personalization({}, items, taste=taste)
+
+def _build_user_model(n: int) -> Callable[[], Any]:
+    from engine import profile
+    path, out = _ratings_csv(n), _TMP / "exports"
+    return lambda: profile.build_user_model(path, out)
+
+def _read_lines_json(n: int) -> Callable[[], Any]:
+    from engine import catalog_builder
+    path = _pool_file(n)
+    return lambda: catalog_builder._read_lines_json(path)
+
+def _load_pool(n: int) -> Callable[[], Any]:
+    from engine import pool
+    path = _pool_file(n)
+    def call() -> Any:
+        prev, pool.POOL_FILE = pool.POOL_FILE, path
+        try:
+            return pool.load_pool()
+        finally:
+            pool.POOL_FILE = prev
+    return call
+
+# (name, what n counts, max_n or None, setup)
+CASES: List[Tuple[str, str, Optional[int], Callable[[int], Callable[[], Any]]]] = [
+    ("seen_index._matches_seen_by_title", "seen pairs scanned per lookup", None, _matches_seen_by_title),
+    ("seen_index.filter_unseen", f"pool items vs {FUZZY_SEEN_ROWS} seen pairs", 10000, _seen_index_filter_unseen),
+    ("filtering.filter_seen", "pool items", None, _filtering_filter_seen),
+    ("exclusions.filter_unseen", "pool items", None, _exclusions_filter_unseen),
+    ("filtering._norm_title", "titles", None, _normalizer("filtering", "_norm_title")),
+    ("exclusions._norm_title", "titles", None, _normalizer("exclusions", "_norm_title")),
+    ("seen_index._norm_title", "titles", None, _normalizer("seen_index", "_norm_title")),
+    ("imdb_public._norm_title", "titles", None, _normalizer("imdb_public", "_norm_title")),
+    ("imdb_sync._norm_title", "titles", None, _normalizer("imdb_sync", "_norm_title")),
+    ("imdb_datasets.IMDbIndex._norm_title", "titles", None, _normalizer("imdb_datasets", "IMDbIndex._norm_title")),
+    ("scoring._norm", "titles", None, _normalizer("scoring", "_norm")),
+    ("profile._norm", "titles", None, _normalizer("profile", "_norm")),
+    ("utils.normalize_title", "titles", None, _normalizer("utils", "normalize_title")),
+    ("util.normalize_title", "titles", None, _normalizer("util", "normalize_title")),
+    ("util.text.normalize_title", "titles", None, _normalizer("util.text", "normalize_title")),
+    ("scoring.score_items", "enriched items", None, _score_items),
+    ("rank.rank_candidates", "enriched items", None, _rank_candidates),
+    ("personalize.apply_personalization", "enriched items", None, _apply_personalization),
+    ("profile.build_user_model", "ratings rows", None, _build_user_model),
+    ("catalog_builder._read_lines_json", "pool.jsonl lines", None, _read_lines_json),
+    ("pool.load_pool", "pool.jsonl lines", None, _load_pool),
+]
+
+# ---------- measurement ----------
+
+def _time(fn: Callable[[], Any], budget_s: float, min_reps: int, max_reps: int) -> List[float]:
+    times: List[float] = []
+    while len(times) < min_reps or (sum(times) < budget_s and len(times) < max_reps):
+        gc_was = gc.isenabled()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        finally:
+            if gc_was:
+                gc.enable()
+        if times[0] > budget_s:  # one call already spends the budget
+            break
+    return times
+
+def _allocs(fn: Callable[[], Any]) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        out = fn()
+        cur, peak = tracemalloc.get_traced_memory()
+        del out
+    finally:
+        tracemalloc.stop()
+    return {"alloc_peak_kb": round((peak - base) / 1024, 1), "alloc_retained_kb": round((cur - base) / 1024, 1)}
+
+def run_case(name: str, unit: str, max_n: Optional[int], setup: Callable[[int], Callable[[], Any]],
+             sizes: List[int], *, budget_s: float, min_reps: int, max_reps: int, allocs: bool) -> Dict[str, Any]:
+    res: Dict[str, Any] = {"n": unit, "runs": []}
+    for n in sizes:
+        if max_n is not None and n > max_n:
+            res.setdefault("skipped", []).append(n)
+            continue
+        try:
+            fn = setup(n)
+            fn()  # warm-up: imports, regex compiles, lazy caches
+        except Exception as e:
+            res["error"] = f"{type(e).__name__}: {e}"
+            break
+        times = _time(fn, budget_s, min_reps, max_reps)
+        best = min(times)
+        run: Dict[str, Any] = {
+            "size": n, "reps": len(times), "best_s": round(best, 6), "median_s": round(statistics.median(times), 6),
+            "calls_per_s": round(1.0 / best, 2) if best else None,
+            "items_per_s": round(n / best, 1) if best else None,
+        }
+        if allocs:
+            run.update(_allocs(fn))
+        res["runs"].append(run)
+        print(f"  {name:<38} n={n:<7} best={best * 1000:10.3f} ms  {run['items_per_s'] or 0:>14,.0f} items/s",
+              file=sys.stderr)
+    res["exponent"] = exponent([(r["size"], r["best_s"]) for r in res["runs"]])
+    return res
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent.parent, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+def _compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """ratio = this / baseline best time at the same size; < 1 is faster."""
+    for name, res in report["cases"].items():
+        old = {r["size"]: r["best_s"] for r in (baseline.get("cases", {}).get(name) or {}).get("runs", [])}
+        for r in res.get("runs", []):
+            if old.get(r["size"]):
+                r["vs_baseline"] = round(r["best_s"] / old[r["size"]], 3)
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Micro-benchmarks for the engine's hot functions")
+    ap.add_argument("--sizes", default="1000,10000,100000", help="comma-separated input sizes")
+    ap.add_argument("--only", default=None, help="regex; run only cases whose name matches")
+    ap.add_argument("--budget-s", type=float, default=1.0, help="timing budget per case and size")
+    ap.add_argument("--min-reps", type=int, default=3)
+    ap.add_argument("--max-reps", type=int, default=200)
+    ap.add_argument("--no-allocs", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--baseline", default=None, help="earlier report to compare against")
+    ap.add_argument("--out", default=None, help="also write the report here")
+    args = ap.parse_args()
+
+    sizes = sorted({int(x) for x in args.sizes.split(",") if x.strip()})
+    rx = re.compile(args.only) if args.only else None
+    report: Dict[str, Any] = {
+        "meta": {"commit": _commit(), "python": platform.python_version(), "platform": platform.platform(),
+                 "sizes": sizes, "seen_rows": SEEN_ROWS, "budget_s": args.budget_s},
+        "cases": {},
+    }
+    cwd = os.getcwd()
+    os.chdir(_TMP)  # engine modules that touch data/ at import do it in the scratch dir
+    try:
+        for name, unit, max_n, setup in CASES:
+            if rx is not None and not rx.search(name):
+                continue
+            report["cases"][name] = run_case(name, unit, max_n, setup, sizes, budget_s=args.budget_s,
+                                             min_reps=args.min_reps, max_reps=args.max_reps,
+                                             allocs=not args.no_allocs)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(_TMP, ignore_errors=True)
+    if args.baseline:
+        _compare(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    print(text)
+
+if __name__ == "__main__":
+    main()
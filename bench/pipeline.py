@@ -0,0 +1,129 @@
+# bench/pipeline.py
+"""
+End-to-end engine.runner throughput against the local TMDB stand-in.
+
+    python -m bench.pipeline --pools 1000,20000,100000 --latency-ms 30 --rate-limit-rps 50
+
+For each pool size a scratch working directory gets a synthetic
+data/cache/pool/pool.jsonl and data/user/ratings.csv (bench.synth), then
+engine.runner.main() runs in a fresh subprocess with TMDB pointed at the
+stand-in (served from this process, so its CPU is not billed to the engine).
+Per runner stage the report has wall and CPU seconds, requests and
+requests/s, and peak RSS (plus how much the stage raised it), read from
+diag.json["stages"] (engine.stages) -- the same stage boundaries bench.stress
+and the nightly perf history use. total.unstaged_wall_s is the runner time
+spent outside any recorded stage.
+"""
+from __future__ import annotations
+import argparse, json, os, shutil, subprocess, sys, tempfile, time
+from pathlib import Path
+from typing import Any, Dict, List
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None  # type: ignore[assignment]
+
+from . import synth
+from .tmdb_stub import StubServer
+
+REPO = Path(__file__).resolve().parent.parent
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 1)
+
+def _stage_rows(diag: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    keep = ("calls", "wall_s", "cpu_s", "http_requests", "peak_rss_mb", "peak_rss_delta_mb")
+    rows = {}
+    for name, st in ((diag.get("stages") or {}).get("stages") or {}).items():
+        row = {k: st.get(k) for k in keep}
+        wall = row.get("wall_s") or 0.0
+        row["req_per_s"] = round((row.get("http_requests") or 0) / wall, 1) if wall else 0.0
+        rows[name] = row
+    return rows
+
+def _worker(base_url: str, out: Path) -> None:
+    """Runs inside the scratch dir: run the runner against the stand-in, dump its stage metrics."""
+    from engine import runner, tmdb
+    tmdb._TMDb_V3 = base_url
+    w0, c0 = time.perf_counter(), time.process_time()
+    runner.main()
+    # runner.main() closes the sessions (and their counters) on the way out; diag.json keeps them
+    diag = json.loads((runner.LATEST / "diag.json").read_text(encoding="utf-8"))
+    stages = _stage_rows(diag)
+    wall = time.perf_counter() - w0
+    total = {"wall_s": round(wall, 3), "cpu_s": round(time.process_time() - c0, 3),
+             "requests": sum(v.get("requests", 0) for v in (diag.get("http") or {}).values()),
+             "peak_rss_mb": _peak_rss_mb(),
+             "unstaged_wall_s": round(max(0.0, wall - sum(st["wall_s"] or 0.0 for st in stages.values())), 3)}
+    total["req_per_s"] = round(total["requests"] / wall, 1) if wall else 0.0
+    out.write_text(json.dumps({"stages": stages, "total": total}, indent=2), encoding="utf-8")
+
+def _run_pool(n: int, srv: StubServer, *, ratings: int, env: Dict[str, str], keep: bool) -> Dict[str, Any]:
+    work = Path(tempfile.mkdtemp(prefix=f"bench-pipeline-{n}-"))
+    try:
+        synth.write_pool(work / "data/cache/pool/pool.jsonl", n)
+        synth.write_ratings_csv(work / "data/user/ratings.csv", ratings, universe=max(1, n // 2))
+        out = work / "metrics.json"
+        before = srv.state.snapshot()
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.pipeline", "--worker", "--base-url", srv.base_url, "--out", str(out)],
+            cwd=work, env={**os.environ, "PYTHONPATH": str(REPO), "TMDB_API_KEY": "bench",
+                           "POOL_MAX_ITEMS": str(max(n, 1)), "CACHE_ROOT": str(work / "data/cache"), **env},
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0 or not out.exists():
+            return {"pool": n, "error": (proc.stderr or "")[-2000:]}
+        after = srv.state.snapshot()
+        res = json.loads(out.read_text(encoding="utf-8"))
+        res["pool"] = n
+        res["server"] = {k: after[k] - before[k] for k in after}
+        if keep:
+            res["workdir"] = str(work)
+        return res
+    finally:
+        if not keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pools", default="1000,20000,100000", help="comma-separated pool sizes")
+    ap.add_argument("--ratings", type=int, default=800, help="rows in the synthetic ratings.csv")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--rate-limit-rps", type=float, default=0.0, help="stand-in 429 threshold; 0 disables")
+    ap.add_argument("--enrich-top-n", type=int, default=None, help="ENRICH_SCORING_TOP_N for the run")
+    ap.add_argument("--workers", type=int, default=None, help="ENRICH_WORKERS for the run")
+    ap.add_argument("--keep", action="store_true", help="keep the scratch working directories")
+    ap.add_argument("--out", default=None, help="also write the report here")
+    ap.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--base-url", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        _worker(args.base_url, Path(args.out))
+        return
+
+    pools: List[int] = [int(x) for x in args.pools.split(",") if x.strip()]
+    env: Dict[str, str] = {}
+    if args.enrich_top_n is not None:
+        env["ENRICH_SCORING_TOP_N"] = str(args.enrich_top_n)
+    if args.workers is not None:
+        env["ENRICH_WORKERS"] = str(args.workers)
+    with StubServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit_rps=args.rate_limit_rps,
+                    catalog_size=max(pools) if pools else 1000) as srv:
+        runs = [_run_pool(n, srv, ratings=args.ratings, env=env, keep=args.keep) for n in pools]
+    report = {
+        "stub": {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "rate_limit_rps": args.rate_limit_rps},
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    print(text)
+
+if __name__ == "__main__":
+    main()
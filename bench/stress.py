@@ -0,0 +1,165 @@
+# bench/stress.py
+"""
+Scale test: the offline pipeline over synthetic catalogs of growing size.
+
+    python -m bench.stress --sizes 10000,100000,1000000 --ratings 50000 --out stress.json
+
+For each size n a scratch working directory gets a bench.synth catalog of n
+titles as data/cache/pool/pool.jsonl, an IMDb-export ratings.csv, and a TMDB
+cache pre-seeded with the hydrated payload of every title enrichment will
+ask for (ENRICH_SCORING_TOP_N, --enrich-top-n; 0 = all n, so filter and
+score see the whole catalog). engine.runner then runs in a fresh subprocess
+with ENGINE_OFFLINE=1 and POOL_MAX_ITEMS=n: no network, every TMDB answer
+from the seeded cache, so the numbers are the engine's own CPU, I/O and
+memory.
+
+Per size the report has each runner stage's wall and CPU seconds, items in
+and out, peak RSS and how much the stage raised it, straight from
+diag.json["stages"] (engine.stages), plus the time spent generating inputs.
+"curves" lines the sizes up per stage and fits log-log slopes of wall time
+and peak RSS against n (~1 linear, ~2 quadratic). Catalog shape flags
+(--tv-share, --genre-skew, --people, --cast-skew, --title-collisions) are
+bench.synth's. Setup dominates at 1M titles (several minutes of payload
+generation); --enrich-top-n bounds it.
+"""
+from __future__ import annotations
+import argparse, json, os, shutil, subprocess, sys, tempfile, time
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Any, Dict, List
+
+from . import synth
+from ._util import exponent
+
+REPO = Path(__file__).resolve().parent.parent
+
+def _seed_cache(root: Path, backend: str, spec: synth.CatalogSpec, n: int) -> int:
+    """Store the hydrated TMDB payload of titles 0..n-1 where get_title_bundle will look for it."""
+    from engine import cache_backend, tmdb
+    store = cache_backend.open_backend(backend, root)
+    now = time.time()
+    project = "title" if tmdb.TMDB_PROJECT else None
+    meta = {"proj": tmdb._proj_tag(project)} if project else None
+    try:
+        for i in range(n):
+            url, params, ttl_s = tmdb.title_request(synth.catalog_kind(spec, i), i + 1, hydrate=True)
+            data = synth.catalog_payload(spec, i)
+            if project:
+                data = tmdb._PROJECTIONS[project](data)
+            store.put(tmdb._NS, tmdb._cache_key(url, tmdb._with_key(params), project), data,
+                      fetched_at=now, ttl_s=ttl_s, meta=meta)
+    finally:
+        store.close()
+    return n
+
+def _stage_rows(diag: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    keep = ("calls", "wall_s", "cpu_s", "items_in", "items_out", "peak_rss_mb", "peak_rss_delta_mb")
+    return {name: {k: st.get(k) for k in keep}
+            for name, st in ((diag.get("stages") or {}).get("stages") or {}).items()}
+
+def _run_size(spec: synth.CatalogSpec, *, ratings: int, in_catalog: float, enrich_top_n: int, backend: str,
+              env: Dict[str, str], keep: bool) -> Dict[str, Any]:
+    n = spec.n
+    work = Path(tempfile.mkdtemp(prefix=f"bench-stress-{n}-"))
+    cache_root = work / "data/cache"
+    try:
+        setup: Dict[str, float] = {}
+        t0 = time.perf_counter()
+        synth.write_catalog_pool(cache_root / "pool/pool.jsonl", spec)
+        setup["pool_s"] = round(time.perf_counter() - t0, 2)
+        t0 = time.perf_counter()
+        synth.write_catalog_ratings(work / "data/user/ratings.csv", spec, ratings, in_catalog=in_catalog)
+        setup["ratings_s"] = round(time.perf_counter() - t0, 2)
+        t0 = time.perf_counter()
+        seeded = _seed_cache(cache_root, backend, spec, n if enrich_top_n <= 0 else min(n, enrich_top_n))
+        setup["cache_s"] = round(time.perf_counter() - t0, 2)
+
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-m", "engine.runner"], cwd=work,
+            env={**os.environ, "PYTHONPATH": str(REPO), "ENGINE_OFFLINE": "1", "CACHE_BACKEND": backend,
+                 "CACHE_ROOT": str(cache_root), "POOL_MAX_ITEMS": str(max(n, 1)),
+                 "ENRICH_SCORING_TOP_N": str(enrich_top_n), "PERF_HISTORY": "", **env},
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        wall = time.perf_counter() - t0
+        diag_path = work / "data/out/latest/diag.json"
+        if proc.returncode != 0 or not diag_path.exists():
+            return {"n": n, "setup": setup, "error": (proc.stderr or "")[-2000:]}
+        diag = json.loads(diag_path.read_text(encoding="utf-8"))
+        stages = _stage_rows(diag)
+        res: Dict[str, Any] = {
+            "n": n,
+            "setup": setup,
+            "inputs": {"pool_mb": round((cache_root / "pool/pool.jsonl").stat().st_size / 1e6, 1),
+                       "ratings_rows": ratings, "seeded_titles": seeded},
+            "wall_s": round(wall, 3),
+            "peak_rss_mb": max((st.get("peak_rss_mb") or 0.0 for st in stages.values()), default=0.0),
+            "stages": stages,
+            "counts": diag.get("counts") or {},
+            "offline": diag.get("offline") or {},
+        }
+        if keep:
+            res["workdir"] = str(work)
+        return res
+    finally:
+        if not keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+def _curves(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    ok = [r for r in runs if "stages" in r]
+    names = list(dict.fromkeys(name for r in ok for name in r["stages"]))
+    out: Dict[str, Dict[str, Any]] = {}
+    for name in names + ["total"]:
+        pts = [(r["n"], r["stages"][name] if name != "total" else {"wall_s": r["wall_s"], "peak_rss_mb": r["peak_rss_mb"]})
+               for r in ok if name == "total" or name in r["stages"]]
+        out[name] = {
+            "n": [n for n, _ in pts],
+            "wall_s": [st.get("wall_s") for _, st in pts],
+            "peak_rss_mb": [st.get("peak_rss_mb") for _, st in pts],
+            "time_exponent": exponent([(n, st.get("wall_s") or 0.0) for n, st in pts]),
+            "rss_exponent": exponent([(n, st.get("peak_rss_mb") or 0.0) for n, st in pts]),
+        }
+        if name != "total":
+            out[name]["peak_rss_delta_mb"] = [st.get("peak_rss_delta_mb") for _, st in pts]
+    return out
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Offline pipeline over synthetic catalogs of growing size")
+    ap.add_argument("--sizes", default="10000,100000", help="comma-separated catalog sizes")
+    ap.add_argument("--ratings", type=int, default=50000, help="rows in the synthetic ratings.csv")
+    ap.add_argument("--in-catalog", type=float, default=0.8, help="share of rated titles that are in the catalog")
+    ap.add_argument("--enrich-top-n", type=int, default=0, help="ENRICH_SCORING_TOP_N for the run; 0 enriches all")
+    ap.add_argument("--workers", type=int, default=None, help="ENRICH_WORKERS for the run")
+    ap.add_argument("--backend", default="sqlite", choices=["sqlite", "files"], help="CACHE_BACKEND to seed and run on")
+    ap.add_argument("--keep", action="store_true", help="keep the scratch working directories")
+    ap.add_argument("--out", default=None, help="also write the report here")
+    synth.add_catalog_args(ap)
+    args = ap.parse_args()
+
+    sizes: List[int] = [int(x) for x in args.sizes.split(",") if x.strip()]
+    base = synth.catalog_spec(args, sizes[0] if sizes else 0)
+    env: Dict[str, str] = {}
+    if args.workers is not None:
+        env["ENRICH_WORKERS"] = str(args.workers)
+    runs = []
+    for n in sizes:
+        runs.append(_run_size(replace(base, n=n), ratings=args.ratings, in_catalog=args.in_catalog,
+                              enrich_top_n=args.enrich_top_n, backend=args.backend, env=env, keep=args.keep))
+        print(f"[stress] n={n}: {runs[-1].get('wall_s', 'error')}s, peak RSS {runs[-1].get('peak_rss_mb')} MB",
+              file=sys.stderr)
+    spec = {k: v for k, v in asdict(base).items() if k != "n"}
+    report = {
+        "spec": spec,
+        "ratings": args.ratings,
+        "enrich_top_n": args.enrich_top_n,
+        "backend": args.backend,
+        "runs": runs,
+        "curves": _curves(runs),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    print(text)
+
+if __name__ == "__main__":
+    main()
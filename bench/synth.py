@@ -0,0 +1,454 @@
+# bench/synth.py
+"""
+Deterministic synthetic TMDB titles for the benchmarks.
+
+Every (kind, tmdb_id) maps to the same title, credits, keywords and
+providers on every call, so the local TMDB stand-in, the pool seeding and
+the ratings fixtures all agree with each other without sharing state.
+IMDb ids encode the title: tt1nnnnnnn for movies, tt2nnnnnnn for tv.
+
+CatalogSpec describes a large catalog (100k-1M titles) with controllable
+tv/movie mix, genre and casting skew (Zipf), cast overlap and title
+collisions; its titles are likewise pure functions of (spec, index).
+
+    python -m bench.synth --n 1000000 --ratings 50000 --enriched 100000 --out-dir data/synth
+
+writes pool.jsonl, items.enriched.json and an IMDb-export ratings.csv;
+bench.stress runs the offline pipeline over such catalogs.
+"""
+from __future__ import annotations
+import argparse, csv, hashlib, itertools, json, random
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+GENRES = [(28, "Action"), (12, "Adventure"), (16, "Animation"), (35, "Comedy"), (80, "Crime"),
+          (99, "Documentary"), (18, "Drama"), (10751, "Family"), (14, "Fantasy"), (36, "History"),
+          (27, "Horror"), (9648, "Mystery"), (10749, "Romance"), (878, "Science Fiction"),
+          (53, "Thriller"), (10752, "War"), (37, "Western")]
+LANGS = ["en"] * 8 + ["fr", "es", "ja", "ko", "de"]
+PROVIDERS = ["Netflix", "Max", "Hulu", "Disney Plus", "Apple TV Plus", "Paramount Plus",
+             "Peacock", "Amazon Prime Video", "Starz", "Showtime", "Tubi", "Pluto TV"]
+NETWORKS = ["HBO", "AMC", "FX", "BBC One", "Netflix", "Hulu", "NBC", "Showtime"]
+_WORDS = ("shadow river night glass empire last silent winter broken golden city house storm "
+          "garden signal dark orchard paper hollow iron crown lake ghost summer fire harbor").split()
+PEOPLE = 20000   # size of the synthetic cast/crew population
+KEYWORDS = 3000
+
+def _rng(*parts: Any) -> random.Random:
+    seed = hashlib.sha1(":".join(str(p) for p in parts).encode("utf-8")).digest()[:8]
+    return random.Random(int.from_bytes(seed, "big"))
+
+def imdb_id(kind: str, tmdb_id: int) -> str:
+    return f"tt{1 if kind == 'movie' else 2}{int(tmdb_id):07d}"
+
+def from_imdb_id(tconst: str) -> Optional[Tuple[str, int]]:
+    if len(tconst or "") != 10 or not tconst.startswith("tt") or not tconst[2:].isdigit():
+        return None
+    return ("movie" if tconst[2] == "1" else "tv"), int(tconst[3:])
+
+def person(i: int) -> str:
+    r = _rng("person", i)
+    return f"{r.choice(_WORDS).title()} {r.choice(_WORDS).title()}{i % 97}"
+
+def title_name(kind: str, tmdb_id: int) -> str:
+    r = _rng("name", kind, tmdb_id)
+    words = [r.choice(_WORDS) for _ in range(r.randint(1, 4))]
+    return " ".join(w.title() for w in words) + f" {tmdb_id}"
+
+def basic(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    """A list/search result entry."""
+    r = _rng("basic", kind, tmdb_id)
+    date = f"{r.randint(1960, 2025)}-{r.randint(1, 12):02d}-{r.randint(1, 28):02d}"
+    name = title_name(kind, tmdb_id)
+    out: Dict[str, Any] = {
+        "id": tmdb_id,
+        "media_type": kind,
+        "original_language": r.choice(LANGS),
+        "popularity": round(r.paretovariate(1.5) * 5.0, 3),
+        "vote_average": round(min(10.0, max(1.0, r.gauss(6.6, 1.1))), 1),
+        "vote_count": int(r.paretovariate(1.2) * 40),
+        "genre_ids": [g for g, _ in r.sample(GENRES, r.randint(1, 3))],
+        "overview": " ".join(r.choice(_WORDS) for _ in range(r.randint(25, 60))),
+        "poster_path": f"/{hashlib.md5(name.encode()).hexdigest()[:24]}.jpg",
+        "backdrop_path": f"/{hashlib.md5(name[::-1].encode()).hexdigest()[:24]}.jpg",
+    }
+    if kind == "movie":
+        out.update({"title": name, "original_title": name, "release_date": date})
+    else:
+        out.update({"name": name, "original_name": name, "first_air_date": date})
+    return out
+
+def details(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    b = basic(kind, tmdb_id)
+    r = _rng("details", kind, tmdb_id)
+    ids = dict(GENRES)
+    out = {k: v for k, v in b.items() if k not in {"genre_ids", "media_type"}}
+    out["genres"] = [{"id": g, "name": ids[g]} for g in b["genre_ids"]]
+    out["production_companies"] = [{"id": r.randint(1, 9000), "name": f"{r.choice(_WORDS).title()} Pictures",
+                                    "logo_path": None, "origin_country": "US"} for _ in range(r.randint(1, 4))]
+    out["spoken_languages"] = [{"iso_639_1": b["original_language"], "name": b["original_language"]}]
+    out["status"] = "Released"
+    out["tagline"] = " ".join(r.choice(_WORDS) for _ in range(6))
+    if kind == "movie":
+        out.update({"runtime": r.randint(78, 175), "budget": r.randint(0, 2 * 10**8), "revenue": r.randint(0, 10**9)})
+    else:
+        seasons = r.randint(1, 12)
+        out.update({
+            "number_of_seasons": seasons,
+            "number_of_episodes": seasons * r.randint(6, 22),
+            "episode_run_time": [r.choice([22, 30, 45, 55, 60])],
+            "last_air_date": f"{min(2025, int(b['first_air_date'][:4]) + seasons)}-06-01",
+            "networks": [{"id": r.randint(1, 500), "name": r.choice(NETWORKS)}],
+            "seasons": [{"season_number": s, "episode_count": r.randint(6, 22), "overview": "", "air_date": None}
+                        for s in range(1, seasons + 1)],
+        })
+    return out
+
+def credits(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    # long-running series carry big credits payloads, like the real thing
+    r = _rng("credits", kind, tmdb_id)
+    scale = 1 if kind == "movie" else r.randint(1, 6)
+    cast = [{"id": p, "name": person(p), "character": f"{r.choice(_WORDS).title()}", "order": i,
+             "credit_id": f"{p:024x}", "profile_path": None, "known_for_department": "Acting"}
+            for i, p in enumerate(r.sample(range(PEOPLE), min(PEOPLE, r.randint(15, 40) * scale)))]
+    jobs = [("Directing", "Director"), ("Writing", "Screenplay"), ("Writing", "Writer"), ("Writing", "Story"),
+            ("Production", "Producer"), ("Sound", "Original Music Composer"), ("Camera", "Director of Photography"),
+            ("Editing", "Editor"), ("Art", "Production Design"), ("Costume & Make-Up", "Costume Design")]
+    crew = []
+    for p in r.sample(range(PEOPLE), min(PEOPLE, r.randint(20, 80) * scale)):
+        dept, job = r.choice(jobs)
+        crew.append({"id": p, "name": person(p), "department": dept, "job": job,
+                     "credit_id": f"{p:024x}", "profile_path": None})
+    return {"id": tmdb_id, "cast": cast, "crew": crew}
+
+def keywords(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    r = _rng("keywords", kind, tmdb_id)
+    ks = [{"id": k, "name": f"{_WORDS[k % len(_WORDS)]} {k}"} for k in r.sample(range(KEYWORDS), r.randint(3, 25))]
+    return {"id": tmdb_id, ("keywords" if kind == "movie" else "results"): ks}
+
+def external_ids(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    return {"id": tmdb_id, "imdb_id": imdb_id(kind, tmdb_id)}
+
+def providers(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    r = _rng("providers", kind, tmdb_id)
+    def block() -> Dict[str, Any]:
+        out: Dict[str, Any] = {"link": f"https://www.themoviedb.org/{kind}/{tmdb_id}/watch"}
+        for k in ("flatrate", "ads", "rent", "buy"):
+            if r.random() < 0.5:
+                out[k] = [{"provider_id": i, "provider_name": PROVIDERS[i], "display_priority": i}
+                          for i in r.sample(range(len(PROVIDERS)), r.randint(1, 3))]
+        return out
+    return {"id": tmdb_id, "results": {c: block() for c in ("US", "CA", "GB", "DE", "FR")}}
+
+def list_page(path: str, page: int, *, universe: int, per_page: int = 20) -> Dict[str, Any]:
+    """One page of a discover/popular/trending style list over ids 1..universe."""
+    kind = "tv" if "/tv" in path else "movie"
+    r = _rng("list", path, page)
+    ids = r.sample(range(1, universe + 1), min(per_page, universe))
+    return {"page": page, "total_pages": 500, "total_results": 10000,
+            "results": [basic(kind, i) for i in ids]}
+
+def search(query: str, page: int, *, universe: int) -> Dict[str, Any]:
+    r = _rng("search", query, page)
+    results = []
+    for _ in range(r.randint(0, 8)):
+        kind = r.choice(["movie", "tv", "person"])
+        if kind == "person":
+            p = r.randrange(PEOPLE)
+            results.append({"id": p, "media_type": "person", "name": person(p), "known_for": []})
+        else:
+            results.append(basic(kind, r.randint(1, universe)))
+    return {"page": page, "total_pages": 1, "total_results": len(results), "results": results}
+
+def find(tconst: str) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"movie_results": [], "tv_results": [], "person_results": []}
+    hit = from_imdb_id(tconst)
+    if hit:
+        out[f"{hit[0]}_results"].append(basic(*hit))
+    return out
+
+def pool_record(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    """One pool.jsonl record (catalog_builder shape)."""
+    return _pool_record(basic(kind, tmdb_id))
+
+def _pool_record(b: Dict[str, Any]) -> Dict[str, Any]:
+    kind, tmdb_id = b["media_type"], b["id"]
+    title = b.get("title") or b.get("name")
+    date = b.get("release_date") or b.get("first_air_date") or ""
+    return {"tmdb_id": tmdb_id, "id": tmdb_id, "media_type": kind, "title": title, "name": title,
+            "year": int(date[:4]) if date[:4].isdigit() else None,
+            "popularity": b["popularity"], "release_date": b.get("release_date"),
+            "first_air_date": b.get("first_air_date"),
+            "original_language": b["original_language"], "media_type_raw": kind}
+
+def pool_items(n: int, *, seed: int = 0) -> List[Dict[str, Any]]:
+    """n pool.jsonl records, half movies, half tv."""
+    return [pool_record("movie" if i % 2 else "tv", (i + 1) // 2 + seed) for i in range(1, n + 1)]
+
+def enriched_item(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    """A pool item as engine.enrich leaves it, built with engine.tmdb's own normalizers."""
+    from engine import tmdb
+    it = pool_record(kind, tmdb_id)
+    it.update(tmdb._norm_details(kind, details(kind, tmdb_id)))
+    it.update({k: v for k, v in tmdb._norm_credits(credits(kind, tmdb_id)).items() if v})
+    it["keywords"] = tmdb._norm_keywords(kind, keywords(kind, tmdb_id))
+    it.update(tmdb._norm_external_ids(external_ids(kind, tmdb_id)))
+    it["providers"] = tmdb._norm_providers(providers(kind, tmdb_id), "US")
+    return it
+
+def enriched_items(n: int, *, unique: int = 2000) -> List[Dict[str, Any]]:
+    """
+    n enriched records. Past `unique` distinct titles the records are copies
+    with fresh ids and titles, which keeps 100k-item inputs cheap to build.
+    """
+    base = [enriched_item("movie" if i % 2 else "tv", (i + 1) // 2) for i in range(1, min(n, unique) + 1)]
+    out = list(base)
+    for i in range(len(base), n):
+        it = dict(base[i % len(base)])
+        tid = (i + 2) // 2 + unique
+        it.update({"tmdb_id": tid, "id": tid, "imdb_id": imdb_id(it["media_type"], tid)})
+        name = title_name(it["media_type"], tid)
+        it["title"] = it["name"] = name
+        out.append(it)
+    return out
+
+def write_pool(path: Path, n: int) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        for it in pool_items(n):
+            fh.write(json.dumps(it, ensure_ascii=False) + "\n")
+    return n
+
+def write_ratings_csv(path: Path, n: int, *, universe: int) -> int:
+    """An IMDb-export-shaped ratings.csv over titles the stand-in knows."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    r = _rng("ratings", n, universe)
+    cols = ["Const", "Your Rating", "Date Rated", "Title", "Title Type", "Year", "Genres", "Directors"]
+    with path.open("w", encoding="utf-8", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(cols)
+        for _ in range(n):
+            kind = r.choice(["movie", "tv"])
+            tid = r.randint(1, universe)
+            b = basic(kind, tid)
+            date = b.get("release_date") or b.get("first_air_date") or ""
+            ids = dict(GENRES)
+            w.writerow([imdb_id(kind, tid), r.randint(3, 10), f"2024-{r.randint(1, 12):02d}-01",
+                        b.get("title") or b.get("name"), "Movie" if kind == "movie" else "TV Series",
+                        date[:4], ", ".join(ids[g] for g in b["genre_ids"]),
+                        person(r.randrange(PEOPLE))])
+    return n
+
+# ---------- Large catalogs (bench.stress) ----------
+
+@dataclass(frozen=True)
+class CatalogSpec:
+    """
+    Shape of a synthetic catalog of n titles. Title i is a pure function of
+    (spec, i), so its pool record, enriched item, ratings row and cached TMDB
+    payload agree however and in whatever order they are generated.
+    """
+    n: int = 100000
+    tv_share: float = 0.35          # share of tv titles
+    genre_skew: float = 1.0         # Zipf exponent of genre frequency; 0 = uniform
+    people: int = 200000            # cast/crew population; fewer people, more overlap between titles
+    cast_skew: float = 0.6          # Zipf exponent of how often a person is cast; higher = a few faces everywhere
+    title_collisions: float = 0.03  # share of titles reusing an earlier title (remakes, namesakes)
+    seed: int = 0
+
+# user ratings lean towards 7s and 8s, like real IMDb exports
+_RATING_WEIGHTS = [1, 1, 2, 3, 6, 12, 20, 24, 18, 13]
+# GENRES by how common they are in TMDB's catalog; genre_skew ranks along this
+_GENRES_BY_FREQ = sorted(GENRES, key=lambda g: ["Drama", "Comedy", "Thriller", "Action", "Romance", "Horror", "Crime",
+                                                "Documentary", "Adventure", "Science Fiction", "Family", "Mystery",
+                                                "Fantasy", "Animation", "History", "War", "Western"].index(g[1]))
+_CREW_JOBS = [("Writing", "Screenplay"), ("Writing", "Writer"), ("Writing", "Story"), ("Production", "Producer"),
+              ("Sound", "Original Music Composer"), ("Camera", "Director of Photography"), ("Editing", "Editor")]
+
+@lru_cache(maxsize=None)
+def _zipf_cum(size: int, skew: float) -> Tuple[float, ...]:
+    return tuple(itertools.accumulate(1.0 / (k + 1) ** skew for k in range(size)))
+
+_person = lru_cache(maxsize=None)(person)
+
+def catalog_kind(spec: CatalogSpec, i: int) -> str:
+    return "tv" if _rng("cat-kind", spec.seed, i).random() < spec.tv_share else "movie"
+
+def _catalog_year(spec: CatalogSpec, i: int) -> int:
+    # most of a catalog is recent; the tail reaches back decades
+    return max(1920, 2025 - int(_rng("cat-year", spec.seed, i).expovariate(1 / 12.0)))
+
+def catalog_title(spec: CatalogSpec, i: int) -> Tuple[str, int]:
+    """(title, year) of title i; with title_collisions some reuse an earlier title, a third of those its year too."""
+    r = _rng("cat-title", spec.seed, i)
+    year = _catalog_year(spec, i)
+    if i and r.random() < spec.title_collisions:
+        j = r.randrange(i)
+        return title_name(catalog_kind(spec, j), j + 1), (_catalog_year(spec, j) if r.random() < 0.33 else year)
+    return title_name(catalog_kind(spec, i), i + 1), year
+
+def catalog_basic(spec: CatalogSpec, i: int) -> Dict[str, Any]:
+    """Title i as a list/search result entry (tmdb id i + 1)."""
+    kind, tid = catalog_kind(spec, i), i + 1
+    r = _rng("cat-basic", spec.seed, i)
+    name, year = catalog_title(spec, i)
+    date = f"{year}-{r.randint(1, 12):02d}-{r.randint(1, 28):02d}"
+    out: Dict[str, Any] = {
+        "id": tid,
+        "media_type": kind,
+        "original_language": r.choice(LANGS),
+        "popularity": round(r.paretovariate(1.5) * 5.0, 3),
+        "vote_average": round(min(10.0, max(1.0, r.gauss(6.6, 1.1))), 1),
+        "vote_count": int(r.paretovariate(1.2) * 40),
+        "genre_ids": list(dict.fromkeys(g for g, _ in r.choices(_GENRES_BY_FREQ, cum_weights=_zipf_cum(len(GENRES), spec.genre_skew),
+                                                                 k=r.randint(1, 3)))),
+    }
+    if kind == "movie":
+        out.update({"title": name, "original_title": name, "release_date": date})
+    else:
+        out.update({"name": name, "original_name": name, "first_air_date": date})
+    return out
+
+def catalog_payload(spec: CatalogSpec, i: int) -> Dict[str, Any]:
+    """Title i as TMDB answers the hydrating request (details + append_to_response parts)."""
+    b = catalog_basic(spec, i)
+    kind, tid = b["media_type"], b["id"]
+    r = _rng("cat-payload", spec.seed, i)
+    ids = dict(GENRES)
+    people = _zipf_cum(spec.people, spec.cast_skew)
+    out = {k: v for k, v in b.items() if k not in {"genre_ids", "media_type"}}
+    out["genres"] = [{"id": g, "name": ids[g]} for g in b["genre_ids"]]
+    out["production_companies"] = [{"id": c, "name": f"{_WORDS[c % len(_WORDS)].title()} Pictures {c}"}
+                                   for c in r.choices(range(2000), cum_weights=_zipf_cum(2000, 1.0), k=r.randint(1, 3))]
+    if kind == "movie":
+        out["runtime"] = r.randint(78, 175)
+    else:
+        seasons = max(1, min(20, int(r.expovariate(1 / 2.5)) + 1))
+        out.update({"number_of_seasons": seasons, "episode_run_time": [r.choice([22, 30, 45, 55, 60])],
+                    "last_air_date": f"{min(2025, int(b['first_air_date'][:4]) + seasons)}-06-01",
+                    "networks": [{"id": 1 + NETWORKS.index(net), "name": net} for net in [r.choice(NETWORKS)]]})
+    cast = list(dict.fromkeys(r.choices(range(spec.people), cum_weights=people, k=r.randint(8, 25))))
+    crew = list(dict.fromkeys(r.choices(range(spec.people), cum_weights=people, k=r.randint(4, 12))))
+    out["credits"] = {
+        "cast": [{"id": p, "name": _person(p), "character": _WORDS[p % len(_WORDS)].title(), "order": k}
+                 for k, p in enumerate(cast)],
+        "crew": [{"id": p, "name": _person(p), "department": dept, "job": job}
+                 for p, (dept, job) in zip(crew, [("Directing", "Director")] + [r.choice(_CREW_JOBS) for _ in crew[1:]])],
+    }
+    kws = [{"id": k, "name": f"{_WORDS[k % len(_WORDS)]} {k}"}
+           for k in dict.fromkeys(r.choices(range(KEYWORDS), cum_weights=_zipf_cum(KEYWORDS, 1.0), k=r.randint(3, 20)))]
+    out["keywords"] = {("keywords" if kind == "movie" else "results"): kws}
+    out["external_ids"] = {"id": tid, "imdb_id": imdb_id(kind, tid)}
+    us: Dict[str, Any] = {"link": f"https://www.themoviedb.org/{kind}/{tid}/watch"}
+    if r.random() < 0.8:
+        us["flatrate"] = [{"provider_id": p, "provider_name": PROVIDERS[p], "display_priority": p}
+                          for p in dict.fromkeys(r.choices(range(len(PROVIDERS)), cum_weights=_zipf_cum(len(PROVIDERS), 1.0),
+                                                           k=r.randint(1, 3)))]
+    out["watch/providers"] = {"id": tid, "results": {"US": us}}
+    return out
+
+def catalog_pool_record(spec: CatalogSpec, i: int) -> Dict[str, Any]:
+    return _pool_record(catalog_basic(spec, i))
+
+def catalog_enriched(spec: CatalogSpec, i: int) -> Dict[str, Any]:
+    """Title i as engine.enrich leaves it after a hydrated fetch."""
+    from engine import tmdb
+    data = catalog_payload(spec, i)
+    kind = catalog_kind(spec, i)
+    it = catalog_pool_record(spec, i)
+    it.update(tmdb._norm_details(kind, data))
+    it.update({k: v for k, v in tmdb._norm_credits(data["credits"]).items() if v})
+    it["keywords"] = tmdb._norm_keywords(kind, data["keywords"])
+    it.update(tmdb._norm_external_ids(data["external_ids"]))
+    it["providers"] = tmdb._norm_providers(data["watch/providers"], "US")
+    return it
+
+def write_catalog_pool(path: Path, spec: CatalogSpec) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        for i in range(spec.n):
+            fh.write(json.dumps(catalog_pool_record(spec, i), ensure_ascii=False) + "\n")
+    return spec.n
+
+def write_catalog_enriched(path: Path, spec: CatalogSpec, *, limit: Optional[int] = None) -> int:
+    """A JSON array of enriched items, written one item at a time so 1M titles never sit in memory."""
+    n = spec.n if limit is None else min(spec.n, limit)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write("[\n")
+        for i in range(n):
+            fh.write(("" if i == 0 else ",\n") + json.dumps(catalog_enriched(spec, i), ensure_ascii=False))
+        fh.write("\n]\n")
+    return n
+
+def write_catalog_ratings(path: Path, spec: CatalogSpec, rows: int, *, in_catalog: float = 0.8) -> int:
+    """
+    An IMDb ratings export (its full column set) of `rows` distinct titles;
+    in_catalog of them (at most half the catalog) are titles of the catalog,
+    the rest lie past its end.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    r = _rng("cat-ratings", spec.seed, spec.n, rows)
+    inside = min(spec.n // 2, int(rows * in_catalog))
+    picks = r.sample(range(spec.n), inside) + list(range(spec.n, spec.n + rows - inside))
+    r.shuffle(picks)
+    cols = ["Const", "Your Rating", "Date Rated", "Title", "Original Title", "URL", "Title Type", "IMDb Rating",
+            "Runtime (mins)", "Year", "Genres", "Num Votes", "Release Date", "Directors"]
+    with path.open("w", encoding="utf-8", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(cols)
+        for i in picks:
+            d = catalog_payload(spec, i)
+            kind = catalog_kind(spec, i)
+            tconst = d["external_ids"]["imdb_id"]
+            name = d.get("title") or d.get("name")
+            date = d.get("release_date") or d.get("first_air_date") or ""
+            if kind == "movie":
+                ttype, runtime = "Movie", d["runtime"]
+            else:
+                ttype = "TV Mini Series" if d["number_of_seasons"] == 1 else "TV Series"
+                runtime = d["episode_run_time"][0]
+            rated = max(date, f"{2025 - int(r.expovariate(1 / 4.0))}-{r.randint(1, 12):02d}-{r.randint(1, 28):02d}")
+            w.writerow([tconst, r.choices(range(1, 11), weights=_RATING_WEIGHTS)[0], rated, name, name,
+                        f"https://www.imdb.com/title/{tconst}/", ttype, d["vote_average"], runtime, date[:4],
+                        ", ".join(g["name"] for g in d["genres"]), d["vote_count"], date,
+                        ", ".join(c["name"] for c in d["credits"]["crew"] if c["job"] == "Director")])
+    return len(picks)
+
+def add_catalog_args(ap: argparse.ArgumentParser) -> None:
+    d = CatalogSpec()
+    ap.add_argument("--tv-share", type=float, default=d.tv_share, help="share of tv titles")
+    ap.add_argument("--genre-skew", type=float, default=d.genre_skew, help="Zipf exponent of genre frequency (0 = uniform)")
+    ap.add_argument("--people", type=int, default=d.people, help="cast/crew population (smaller = more cast overlap)")
+    ap.add_argument("--cast-skew", type=float, default=d.cast_skew, help="Zipf exponent of casting frequency")
+    ap.add_argument("--title-collisions", type=float, default=d.title_collisions,
+                    help="share of titles reusing an earlier title")
+    ap.add_argument("--seed", type=int, default=d.seed)
+
+def catalog_spec(args: argparse.Namespace, n: int) -> CatalogSpec:
+    return CatalogSpec(n=n, tv_share=args.tv_share, genre_skew=args.genre_skew, people=args.people,
+                       cast_skew=args.cast_skew, title_collisions=args.title_collisions, seed=args.seed)
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Write a synthetic catalog: pool.jsonl, items.enriched.json, ratings.csv")
+    ap.add_argument("--n", type=int, default=100000, help="titles in the catalog")
+    ap.add_argument("--ratings", type=int, default=50000, help="rows in ratings.csv (0 skips it)")
+    ap.add_argument("--in-catalog", type=float, default=0.8, help="share of rated titles that are in the catalog")
+    ap.add_argument("--enriched", type=int, default=None, help="enriched items to write (default all, 0 skips)")
+    ap.add_argument("--out-dir", default="data/synth")
+    add_catalog_args(ap)
+    args = ap.parse_args()
+
+    spec = catalog_spec(args, args.n)
+    out = Path(args.out_dir)
+    counts = {"pool": write_catalog_pool(out / "pool.jsonl", spec)}
+    if args.enriched != 0:
+        counts["enriched"] = write_catalog_enriched(out / "items.enriched.json", spec, limit=args.enriched)
+    if args.ratings:
+        counts["ratings"] = write_catalog_ratings(out / "ratings.csv", spec, args.ratings, in_catalog=args.in_catalog)
+    print(json.dumps({"spec": asdict(spec), "out_dir": str(out), "written": counts}, indent=2))
+
+if __name__ == "__main__":
+    main()
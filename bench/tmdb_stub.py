@@ -0,0 +1,203 @@
+# bench/tmdb_stub.py
+"""
+Local stand-in for the TMDB v3 endpoints the engine calls.
+
+    python -m bench.tmdb_stub --port 8765 --latency-ms 40 --rate-limit-rps 40
+
+Serves discover/<kind>, the movie/tv lists, trending, details (with
+append_to_response), credits, keywords, external_ids, watch/providers,
+search/multi and find/<imdb_id>, with synthetic payloads from bench.synth.
+Optional per-request latency (plus jitter), a per-connection handshake delay,
+and a token-bucket rate limit that answers 429 + Retry-After when exceeded.
+ETag / If-None-Match is honoured, so conditional refreshes see 304s.
+Point engine.tmdb._TMDb_V3 at StubServer.base_url.
+"""
+from __future__ import annotations
+import argparse, hashlib, json, random, re, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from . import synth
+
+_TITLE_RX = re.compile(r"^/3/(movie|tv)/(\d+)(/credits|/keywords|/external_ids|/watch/providers)?$")
+_LIST_RX = re.compile(r"^/3/(discover/(movie|tv)|movie/(popular|top_rated|now_playing|upcoming)"
+                      r"|tv/(popular|top_rated|airing_today|on_the_air)|trending/(movie|tv)/(day|week))$")
+_FIND_RX = re.compile(r"^/3/find/(tt\d+)$")
+
+_PARTS = {
+    "/credits": synth.credits,
+    "/keywords": synth.keywords,
+    "/external_ids": synth.external_ids,
+    "/watch/providers": synth.providers,
+}
+_APPEND = {"credits": synth.credits, "keywords": synth.keywords,
+           "external_ids": synth.external_ids, "watch/providers": synth.providers}
+
+def _details(kind: str, tmdb_id: int, append: str = "") -> Dict[str, Any]:
+    out = synth.details(kind, tmdb_id)
+    for part in filter(None, (append or "").split(",")):
+        fn = _APPEND.get(part)
+        if fn is not None:
+            out[part] = fn(kind, tmdb_id)
+        elif part in {"content_ratings", "release_dates"}:
+            out[part] = {"results": [{"iso_3166_1": "US", "rating": "TV-14"}]}
+    return out
+
+class StubState:
+    def __init__(self, connect_delay_ms: float = 0.0, *, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 rate_limit_rps: float = 0.0, burst: int = 20, catalog_size: int = 100000) -> None:
+        self.connect_delay_s = max(0.0, connect_delay_ms) / 1000.0
+        self.latency_s = max(0.0, latency_ms) / 1000.0
+        self.jitter_s = max(0.0, jitter_ms) / 1000.0
+        self.rate = max(0.0, rate_limit_rps)
+        self.burst = float(max(1, burst))
+        self.catalog_size = max(1, catalog_size)
+        self.lock = threading.Lock()
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self.connections = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.throttled = 0
+        self.bytes = 0
+
+    def admit(self) -> bool:
+        """Token bucket: False means answer 429."""
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.throttled += 1
+            return False
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return {"connections": self.connections, "requests": self.requests, "not_modified": self.not_modified,
+                    "throttled": self.throttled, "bytes": self.bytes}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive capable
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    state: StubState
+
+    def setup(self) -> None:
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+        # stands in for the TCP+TLS handshake cost of a fresh connection
+        if self.state.connect_delay_s:
+            time.sleep(self.state.connect_delay_s)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def _payload(self, path: str, query: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        page = int(query.get("page") or 1) if (query.get("page") or "1").isdigit() else 1
+        m = _TITLE_RX.match(path)
+        if m:
+            kind, tid = m.group(1), int(m.group(2))
+            if tid > self.state.catalog_size:
+                return None
+            if m.group(3):
+                return _PARTS[m.group(3)](kind, tid)
+            return _details(kind, tid, query.get("append_to_response", ""))
+        if _LIST_RX.match(path):
+            return synth.list_page(path, page, universe=self.state.catalog_size)
+        if path == "/3/search/multi":
+            return synth.search(query.get("query", ""), page, universe=self.state.catalog_size)
+        m = _FIND_RX.match(path)
+        if m:
+            return synth.find(m.group(1))
+        return None
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        st = self.state
+        with st.lock:
+            st.requests += 1
+        if st.latency_s or st.jitter_s:
+            time.sleep(st.latency_s + random.uniform(0.0, st.jitter_s))
+        if not st.admit():
+            self._send(429, b'{"status_code":25,"status_message":"Your request count is over the allowed limit."}',
+                       {"Content-Type": "application/json", "Retry-After": "1"})
+            return
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        payload = self._payload(parts.path, query)
+        if payload is None:
+            self._send(404, b'{"status_code":34,"status_message":"The resource you requested could not be found."}',
+                       {"Content-Type": "application/json"})
+            return
+        body = json.dumps(payload).encode("utf-8")
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            with st.lock:
+                st.not_modified += 1
+            self._send(304, b"", {"ETag": etag})
+            return
+        with st.lock:
+            st.bytes += len(body)
+        self._send(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+class StubServer:
+    """Local stand-in for api.themoviedb.org, served from a background thread."""
+    def __init__(self, *, connect_delay_ms: float = 0.0, port: int = 0, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, rate_limit_rps: float = 0.0, burst: int = 20,
+                 catalog_size: int = 100000) -> None:
+        self.state = StubState(connect_delay_ms, latency_ms=latency_ms, jitter_ms=jitter_ms,
+                               rate_limit_rps=rate_limit_rps, burst=burst, catalog_size=catalog_size)
+        handler = type("Handler", (_Handler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/3"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Serve a synthetic TMDB v3 API on localhost")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--connect-delay-ms", type=float, default=0.0)
+    ap.add_argument("--rate-limit-rps", type=float, default=0.0, help="0 disables 429s")
+    ap.add_argument("--burst", type=int, default=20)
+    ap.add_argument("--catalog-size", type=int, default=100000, help="ids 1..N exist per media type")
+    args = ap.parse_args()
+    with StubServer(port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                    connect_delay_ms=args.connect_delay_ms, rate_limit_rps=args.rate_limit_rps,
+                    burst=args.burst, catalog_size=args.catalog_size) as srv:
+        print(f"TMDB stand-in at {srv.base_url} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    print(json.dumps(srv.state.snapshot(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,13 @@
 from __future__ import annotations
 from typing import Dict, Iterable, List, Any, Tuple, Optional
 from pathlib import Path
-import json, io, os, time, tempfile, hashlib
+import json, io, os, time, tempfile
 from datetime import datetime, timedelta
 
-import requests
+from . import cache_backend
+from . import cache_keys
+from . import revalidate
+from . import sessions
 
 # ---------- Paths / dirs ----------
 BASE = Path(__file__).resolve().parents[1]
@@ -118,25 +121,29 @@ def _tmdb_key() -> str:
         raise RuntimeError("TMDB_API_KEY (v3) not set")
     return key
 
-def _hash_key(url: str, params: Dict[str, Any]) -> str:
-    blob = url + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params.keys()))
-    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
-
-def _tmdb_cache_path(kind: str, url: str, params: Dict[str, Any]) -> Path:
-    h = _hash_key(url, params)
-    return TMDB_DIR / f"{kind}_{h}.json"
-
 def _tmdb_get_json_cached(kind: str, url: str, params: Dict[str, Any], *, ttl_days: int) -> Dict[str, Any]:
+    # kind only labels the call site; entries are shared with engine.tmdb via the canonical key
     ensure_dirs()
-    path = _tmdb_cache_path(kind, url, params)
-    cached = read_json(path, default=None)
-    if isinstance(cached, dict) and "data" in cached and "cached_at" in cached and not stale(cached["cached_at"], ttl_days):
-        return cached["data"]
+    key = cache_keys.canonical_key(url, params)
+    ttl_s = int(ttl_days) * 86400
+    cached = cache_backend.store().get(cache_keys.TMDB_NS, key)
+    if cached is not None and (cached.status != "ok" or cached.meta.get("proj")):
+        # engine.tmdb's negative entries ({} under a short TTL of their own) and
+        # its trimmed projections are not the full response this caller wants
+        cached = None
+    if cached is not None and cached.age() <= revalidate.effective_ttl(cached.meta, ttl_s):
+        cache_backend.note_hit(cache_keys.TMDB_NS, cached.age())
+        return cached.data
 
     headers = {
         "Accept": "application/json",
         "User-Agent": _DEFAULT_UA,
     }
+    # expired entry: ask TMDB whether it changed (ETag / Last-Modified)
+    cond = revalidate.conditional_headers(cached.meta) if cached is not None else {}
+    if cond:
+        headers.update(cond)
+        revalidate.note("tmdb_cache", "conditional")
 
     # inject API key param (v3 style)
     params = dict(params)
@@ -144,15 +151,28 @@ def _tmdb_get_json_cached(kind: str, url: str, params: Dict[str, Any], *, ttl_da
 
     for attempt in range(3):
         try:
-            r = requests.get(url, params=params, headers=headers, timeout=_DEFAULT_TIMEOUT)
-            if r.status_code == 429:
-                time.sleep(2)
-                continue
+            # 429/Retry-After is handled by the shared scheduler inside sessions.get
+            r = sessions.get(url, params=params, headers=headers, timeout=_DEFAULT_TIMEOUT)
+            if r.status_code == 304 and cached is not None:
+                revalidate.note("tmdb_cache", "not_modified", int(cached.meta.get("bytes") or cached.raw_size))
+                cache_backend.store().touch(cache_keys.TMDB_NS, key)
+                return cached.data
             r.raise_for_status()
+            body = r.content
+            if cached is not None and revalidate.unchanged(cached.meta, body):
+                revalidate.note("tmdb_cache", "same_hash", len(body))
+                cache_backend.store().touch(cache_keys.TMDB_NS, key)
+                return cached.data
             data = r.json()
-            wrapper = {"cached_at": datetime.utcnow().isoformat(timespec="seconds") + "Z", "data": data}
-            atomic_write_json(path, wrapper)
+            if cached is not None:
+                revalidate.note("tmdb_cache", "changed")
+            meta = {**revalidate.validators_from(r, body), **revalidate.jitter_meta(),
+                    "req": cache_keys.canonical_request(url, params)}
+            cache_backend.store().put(cache_keys.TMDB_NS, key, data, ttl_s=revalidate.effective_ttl(meta, ttl_s), meta=meta)
             return data
+        except sessions.OfflineError:
+            sessions.note_offline("tmdb_cache", stale=cached is not None)
+            return cached.data if cached is not None else {}
         except Exception:
             if attempt == 2:
                 raise
@@ -0,0 +1,497 @@
+# engine/cache_backend.py
+"""
+Pluggable storage for cached API responses.
+
+Entries are addressed by (namespace, key) and carry their fetch time, TTL and
+a status next to the decoded payload. Two backends share one interface:
+
+  files   one JSON file per entry under {root}/{namespace}/{key}.json (the
+          historical layout; legacy raw/wrapped files are still readable)
+  sqlite  a single {root}/cache.sqlite3 in WAL mode with fetched_at/expires_at
+          in indexed columns
+
+CACHE_BACKEND selects the process-wide store, CACHE_ROOT its location.
+
+With CACHE_COMPRESS, payloads of at least CACHE_COMPRESS_MIN_BYTES are stored
+zlib-compressed (the whole file for files, the value column for sqlite).
+Reads tell the two apart by the first byte -- a zlib stream starts with 0x78
+("x"), JSON never does -- so compressed and plain entries mix freely and the
+flag can be flipped at any time. put() returns the uncompressed length, the
+figure memory tiers should budget against; on-disk sizes (Entry.size,
+EntryInfo.size) stay compressed for cache_gc's quotas.
+"""
+from __future__ import annotations
+import json, os, re, sqlite3, threading, time, zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+def _bool(n: str, d: bool) -> bool:
+    v = (os.getenv(n, "") or "").strip().lower()
+    if v in {"1","true","yes","on"}: return True
+    if v in {"0","false","no","off"}: return False
+    return d
+def _int(n: str, d: int) -> int:
+    try: return int(os.getenv(n, "") or d)
+    except Exception: return d
+
+CACHE_BACKEND = (os.getenv("CACHE_BACKEND", "files") or "files").strip().lower()
+CACHE_ROOT    = Path(os.getenv("CACHE_ROOT", "data/cache") or "data/cache")
+SQLITE_NAME   = "cache.sqlite3"
+
+CACHE_COMPRESS           = _bool("CACHE_COMPRESS", False)
+CACHE_COMPRESS_LEVEL     = max(1, min(9, _int("CACHE_COMPRESS_LEVEL", 6)))
+CACHE_COMPRESS_MIN_BYTES = _int("CACHE_COMPRESS_MIN_BYTES", 512)
+
+@dataclass
+class Entry:
+    data: Any
+    fetched_at: float
+    ttl_s: Optional[int] = None
+    status: str = "ok"
+    meta: Dict[str, Any] = field(default_factory=dict)
+    size: int = 0       # bytes as stored (compressed when CACHE_COMPRESS applied)
+    raw_size: int = 0   # bytes of the JSON text the payload was decoded from
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.fetched_at
+
+@dataclass
+class EntryInfo:
+    """Metadata only (no payload) -- what cache_gc needs to pick victims."""
+    key: str
+    fetched_at: float
+    accessed_at: float
+    expires_at: Optional[float]
+    size: int
+
+# ---------- Hit-age accounting ----------
+AGE_BUCKETS: List[Tuple[str, Optional[float]]] = [
+    ("<1d", 1 * 86400.0),
+    ("1-7d", 7 * 86400.0),
+    ("7-30d", 30 * 86400.0),
+    ("30-90d", 90 * 86400.0),
+    (">90d", None),
+]
+
+def age_bucket(age_s: float) -> str:
+    for label, upper in AGE_BUCKETS:
+        if upper is None or age_s < upper:
+            return label
+    return AGE_BUCKETS[-1][0]
+
+_hits_lock = threading.Lock()
+_hit_ages: Dict[str, Dict[str, int]] = {}
+
+def note_hit(ns: str, age_s: float) -> None:
+    """Count a lookup that served an entry of this age as fresh (callers own the TTL decision)."""
+    b = age_bucket(age_s)
+    with _hits_lock:
+        h = _hit_ages.setdefault(ns, {})
+        h[b] = h.get(b, 0) + 1
+
+def hit_ages() -> Dict[str, Dict[str, int]]:
+    """Ages (since fetch) of the entries served fresh in this process, per namespace."""
+    with _hits_lock:
+        return {ns: dict(h) for ns, h in _hit_ages.items()}
+
+# ---------- Legacy envelopes ----------
+def _iso_ts(s: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(s.replace("Z", "+00:00")).timestamp()
+    except Exception:
+        return None
+
+def decode_legacy(obj: Any, mtime: float) -> Tuple[Any, float]:
+    """
+    Unwrap the envelopes the older caches wrote:
+      engine/cache.py {"cached_at": iso, "data": ...}
+      engine/http.py  {"_fetched_ts": ts, "data": ...}
+    Anything else is a raw payload stamped with the file mtime.
+    """
+    if isinstance(obj, dict) and "data" in obj and len(obj) == 2:
+        if "_fetched_ts" in obj:
+            try: return obj["data"], float(obj["_fetched_ts"])
+            except Exception: return obj["data"], mtime
+        if "cached_at" in obj:
+            return obj["data"], _iso_ts(str(obj["cached_at"])) or mtime
+    return obj, mtime
+
+_ENVELOPE = "__cache_v"
+# put() writes the envelope's fixed fields first, so a scan reads them off the
+# first bytes of the file instead of parsing the payload
+_HEAD_BYTES = 512
+_HEAD_RE = re.compile(rb'^\{"__cache_v": 1, "fetched_at": ([-+0-9.eE]+), "ttl_s": (null|[0-9]+)')
+
+def encode_value(raw: bytes) -> bytes:
+    if CACHE_COMPRESS and len(raw) >= CACHE_COMPRESS_MIN_BYTES:
+        return zlib.compress(raw, CACHE_COMPRESS_LEVEL)
+    return raw
+
+def decode_value(blob: bytes) -> bytes:
+    if blob[:1] == b"x":
+        return zlib.decompress(blob)
+    return blob
+
+# ---------- Files backend ----------
+class FileBackend:
+    kind = "files"
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # last-access times are buffered and written as file atimes on flush;
+        # get() runs on enrich worker threads, so the buffer is locked
+        self._lock = threading.Lock()
+        self._touched: Dict[Tuple[str, str], float] = {}
+
+    def _path(self, ns: str, key: str) -> Path:
+        return self.root / ns / f"{key}.json"
+
+    def get(self, ns: str, key: str) -> Optional[Entry]:
+        p = self._path(ns, key)
+        try:
+            blob = p.read_bytes()
+            mtime = p.stat().st_mtime
+            raw = decode_value(blob)
+            obj = json.loads(raw.decode("utf-8", errors="replace"))
+        except Exception:
+            return None
+        if isinstance(obj, dict) and obj.get(_ENVELOPE) == 1:
+            # put() stamps mtime = fetched_at and touch() moves it forward
+            entry = Entry(data=obj.get("data"), fetched_at=max(float(obj.get("fetched_at") or 0), mtime),
+                          ttl_s=obj.get("ttl_s"), status=obj.get("status") or "ok",
+                          meta=obj.get("meta") or {}, size=len(blob), raw_size=len(raw))
+        else:
+            data, ts = decode_legacy(obj, mtime)
+            entry = Entry(data=data, fetched_at=max(ts, mtime), size=len(blob), raw_size=len(raw))
+        with self._lock:
+            self._touched[(ns, key)] = time.time()
+        return entry
+
+    def put(self, ns: str, key: str, data: Any, *, fetched_at: Optional[float] = None,
+            ttl_s: Optional[int] = None, status: str = "ok", meta: Optional[Dict[str, Any]] = None) -> int:
+        p = self._path(ns, key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        ts = fetched_at or time.time()
+        env = {_ENVELOPE: 1, "fetched_at": ts, "ttl_s": ttl_s,
+               "status": status, "meta": meta or {}, "data": data}
+        raw = json.dumps(env, ensure_ascii=False).encode("utf-8")
+        blob = encode_value(raw)
+        # tmp name is unique per thread so concurrent writers never interleave
+        tmp = p.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(blob)
+        os.utime(tmp, (time.time(), ts))
+        tmp.replace(p)
+        return len(raw)
+
+    def touch(self, ns: str, key: str, fetched_at: Optional[float] = None, *,
+              ttl_s: Optional[int] = None, meta: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Mark an entry as freshly validated. Only moves mtime unless a new TTL
+        or meta has to be recorded, which needs the envelope rewritten.
+        """
+        ts = fetched_at or time.time()
+        if ttl_s is not None or meta is not None:
+            cur = self.get(ns, key)
+            if cur is None:
+                return False
+            self.put(ns, key, cur.data, fetched_at=ts, ttl_s=ttl_s if ttl_s is not None else cur.ttl_s,
+                     status=cur.status, meta=meta if meta is not None else cur.meta)
+            return True
+        try:
+            os.utime(self._path(ns, key), (ts, ts))
+        except OSError:
+            return False
+        return True
+
+    def delete(self, ns: str, key: str) -> None:
+        try: self._path(ns, key).unlink()
+        except FileNotFoundError: pass
+
+    def delete_many(self, ns: str, keys: List[str]) -> int:
+        for k in keys:
+            self.delete(ns, k)
+        return len(keys)
+
+    def flush_access(self) -> None:
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        for (ns, key), ts in touched.items():
+            p = self._path(ns, key)
+            try: os.utime(p, (ts, p.stat().st_mtime))
+            except OSError: pass
+
+    def scan(self, ns: str) -> Iterator[EntryInfo]:
+        self.flush_access()
+        d = self.root / ns
+        if not d.is_dir():
+            return
+        for p in d.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            head = _HEAD_RE.match(self._read_head(p, st))
+            if head:
+                fetched = max(float(head.group(1)), st.st_mtime)
+                expires = fetched + float(head.group(2)) if head.group(2) not in (b"null", b"0") else None
+                yield EntryInfo(p.stem, fetched, max(st.st_atime, fetched), expires, st.st_size)
+                continue
+            # legacy envelopes (before cache_migrate) carry their timestamps anywhere in the object
+            try:
+                obj = json.loads(decode_value(p.read_bytes()).decode("utf-8", errors="replace"))
+                # reading may bump atime (relatime); put it back so the scan itself isn't an access
+                os.utime(p, (st.st_atime, st.st_mtime))
+            except Exception:
+                # unreadable files are never served; age them out like any other entry
+                yield EntryInfo(p.stem, st.st_mtime, st.st_mtime, None, st.st_size)
+                continue
+            expires = None
+            if isinstance(obj, dict) and obj.get(_ENVELOPE) == 1:
+                fetched = max(float(obj.get("fetched_at") or 0), st.st_mtime)
+                if obj.get("ttl_s"):
+                    expires = fetched + float(obj["ttl_s"])
+            else:
+                _, fetched = decode_legacy(obj, st.st_mtime)
+                fetched = max(fetched, st.st_mtime)
+            yield EntryInfo(p.stem, fetched, max(st.st_atime, fetched), expires, st.st_size)
+
+    @staticmethod
+    def _read_head(p: Path, st: os.stat_result) -> bytes:
+        try:
+            with p.open("rb") as fh:
+                blob = fh.read(_HEAD_BYTES)
+            # reading may bump atime (relatime); put it back so the scan itself isn't an access
+            os.utime(p, (st.st_atime, st.st_mtime))
+        except OSError:
+            return b""
+        if blob[:1] == b"x":
+            try:
+                return zlib.decompressobj().decompress(blob, _HEAD_BYTES)
+            except zlib.error:
+                return b""
+        return blob
+
+    def close(self) -> None:
+        self.flush_access()
+
+# ---------- SQLite backend ----------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    ns         TEXT    NOT NULL,
+    key        TEXT    NOT NULL,
+    value      BLOB    NOT NULL,
+    fetched_at REAL    NOT NULL,
+    ttl_s      INTEGER,
+    expires_at REAL,
+    status     TEXT    NOT NULL DEFAULT 'ok',
+    meta       TEXT,
+    size       INTEGER NOT NULL,
+    accessed_at REAL,
+    PRIMARY KEY (ns, key)
+);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (ns, expires_at);
+CREATE INDEX IF NOT EXISTS entries_fetched ON entries (ns, fetched_at);
+"""
+
+class SqliteBackend:
+    kind = "sqlite"
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # one connection shared by all threads; the lock serializes access
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            cols = {r[1] for r in self._conn.execute("PRAGMA table_info(entries)")}
+            if "accessed_at" not in cols:
+                self._conn.execute("ALTER TABLE entries ADD COLUMN accessed_at REAL")
+        self._touched: Dict[Tuple[str, str], float] = {}
+
+    def get(self, ns: str, key: str) -> Optional[Entry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, fetched_at, ttl_s, status, meta, size FROM entries WHERE ns=? AND key=?",
+                (ns, key)).fetchone()
+        if row is None:
+            return None
+        value, fetched_at, ttl_s, status, meta, size = row
+        try:
+            raw = decode_value(value)
+            data = json.loads(raw)
+        except Exception:
+            return None
+        entry = Entry(data=data, fetched_at=fetched_at, ttl_s=ttl_s, status=status,
+                      meta=json.loads(meta) if meta else {}, size=size, raw_size=len(raw))
+        # buffered; one UPDATE per key at flush instead of a write per read
+        with self._lock:
+            self._touched[(ns, key)] = time.time()
+        return entry
+
+    def put(self, ns: str, key: str, data: Any, *, fetched_at: Optional[float] = None,
+            ttl_s: Optional[int] = None, status: str = "ok", meta: Optional[Dict[str, Any]] = None) -> int:
+        raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        value = encode_value(raw)
+        ts = fetched_at or time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (ns, key, value, fetched_at, ttl_s, expires_at, status, meta, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (ns, key, value, ts, ttl_s, (ts + ttl_s) if ttl_s else None, status,
+                 json.dumps(meta) if meta else None, len(value), time.time()))
+        return len(raw)
+
+    def touch(self, ns: str, key: str, fetched_at: Optional[float] = None, *,
+              ttl_s: Optional[int] = None, meta: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark an entry as freshly validated: restart its TTL without rewriting the value."""
+        ts = fetched_at or time.time()
+        with self._lock:
+            # SET expressions see the old row, hence COALESCE(?, ttl_s) twice
+            cur = self._conn.execute(
+                "UPDATE entries SET fetched_at=?, ttl_s=COALESCE(?, ttl_s), "
+                "expires_at=CASE WHEN COALESCE(?, ttl_s) THEN ? + COALESCE(?, ttl_s) END, "
+                "meta=COALESCE(?, meta), accessed_at=? WHERE ns=? AND key=?",
+                (ts, ttl_s, ttl_s, ts, ttl_s, json.dumps(meta) if meta is not None else None, ts, ns, key))
+        return cur.rowcount > 0
+
+    def put_many(self, rows: List[Tuple[str, str, Any, float, Optional[int], str, Optional[Dict[str, Any]]]]) -> int:
+        """Bulk insert (ns, key, data, fetched_at, ttl_s, status, meta) in one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for ns, key, data, ts, ttl_s, status, meta in rows:
+                    value = encode_value(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO entries (ns, key, value, fetched_at, ttl_s, expires_at, status, meta, size, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (ns, key, value, ts, ttl_s, (ts + ttl_s) if ttl_s else None, status,
+                         json.dumps(meta) if meta else None, len(value), ts))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def fetched_at(self, ns: str, key: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at FROM entries WHERE ns=? AND key=?", (ns, key)).fetchone()
+        return row[0] if row else None
+
+    def delete(self, ns: str, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE ns=? AND key=?", (ns, key))
+
+    def delete_many(self, ns: str, keys: List[str]) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("DELETE FROM entries WHERE ns=? AND key=?", [(ns, k) for k in keys])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(keys)
+
+    def flush_access(self) -> None:
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            if touched:
+                self._conn.executemany(
+                    "UPDATE entries SET accessed_at=? WHERE ns=? AND key=?",
+                    [(ts, ns, key) for (ns, key), ts in touched.items()])
+
+    def scan(self, ns: str) -> Iterator[EntryInfo]:
+        self.flush_access()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, fetched_at, COALESCE(accessed_at, fetched_at), expires_at, size "
+                "FROM entries WHERE ns=?", (ns,)).fetchall()
+        for key, fetched_at, accessed_at, expires_at, size in rows:
+            yield EntryInfo(key, fetched_at, accessed_at, expires_at, size)
+
+    def compact(self, min_free_ratio: float = 0.25) -> bool:
+        """VACUUM once enough pages are free that the file is worth shrinking."""
+        with self._lock:
+            pages = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            free = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not pages or free / pages < min_free_ratio:
+                return False
+            self._conn.execute("VACUUM")
+        return True
+
+    def close(self) -> None:
+        self.flush_access()
+        with self._lock:
+            try:
+                # fold the WAL back into the main file so CI caches a single file
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except Exception:
+                pass
+            self._conn.close()
+
+# ---------- Process-wide store ----------
+_lock = threading.Lock()
+_store: Any = None
+_roots: Dict[str, Any] = {}   # stores opened for other roots (store_at), closed by close_all()
+
+def open_backend(kind: str, root: Path) -> Any:
+    if kind == "sqlite":
+        return SqliteBackend(Path(root) / SQLITE_NAME)
+    if kind == "files":
+        return FileBackend(Path(root))
+    raise ValueError(f"unknown CACHE_BACKEND: {kind!r} (expected 'files' or 'sqlite')")
+
+def store() -> Any:
+    global _store
+    s = _store
+    if s is not None:
+        return s
+    with _lock:
+        if _store is None:
+            _store = open_backend(CACHE_BACKEND, CACHE_ROOT)
+        return _store
+
+def store_at(root: Optional[Path] = None) -> Any:
+    """
+    The shared store for a cache root: the process-wide one for CACHE_ROOT,
+    otherwise one store per root, kept open until close_all().
+    """
+    if root is None or Path(root).resolve() == Path(CACHE_ROOT).resolve():
+        return store()
+    key = str(Path(root).resolve())
+    with _lock:
+        s = _roots.get(key)
+        if s is None:
+            Path(root).mkdir(parents=True, exist_ok=True)
+            s = _roots[key] = open_backend(CACHE_BACKEND, Path(root))
+        return s
+
+def configure(kind: Optional[str] = None, root: Optional[Path] = None) -> Any:
+    """Swap the process-wide store (benchmarks, migrations). Closes the previous one."""
+    global _store, CACHE_BACKEND, CACHE_ROOT
+    with _lock:
+        if _store is not None:
+            _store.close()
+        CACHE_BACKEND = (kind or CACHE_BACKEND).lower()
+        CACHE_ROOT = Path(root) if root is not None else CACHE_ROOT
+        _store = open_backend(CACHE_BACKEND, CACHE_ROOT)
+        return _store
+
+def close_all() -> None:
+    global _store
+    with _lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+        for s in _roots.values():
+            try:
+                s.close()
+            except Exception:
+                pass
+        _roots.clear()
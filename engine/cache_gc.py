@@ -0,0 +1,149 @@
+# engine/cache_gc.py
+"""
+Bounded cache store: per-namespace size quotas with age and LRU eviction.
+
+Per namespace, in order:
+  1. entries fetched more than max_age_days ago are dropped;
+  2. entries past their TTL that nobody has read for CACHE_GC_IDLE_DAYS are dropped;
+  3. while the namespace is over quota_mb, least recently accessed entries go.
+
+Expired-but-recently-used entries are kept on purpose: clients fall back to
+them when the API errors.
+
+  python -m engine.cache_gc              # collect and print the report
+  python -m engine.cache_gc --dry-run    # report what would be evicted
+
+The runner calls run() at the end of every run and stores the report in
+diag.json under "cache_gc". Quotas can be overridden per namespace with
+CACHE_QUOTA_MB_<NS> / CACHE_MAX_AGE_DAYS_<NS> (NS upper-cased, "/" -> "_",
+e.g. CACHE_QUOTA_MB_IMDB_TITLE).
+"""
+from __future__ import annotations
+import argparse, json, os, re, sys, time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from . import cache_backend
+
+def _bool(n: str, d: bool) -> bool:
+    v = (os.getenv(n, "") or "").strip().lower()
+    if v in {"1","true","yes","on"}: return True
+    if v in {"0","false","no","off"}: return False
+    return d
+def _float(n: str, d: float) -> float:
+    try: return float(os.getenv(n, "") or d)
+    except Exception: return d
+
+CACHE_GC           = _bool("CACHE_GC", True)
+CACHE_GC_IDLE_DAYS = _float("CACHE_GC_IDLE_DAYS", 30.0)
+
+@dataclass
+class Quota:
+    max_mb: float
+    max_age_days: float
+
+DEFAULT_QUOTAS: Dict[str, Quota] = {
+    "tmdb":          Quota(max_mb=512.0, max_age_days=180.0),
+    "imdb/title":    Quota(max_mb=128.0, max_age_days=120.0),
+    "imdb/keywords": Quota(max_mb=64.0,  max_age_days=120.0),
+    "omdb":          Quota(max_mb=64.0,  max_age_days=365.0),
+}
+
+def _env_suffix(ns: str) -> str:
+    return re.sub(r"[^A-Z0-9]+", "_", ns.upper()).strip("_")
+
+def quotas() -> Dict[str, Quota]:
+    out: Dict[str, Quota] = {}
+    for ns, q in DEFAULT_QUOTAS.items():
+        sfx = _env_suffix(ns)
+        out[ns] = Quota(max_mb=_float(f"CACHE_QUOTA_MB_{sfx}", q.max_mb),
+                        max_age_days=_float(f"CACHE_MAX_AGE_DAYS_{sfx}", q.max_age_days))
+    return out
+
+def _histogram(ages: List[float]) -> Dict[str, int]:
+    h = {label: 0 for label, _ in cache_backend.AGE_BUCKETS}
+    for a in ages:
+        h[cache_backend.age_bucket(a)] += 1
+    return h
+
+def _collect_ns(store: Any, ns: str, q: Quota, now: float, dry_run: bool) -> Dict[str, Any]:
+    infos = list(store.scan(ns))
+    bytes_before = sum(i.size for i in infos)
+    max_age_s = q.max_age_days * 86400.0
+    idle_s = CACHE_GC_IDLE_DAYS * 86400.0
+    evicted = {"max_age": 0, "expired_idle": 0, "quota": 0}
+    victims: List[str] = []
+    keep = []
+    for i in infos:
+        if max_age_s > 0 and now - i.fetched_at > max_age_s:
+            evicted["max_age"] += 1
+            victims.append(i.key)
+        elif i.expires_at is not None and i.expires_at < now and now - i.accessed_at > idle_s:
+            evicted["expired_idle"] += 1
+            victims.append(i.key)
+        else:
+            keep.append(i)
+
+    quota_bytes = int(q.max_mb * 1024 * 1024)
+    kept_bytes = sum(i.size for i in keep)
+    if quota_bytes > 0 and kept_bytes > quota_bytes:
+        keep.sort(key=lambda i: i.accessed_at)  # oldest access first
+        cut = 0
+        while cut < len(keep) and kept_bytes > quota_bytes:
+            kept_bytes -= keep[cut].size
+            victims.append(keep[cut].key)
+            cut += 1
+        evicted["quota"] = cut
+        keep = keep[cut:]
+
+    if victims and not dry_run:
+        store.delete_many(ns, victims)
+
+    return {
+        "entries_before": len(infos),
+        "bytes_before": bytes_before,
+        "entries": len(keep),
+        "bytes": kept_bytes,
+        "quota_bytes": quota_bytes,
+        "max_age_days": q.max_age_days,
+        "evicted": evicted,
+        "bytes_freed": bytes_before - kept_bytes,
+        "age_histogram": _histogram([now - i.fetched_at for i in keep]),
+        "idle_histogram": _histogram([now - i.accessed_at for i in keep]),
+        "hit_age_histogram": cache_backend.hit_ages().get(ns, {}),
+    }
+
+def collect(store: Any = None, limits: Optional[Dict[str, Quota]] = None, *,
+            now: Optional[float] = None, dry_run: bool = False) -> Dict[str, Any]:
+    store = store or cache_backend.store()
+    limits = limits if limits is not None else quotas()
+    now = now or time.time()
+    t0 = time.perf_counter()
+    report: Dict[str, Any] = {"backend": store.kind, "dry_run": dry_run, "namespaces": {}}
+    for ns, q in limits.items():
+        report["namespaces"][ns] = _collect_ns(store, ns, q, now, dry_run)
+    if not dry_run and hasattr(store, "compact"):
+        report["vacuumed"] = store.compact()
+    report["elapsed_s"] = round(time.perf_counter() - t0, 3)
+    return report
+
+def run() -> Dict[str, Any]:
+    """End-of-run hook for the runner: never raises, returns the report (or why it didn't run)."""
+    if not CACHE_GC:
+        return {"skipped": "CACHE_GC=false"}
+    try:
+        return collect()
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Evict aged/over-quota cache entries and report per-namespace usage")
+    ap.add_argument("--dry-run", action="store_true", help="report what would be evicted without deleting")
+    args = ap.parse_args(argv)
+    report = collect(dry_run=args.dry_run)
+    cache_backend.close_all()
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# engine/cache_keys.py
+"""
+Canonical cache keys for API responses.
+
+Every client that caches the same endpoint must land on the same entry, so a
+key is derived only from what identifies the resource:
+
+  GET api.themoviedb.org/3/movie/603?append_to_response=credits&language=en-US
+
+host + path (lower-cased host, no trailing slash) and the query parameters,
+merged with any already in the URL, sorted, None dropped, booleans spelled
+the way TMDB expects ("true"/"false"). Credentials and cache-busters
+(NON_SEMANTIC_PARAMS) never take part, so rotating an API key keeps the cache.
+"""
+from __future__ import annotations
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+NON_SEMANTIC_PARAMS = frozenset({"api_key", "apikey", "access_token", "session_id", "cb"})
+
+# Namespace every TMDB client stores its responses under.
+TMDB_NS = "tmdb"
+TMDB_API = "https://api.themoviedb.org/3"
+
+def _norm_value(v: Any) -> str:
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, (list, tuple)):
+        return ",".join(_norm_value(x) for x in v)
+    return str(v)
+
+def semantic_params(url: str, params: Optional[Dict[str, Any]] = None) -> List[Tuple[str, str]]:
+    parts = urlsplit(url)
+    merged: Dict[str, Any] = dict(parse_qsl(parts.query, keep_blank_values=True))
+    merged.update(params or {})
+    return sorted((str(k), _norm_value(v)) for k, v in merged.items()
+                  if v is not None and str(k).lower() not in NON_SEMANTIC_PARAMS)
+
+def canonical_request(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/") or "/"
+    query = "&".join(f"{k}={v}" for k, v in semantic_params(url, params))
+    return f"GET {parts.netloc.lower()}{path}" + (f"?{query}" if query else "")
+
+def canonical_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    return hashlib.sha256(canonical_request(url, params).encode("utf-8")).hexdigest()[:32]
+
+# Requests tools.tmdb_client sends, built here so engine.cache_migrate can
+# check its legacy-key mapping against them without importing tools.
+def tmdb_discover_request(kind: str, page: int, region: str,
+                          original_lang: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+    url = f"{TMDB_API}/discover/{'movie' if kind == 'movie' else 'tv'}"
+    params: Dict[str, Any] = {
+        "page": page,
+        "sort_by": "popularity.desc",
+        "include_adult": "false",
+        "watch_region": region or "US",
+    }
+    if original_lang:
+        params["with_original_language"] = original_lang  # ISO-639-1, e.g., 'en'
+    return url, params
+
+def tmdb_providers_request(kind: str, tmdb_id: int) -> Tuple[str, Dict[str, Any]]:
+    return f"{TMDB_API}/{kind}/{tmdb_id}/watch/providers", {}
@@ -0,0 +1,248 @@
+# engine/cache_migrate.py
+"""
+One-time import of the one-file-per-response cache directories into the
+single-file SQLite store.
+
+  python -m engine.cache_migrate                    # data/cache/{tmdb,imdb/*,omdb}
+  python -m engine.cache_migrate --ns tmdb --delete-source
+
+Namespaces are the directory paths relative to the cache root and keys are the
+file stems, so lookups from the converted clients land on the same entries,
+with their age, TTL, status and meta (validators, learned TTL) intact.
+Existing store entries that are newer than the file are left alone, which makes
+the migration safe to re-run.
+
+  python -m engine.cache_migrate --rekey
+
+moves TMDB entries written under the old per-client keys (engine.tmdb's
+url+params hash that included api_key, engine.cache's "<kind>_<sha1>" and
+tools.tmdb_client's file names) to their engine.cache_keys canonical key.
+Hashed keys cannot be reversed, so candidates are rebuilt from the titles in
+the pool and the latest enriched run; anything not found that way just ages
+out. engine.http's old discover keys carried a 15-minute cache-buster and are
+not worth carrying over. A finished rekey leaves a marker in the store and
+later runs return at once (--force re-runs it).
+"""
+from __future__ import annotations
+import argparse, hashlib, json, os, re, sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import cache_backend, cache_keys
+
+DEFAULT_NAMESPACES = ["tmdb", "imdb/title", "imdb/keywords", "omdb"]
+_BATCH = 500
+
+# Outside the cache_gc quota namespaces, so the marker is never evicted.
+_MARKER_NS = "migrations"
+_REKEY_MARKER = "tmdb_rekey"
+
+def migrate(root: Path, namespaces: List[str], *, delete_source: bool = False) -> Dict[str, Dict[str, int]]:
+    root = Path(root)
+    src = cache_backend.FileBackend(root)
+    dst = cache_backend.SqliteBackend(root / cache_backend.SQLITE_NAME)
+    report: Dict[str, Dict[str, int]] = {}
+    try:
+        for ns in namespaces:
+            counts = {"files": 0, "imported": 0, "skipped_newer": 0, "unreadable": 0}
+            d = root / ns
+            done: List[Path] = []
+            rows: list = []
+            for p in sorted(d.glob("*.json")) if d.is_dir() else []:
+                counts["files"] += 1
+                entry = src.get(ns, p.stem)
+                if entry is None:
+                    counts["unreadable"] += 1
+                    continue
+                have = dst.fetched_at(ns, p.stem)
+                if have is not None and have >= entry.fetched_at:
+                    counts["skipped_newer"] += 1
+                else:
+                    rows.append((ns, p.stem, entry.data, entry.fetched_at, entry.ttl_s, entry.status, entry.meta))
+                done.append(p)
+                if len(rows) >= _BATCH:
+                    counts["imported"] += dst.put_many(rows)
+                    rows = []
+            if rows:
+                counts["imported"] += dst.put_many(rows)
+            if delete_source:
+                for p in done:
+                    try: p.unlink()
+                    except FileNotFoundError: pass
+            report[ns] = counts
+    finally:
+        dst.close()
+    return report
+
+_TMDB_BASE = "https://api.themoviedb.org/3"
+_HYDRATE_APPEND = "credits,keywords,external_ids,watch/providers,content_ratings,release_dates"
+_TITLE_NAME = re.compile(r"^providers_(movie|tv)_(\d+)_([A-Za-z]+)$")
+_DISCOVER_NAME = re.compile(r"^discover_(movie|tv)_([A-Za-z-]+)_([A-Za-z]+)_p(\d+)$")
+
+Title = Tuple[str, int, str]   # (kind, tmdb_id, imdb_id or "")
+
+def _titles(paths: Iterable[Path]) -> List[Title]:
+    out = set()
+    for p in paths:
+        if not p.exists():
+            continue
+        try:
+            if p.suffix == ".jsonl":
+                rows = [json.loads(ln) for ln in p.read_text(encoding="utf-8").splitlines() if ln.strip()]
+            else:
+                rows = json.loads(p.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        for r in rows if isinstance(rows, list) else []:
+            if not isinstance(r, dict):
+                continue
+            kind = str(r.get("media_type") or r.get("type") or "").lower()
+            try:
+                tid = int(r.get("tmdb_id") or r.get("id") or 0)
+            except (TypeError, ValueError):
+                continue
+            if kind in {"movie", "tv"} and tid:
+                out.add((kind, tid, str(r.get("imdb_id") or "")))
+    return sorted(out)
+
+def _old_tmdb_key(url: str, params: Dict[str, Any]) -> str:
+    sig = json.dumps({"u": url, "p": params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(sig.encode("utf-8")).hexdigest()[:32]
+
+def _old_cache_key(kind: str, url: str, params: Dict[str, Any]) -> str:
+    blob = url + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params.keys()))
+    return f"{kind}_" + hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+def _legacy_requests(t: Title, api_key: str) -> Iterable[Tuple[str, str, Dict[str, Any]]]:
+    """(old key, url, params) for every request an old client may have cached for a title."""
+    kind, tid, imdb_id = t
+    base = f"{_TMDB_BASE}/{kind}/{tid}"
+    for url, params in (
+        (base, {"append_to_response": _HYDRATE_APPEND}),
+        (base, {"append_to_response": "content_ratings,release_dates"}),
+        (f"{base}/credits", {}),
+        (f"{base}/keywords", {}),
+        (f"{base}/external_ids", {}),
+        (f"{base}/watch/providers", {}),
+    ):
+        yield _old_tmdb_key(url, params), url, params
+        if api_key:
+            yield _old_tmdb_key(url, {**params, "api_key": api_key}), url, params
+    yield _old_cache_key("details", base, {"language": "en-US"}), base, {"language": "en-US"}
+    yield _old_cache_key("providers", f"{base}/watch/providers", {}), f"{base}/watch/providers", {}
+    if imdb_id:
+        url, params = f"{_TMDB_BASE}/find/{imdb_id}", {"external_source": "imdb_id", "language": "en-US"}
+        yield _old_cache_key("find", url, params), url, params
+
+def _named_request(key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """tools.tmdb_client file names -> (url, params)."""
+    m = _TITLE_NAME.match(key)
+    if m:
+        return f"{_TMDB_BASE}/{m.group(1)}/{m.group(2)}/watch/providers", {}
+    m = _DISCOVER_NAME.match(key)
+    if m:
+        kind, lang, region, page = m.groups()
+        params: Dict[str, Any] = {"page": int(page), "sort_by": "popularity.desc",
+                                  "include_adult": "false", "watch_region": region}
+        if lang != "any":
+            params["with_original_language"] = lang
+        return f"{_TMDB_BASE}/discover/{kind}", params
+    return None
+
+def check_roundtrip() -> List[str]:
+    """
+    Rebuild sample old keys and compare where they would move against the
+    requests the clients actually send (engine.tmdb, and the cache_keys
+    builders tools.tmdb_client uses).
+    Returns the mismatches; rekey() refuses to move anything while there are
+    any, since a wrong mapping strands entries under keys nothing reads.
+    """
+    from . import tmdb
+    bad: List[str] = []
+    def want(label: str, got: Optional[Tuple[str, Dict[str, Any]]], url: str, params: Dict[str, Any]) -> None:
+        if got is None or cache_keys.canonical_key(*got) != cache_keys.canonical_key(url, params):
+            bad.append(label)
+    for kind in ("movie", "tv"):
+        for lang in ("en", None):
+            name = f"discover_{kind}_{lang or 'any'}_US_p3"
+            want(name, _named_request(name), *cache_keys.tmdb_discover_request(kind, 3, "US", lang))
+        name = f"providers_{kind}_42_US"
+        want(name, _named_request(name), *cache_keys.tmdb_providers_request(kind, 42))
+        legacy = {cache_keys.canonical_key(url, params) for _, url, params in _legacy_requests((kind, 42, ""), "")}
+        for hydrate in (True, False):
+            url, params, _ = tmdb.title_request(kind, 42, hydrate=hydrate)
+            if cache_keys.canonical_key(url, params) not in legacy:
+                bad.append(f"{kind}/42 hydrate={hydrate}")
+    return bad
+
+def rekey(store: Any = None, titles: Optional[List[Title]] = None, *,
+          api_key: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+    store = store or cache_backend.store()
+    ns = cache_keys.TMDB_NS
+    if not force:
+        done = store.get(_MARKER_NS, _REKEY_MARKER)
+        if done is not None:
+            return {"skipped": "already rekeyed", "at": done.fetched_at}
+    if titles is None:
+        titles = _titles([Path("data/cache/pool/pool.jsonl"), Path("data/out/latest/items.enriched.json")])
+    api_key = (os.getenv("TMDB_API_KEY") or "").strip() if api_key is None else api_key
+    counts: Dict[str, Any] = {"titles": len(titles), "moved": 0, "kept_newer": 0}
+    bad = check_roundtrip()
+    if bad:
+        counts["refused"] = bad
+        return counts
+    old: List[str] = []
+
+    def move(key: str, url: str, params: Dict[str, Any]) -> None:
+        entry = store.get(ns, key)
+        if entry is None:
+            return
+        new = cache_keys.canonical_key(url, params)
+        if new == key:
+            return
+        have = store.get(ns, new)
+        if have is not None and have.fetched_at >= entry.fetched_at:
+            counts["kept_newer"] += 1
+        else:
+            meta = {**(entry.meta or {}), "req": cache_keys.canonical_request(url, params)}
+            store.put(ns, new, entry.data, fetched_at=entry.fetched_at, ttl_s=entry.ttl_s,
+                      status=entry.status, meta=meta)
+            counts["moved"] += 1
+        old.append(key)
+
+    for t in titles:
+        for key, url, params in _legacy_requests(t, api_key):
+            move(key, url, params)
+    for info in list(store.scan(ns)):
+        req = _named_request(info.key)
+        if req is not None:
+            move(info.key, *req)
+    if old:
+        store.delete_many(ns, old)
+    store.put(_MARKER_NS, _REKEY_MARKER, counts)
+    return counts
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Import per-file cache directories into cache.sqlite3")
+    ap.add_argument("--root", default=str(cache_backend.CACHE_ROOT), help="cache root (default: data/cache)")
+    ap.add_argument("--ns", action="append", default=None,
+                    help="namespace dir relative to root; repeatable (default: tmdb, imdb/title, imdb/keywords, omdb)")
+    ap.add_argument("--delete-source", action="store_true", help="remove files once they are in the store")
+    ap.add_argument("--rekey", action="store_true",
+                    help="move TMDB entries from old per-client keys to canonical keys (configured store)")
+    ap.add_argument("--force", action="store_true", help="with --rekey: run again even if already done")
+    args = ap.parse_args(argv)
+
+    if args.rekey:
+        report: Dict[str, Any] = {"tmdb": rekey(force=args.force)}
+        cache_backend.close_all()
+        if report["tmdb"].get("refused"):
+            print(f"[cache_migrate] rekey refused, old->new key mapping is off for: {report['tmdb']['refused']}",
+                  file=sys.stderr)
+    else:
+        report = migrate(Path(args.root), args.ns or DEFAULT_NAMESPACES, delete_source=args.delete_source)
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+# engine/cache_pack.py
+"""
+The whole data/cache tree as one indexed archive, so CI restores and saves a
+single large file instead of thousands of small ones.
+
+  python -m engine.cache_pack pack      # data/cache -> data/cache.pack
+  python -m engine.cache_pack unpack    # data/cache.pack -> data/cache
+  python -m engine.cache_pack ls        # index as JSON
+
+Layout: MAGIC, the member bodies back to back, a JSON index
+{relpath: {"off", "len", "size", "mtime", "z"}}, then a trailer with the
+index offset/length. PackReader only reads the trailer and index, then seeks
+straight to a member, so single files can be read in place without
+unpacking. Members are zlib-compressed unless they already are (.gz etc.).
+mtimes are restored on unpack: the files cache backend derives entry age
+from them. Files that already exist are left alone unless overwrite is set.
+"""
+from __future__ import annotations
+import argparse, json, os, sqlite3, struct, sys, time, zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+from . import cache_backend
+
+MAGIC = b"RCPACK1\n"
+_TRAILER = struct.Struct("<QQ8s")
+_TRAILER_MAGIC = b"RCPKEND\n"
+_CHUNK = 1 << 20
+_STORED_AS_IS = {".gz", ".zip", ".bz2", ".xz", ".zst", ".pack"}
+_SKIP_SUFFIXES = (".tmp", "-wal", "-shm", "-journal")
+
+DEFAULT_PACK = Path("data/cache.pack")
+
+def _checkpoint(root: Path) -> None:
+    # fold a leftover WAL into cache.sqlite3 so the packed file is complete
+    db = root / cache_backend.SQLITE_NAME
+    if not db.exists():
+        return
+    try:
+        conn = sqlite3.connect(str(db))
+        try: conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally: conn.close()
+    except sqlite3.Error:
+        pass
+
+def _members(root: Path, out: Path) -> List[Path]:
+    files = []
+    for p in sorted(root.rglob("*")):
+        if not p.is_file() or p.resolve() == out.resolve() or p.name.endswith(_SKIP_SUFFIXES):
+            continue
+        files.append(p)
+    return files
+
+def _copy(src: BinaryIO, dst: BinaryIO, compress: bool) -> int:
+    written = 0
+    z = zlib.compressobj(6) if compress else None
+    while True:
+        chunk = src.read(_CHUNK)
+        if not chunk:
+            break
+        if z is not None:
+            chunk = z.compress(chunk)
+        dst.write(chunk)
+        written += len(chunk)
+    if z is not None:
+        tail = z.flush()
+        dst.write(tail)
+        written += len(tail)
+    return written
+
+def pack(root: Path, out: Path) -> Dict[str, Any]:
+    root, out = Path(root), Path(out)
+    t0 = time.perf_counter()
+    _checkpoint(root)
+    index: Dict[str, Dict[str, Any]] = {}
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    size = 0
+    with tmp.open("wb") as fh:
+        fh.write(MAGIC)
+        for p in _members(root, out) if root.is_dir() else []:
+            try:
+                st = p.stat()
+                with p.open("rb") as src:
+                    z = p.suffix.lower() not in _STORED_AS_IS
+                    off = fh.tell()
+                    n = _copy(src, fh, z)
+            except OSError:
+                continue
+            index[p.relative_to(root).as_posix()] = {"off": off, "len": n, "size": st.st_size,
+                                                     "mtime": st.st_mtime, "z": z}
+            size += st.st_size
+        idx_off = fh.tell()
+        blob = json.dumps({"version": 1, "created": time.time(), "files": index},
+                          separators=(",", ":")).encode("utf-8")
+        fh.write(blob)
+        fh.write(_TRAILER.pack(idx_off, len(blob), _TRAILER_MAGIC))
+    tmp.replace(out)
+    return {"files": len(index), "bytes_in": size, "bytes_out": out.stat().st_size,
+            "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+class PackReader:
+    """Random access to the members of a cache pack."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._fh = self.path.open("rb")
+        if self._fh.read(len(MAGIC)) != MAGIC:
+            self._fh.close()
+            raise ValueError(f"{self.path}: not a cache pack")
+        self._fh.seek(-_TRAILER.size, os.SEEK_END)
+        idx_off, idx_len, magic = _TRAILER.unpack(self._fh.read(_TRAILER.size))
+        if magic != _TRAILER_MAGIC:
+            self._fh.close()
+            raise ValueError(f"{self.path}: truncated cache pack")
+        self._fh.seek(idx_off)
+        self.index: Dict[str, Dict[str, Any]] = json.loads(self._fh.read(idx_len))["files"]
+
+    def names(self) -> List[str]:
+        return list(self.index)
+
+    def _chunks(self, name: str) -> Iterator[bytes]:
+        m = self.index[name]
+        self._fh.seek(m["off"])
+        left = int(m["len"])
+        z = zlib.decompressobj() if m.get("z") else None
+        while left > 0:
+            chunk = self._fh.read(min(_CHUNK, left))
+            if not chunk:
+                raise ValueError(f"{self.path}: member {name} is truncated")
+            left -= len(chunk)
+            yield z.decompress(chunk) if z is not None else chunk
+        if z is not None:
+            yield z.flush()
+
+    def read(self, name: str) -> bytes:
+        return b"".join(self._chunks(name))
+
+    def extract(self, name: str, dest: Path) -> None:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f"{dest.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as fh:
+            for chunk in self._chunks(name):
+                fh.write(chunk)
+        mtime = float(self.index[name].get("mtime") or time.time())
+        os.utime(tmp, (mtime, mtime))
+        tmp.replace(dest)
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "PackReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+def unpack(path: Path, root: Path, *, overwrite: bool = False) -> Dict[str, Any]:
+    root = Path(root)
+    t0 = time.perf_counter()
+    counts = {"files": 0, "extracted": 0, "kept_existing": 0, "bytes": 0}
+    with PackReader(path) as pk:
+        for name in pk.names():
+            counts["files"] += 1
+            dest = root / name
+            if ".." in Path(name).parts or Path(name).is_absolute():
+                continue
+            if dest.exists() and not overwrite:
+                counts["kept_existing"] += 1
+                continue
+            pk.extract(name, dest)
+            counts["extracted"] += 1
+            counts["bytes"] += int(pk.index[name].get("size") or 0)
+    counts["elapsed_s"] = round(time.perf_counter() - t0, 3)
+    return counts
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Pack data/cache into one indexed archive, or unpack it")
+    ap.add_argument("cmd", choices=["pack", "unpack", "ls"])
+    ap.add_argument("--root", default=str(cache_backend.CACHE_ROOT), help="cache root (default: data/cache)")
+    ap.add_argument("--pack", default=str(DEFAULT_PACK), help="archive path (default: data/cache.pack)")
+    ap.add_argument("--overwrite", action="store_true", help="unpack over files that already exist")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "pack":
+        report: Dict[str, Any] = pack(Path(args.root), Path(args.pack))
+    elif not Path(args.pack).exists():
+        report = {"skipped": f"{args.pack} not found"}
+    elif args.cmd == "unpack":
+        report = unpack(Path(args.pack), Path(args.root), overwrite=args.overwrite)
+    else:
+        with PackReader(Path(args.pack)) as pk:
+            report = pk.index
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
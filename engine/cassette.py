@@ -0,0 +1,220 @@
+# engine/cassette.py
+"""
+Record/replay of outbound HTTP for deterministic, network-free runs.
+
+  HTTP_CASSETTE=data/cassettes/nightly.ndjson.gz HTTP_CASSETTE_MODE=record python -m engine.runner
+  HTTP_CASSETTE=data/cassettes/nightly.ndjson.gz python -m engine.runner          # replay
+
+Every request made through engine.sessions.get (TMDB, IMDb, OMDb clients) is
+keyed by its engine.cache_keys canonical request -- credentials excluded, so a
+replay needs no API keys -- plus whether it carried validators. A cassette is
+gzipped NDJSON, one response per line; repeated requests are answered in
+recorded order and the last answer repeats. A request missing from the
+cassette raises CassetteMiss (a ConnectionError), like a dead network.
+
+Replay knobs:
+  HTTP_CASSETTE_LATENCY  none | recorded | <ms>      per-response delay
+  HTTP_CASSETTE_LATENCY_SCALE                        multiplier for the above
+  HTTP_CASSETTE_ERRORS   e.g. "timeout:0.02,429:0.05,503:0.01" -- injected
+                         failure probabilities per request
+  HTTP_CASSETTE_SEED     seed for the injected errors
+"""
+from __future__ import annotations
+import atexit, base64, gzip, json, os, random, threading, time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import cache_keys
+
+def _int(n: str, d: int) -> int:
+    try: return int(os.getenv(n, "") or d)
+    except Exception: return d
+def _float(n: str, d: float) -> float:
+    try: return float(os.getenv(n, "") or d)
+    except Exception: return d
+
+HTTP_CASSETTE               = (os.getenv("HTTP_CASSETTE", "") or "").strip()
+HTTP_CASSETTE_MODE          = (os.getenv("HTTP_CASSETTE_MODE", "replay") or "replay").strip().lower()
+HTTP_CASSETTE_LATENCY       = (os.getenv("HTTP_CASSETTE_LATENCY", "none") or "none").strip().lower()
+HTTP_CASSETTE_LATENCY_SCALE = _float("HTTP_CASSETTE_LATENCY_SCALE", 1.0)
+HTTP_CASSETTE_ERRORS        = (os.getenv("HTTP_CASSETTE_ERRORS", "") or "").strip()
+HTTP_CASSETTE_SEED          = _int("HTTP_CASSETTE_SEED", 0)
+
+# the headers clients look at; the body is stored already decoded
+_KEEP_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+class CassetteMiss(requests.ConnectionError):
+    """Replay found no recorded response for the request."""
+
+def request_key(url: str, kwargs: Dict[str, Any]) -> str:
+    key = cache_keys.canonical_request(url, kwargs.get("params"))
+    headers = kwargs.get("headers") or {}
+    if any(h in headers for h in ("If-None-Match", "If-Modified-Since")):
+        key += " [conditional]"
+    return key
+
+def parse_errors(spec: str) -> List[Tuple[str, float]]:
+    out: List[Tuple[str, float]] = []
+    for part in (spec or "").split(","):
+        name, _, p = part.strip().partition(":")
+        try:
+            if name and float(p) > 0:
+                out.append((name.strip().lower(), float(p)))
+        except ValueError:
+            continue
+    return out
+
+def _response(url: str, rec: Dict[str, Any]) -> requests.Response:
+    r = requests.Response()
+    r.status_code = int(rec.get("status") or 200)
+    r.headers = CaseInsensitiveDict(rec.get("headers") or {})
+    body = rec.get("body") or ""
+    r._content = base64.b64decode(body) if rec.get("b64") else body.encode("utf-8")
+    r.encoding = "utf-8"
+    r.url = url
+    r.reason = "Replayed"
+    return r
+
+class Cassette:
+    def __init__(self, path: str, mode: str, *, latency: str = HTTP_CASSETTE_LATENCY,
+                 latency_scale: float = HTTP_CASSETTE_LATENCY_SCALE,
+                 errors: str = HTTP_CASSETTE_ERRORS, seed: int = HTTP_CASSETTE_SEED) -> None:
+        if mode not in {"record", "replay"}:
+            raise ValueError(f"unknown HTTP_CASSETTE_MODE: {mode!r} (expected 'record' or 'replay')")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.errors = parse_errors(errors)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tape: Dict[str, List[Dict[str, Any]]] = {}
+        self._pos: Dict[str, int] = {}
+        self._out: Any = None
+        self.counts: Dict[str, int] = {"recorded": 0, "replayed": 0, "misses": 0}
+        self.injected: Dict[str, int] = {}
+        if mode == "replay":
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                if "req" in rec:
+                    self._tape.setdefault(rec["req"], []).append(rec)
+
+    def wrap(self, send: Callable[..., requests.Response]) -> Callable[..., requests.Response]:
+        """send (a Session.get) recorded to, or replaced by, the cassette."""
+        def call(url: str, **kwargs: Any) -> requests.Response:
+            if self.recording:
+                t0 = time.perf_counter()
+                r = send(url, **kwargs)
+                self._record(request_key(url, kwargs), r, (time.perf_counter() - t0) * 1000.0)
+                return r
+            return self._replay(url, kwargs)
+        return call
+
+    def _record(self, key: str, r: requests.Response, ms: float) -> None:
+        body = r.content or b""
+        ctype = (r.headers.get("Content-Type") or "").lower()
+        textual = "json" in ctype or "text" in ctype or "xml" in ctype
+        rec = {"req": key, "status": r.status_code, "ms": round(ms, 1),
+               "headers": {h: r.headers[h] for h in _KEEP_HEADERS if h in r.headers}}
+        try:
+            rec["body"] = body.decode("utf-8") if textual else base64.b64encode(body).decode("ascii")
+            rec["b64"] = not textual
+        except UnicodeDecodeError:
+            rec["body"], rec["b64"] = base64.b64encode(body).decode("ascii"), True
+        line = json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._out is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._out = gzip.open(self.path, "wt", encoding="utf-8")
+                self._out.write(json.dumps({"cassette": 1, "created": time.time()}) + "\n")
+            self._out.write(line)
+            self.counts["recorded"] += 1
+
+    def _inject(self) -> Optional[str]:
+        with self._lock:
+            for name, p in self.errors:
+                if self._rng.random() < p:
+                    self.injected[name] = self.injected.get(name, 0) + 1
+                    return name
+        return None
+
+    def _delay(self, rec: Optional[Dict[str, Any]]) -> None:
+        if self.latency == "none":
+            return
+        if self.latency == "recorded":
+            ms = float((rec or {}).get("ms") or 0.0)
+        else:
+            try: ms = float(self.latency)
+            except ValueError: ms = 0.0
+        if ms > 0:
+            time.sleep(ms * self.latency_scale / 1000.0)
+
+    def _replay(self, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        key = request_key(url, kwargs)
+        with self._lock:
+            recs = self._tape.get(key)
+            if recs:
+                i = self._pos.get(key, 0)
+                self._pos[key] = i + 1
+                rec = recs[min(i, len(recs) - 1)]
+                self.counts["replayed"] += 1
+            else:
+                rec = None
+                self.counts["misses"] += 1
+        self._delay(rec)
+        fault = self._inject()
+        if fault == "timeout":
+            raise requests.Timeout(f"cassette: injected timeout for {key}")
+        if fault is not None and fault.isdigit():
+            return _response(url, {"status": int(fault), "headers": {"Retry-After": "1"}, "body": ""})
+        if rec is None:
+            raise CassetteMiss(f"cassette: no recording for {key}")
+        return _response(url, rec)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"path": self.path, "mode": self.mode, **self.counts,
+                    "injected": dict(self.injected), "latency": self.latency}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._out is not None:
+                self._out.close()
+                self._out = None
+
+_active: Optional[Cassette] = None
+_active_lock = threading.Lock()
+_loaded = False
+
+def active() -> Optional[Cassette]:
+    """The cassette configured by HTTP_CASSETTE, or None."""
+    global _active, _loaded
+    if _loaded:
+        return _active
+    with _active_lock:
+        if not _loaded:
+            if HTTP_CASSETTE:
+                _active = Cassette(HTTP_CASSETTE, HTTP_CASSETTE_MODE)
+                atexit.register(_active.close)
+            _loaded = True
+    return _active
+
+def stats() -> Dict[str, Any]:
+    tape = _active
+    return tape.stats() if tape is not None else {"enabled": False}
+
+def close() -> None:
+    if _active is not None:
+        _active.close()
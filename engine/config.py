@@ -22,11 +22,13 @@ class Config:
     original_langs: List[str] = None
     subs_include: List[str] = None
 
-    # Page & rate limits (kept intentionally small)
+    # Page & rate limits
     discover_pages_movie: int = 10
     discover_pages_tv: int = 10
-    tmdb_concurrency: int = 2
-    tmdb_min_delay_s: float = 0.20  # ~5 req/sec cap across the job
+    # Enforced per host by engine.ratelimit: the token bucket refills at
+    # 1/tmdb_min_delay_s and concurrency adapts between 1 and TMDB_MAX_CONCURRENCY.
+    tmdb_concurrency: int = 4
+    tmdb_min_delay_s: float = 0.025  # ~40 req/sec, TMDB's documented ceiling
 
     # Personalization / ranking
     ratings_csv: str = "data/ratings.csv"
@@ -82,8 +84,8 @@ def load_config() -> Config:
     w_c = float(os.getenv("WEIGHT_CRITIC", "0.20"))
     w_a = float(os.getenv("WEIGHT_AUDIENCE", "0.50"))
 
-    conc = int(os.getenv("TMDB_CONCURRENCY", "2"))
-    delay = float(os.getenv("TMDB_MIN_DELAY_S", "0.20"))
+    conc = int(os.getenv("TMDB_CONCURRENCY", str(Config.tmdb_concurrency)))
+    delay = float(os.getenv("TMDB_MIN_DELAY_S", str(Config.tmdb_min_delay_s)))
 
     cfg = Config(
         tmdb_api_key=api,
@@ -29,6 +29,12 @@ def make_debug_zip():
                   OUT_DIR / "summary.md"):
             add_safe(p)
 
+        # Per-stage cProfile / tracemalloc output (ENGINE_PROFILE)
+        profile_dir = OUT_DIR / "profile"
+        if profile_dir.exists():
+            for p in sorted(profile_dir.iterdir()):
+                add_safe(p)
+
         # Caches & state
         state_dir = ROOT / "data" / "cache" / "state"
         for p in state_dir.glob("*.json"):
@@ -3,12 +3,15 @@ from __future__ import annotations
 import argparse
 import json
 import os
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 from difflib import SequenceMatcher
 
 from . import tmdb
+from . import trace
 
 def _bool(n: str, d: bool) -> bool:
     v = (os.getenv(n, "") or "").strip().lower()
@@ -26,6 +29,8 @@ SEARCH_MULTI_TITLE_SIM_TH    = float(os.getenv("SEARCH_MULTI_TITLE_SIM_TH", "0.6
 SEARCH_MULTI_YEAR_WEIGHT     = float(os.getenv("SEARCH_MULTI_YEAR_WEIGHT", "0.35") or 0.35)
 SEARCH_MULTI_TYPE_BONUS      = float(os.getenv("SEARCH_MULTI_TYPE_BONUS", "0.25") or 0.25)
 ENRICH_SCORING_TOP_N         = _int("ENRICH_SCORING_TOP_N", 220)
+ENRICH_WORKERS               = max(1, _int("ENRICH_WORKERS", 4))
+ENRICH_HYDRATE               = _bool("ENRICH_HYDRATE", True)
 
 @dataclass
 class Telemetry:
@@ -39,6 +44,18 @@ class Telemetry:
     used_search_multi: int = 0
     search_multi_no_match: int = 0
     empty_after_all: int = 0
+    workers: int = 1
+    elapsed_s: float = 0.0
+    items_per_s: float = 0.0
+
+    def merge(self, other: "Telemetry") -> None:
+        # per-item counters are summed; run-level fields are owned by enrich_items
+        for f in fields(self):
+            if f.name in _RUN_LEVEL_FIELDS:
+                continue
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+_RUN_LEVEL_FIELDS = {"items_in", "items_out", "workers", "elapsed_s", "items_per_s"}
 
 def _title_sim(a: str, b: str) -> float:
     return SequenceMatcher(None, a.lower().strip(), b.lower().strip()).ratio()
@@ -81,6 +98,18 @@ def _apply_details(mt: str, base: Dict[str, Any], details: Dict[str, Any]) -> No
         if k in {"title","name"} and base.get(k): continue
         base[k] = v
 
+def _fetch_title(mt: str, tmdb_id: int) -> Dict[str, Any]:
+    # one append_to_response call when hydrating; otherwise details only and
+    # the remaining parts are fetched per endpoint by _part()
+    if ENRICH_HYDRATE:
+        return tmdb.get_title_bundle(mt, tmdb_id, region=REGION)
+    return {"details": tmdb.get_details(mt, tmdb_id)}
+
+def _part(bundle: Dict[str, Any], name: str, fetch) -> Any:
+    if name in bundle:
+        return bundle[name]
+    return fetch()
+
 def _enrich_one(item: Dict[str, Any], tel: Telemetry) -> Optional[Dict[str, Any]]:
     it = dict(item)
     mt = (it.get("media_type") or it.get("type") or "movie").lower()
@@ -91,9 +120,11 @@ def _enrich_one(item: Dict[str, Any], tel: Telemetry) -> Optional[Dict[str, Any]
     title   = it.get("title") or it.get("name") or ""
     _, year = _pick_title_year(mt, it)
 
+    bundle: Dict[str, Any] = {}
     details = {}
     if tmdb_id:
-        details = tmdb.get_details(mt, int(tmdb_id))
+        bundle = _fetch_title(mt, int(tmdb_id))
+        details = bundle.get("details") or {}
         if details: tel.details_ok += 1
 
     need_search = (SEARCH_MULTI_ON_MISSING_ID and not tmdb_id) or (SEARCH_MULTI_ON_EMPTY_DETAILS and not details)
@@ -108,7 +139,8 @@ def _enrich_one(item: Dict[str, Any], tel: Telemetry) -> Optional[Dict[str, Any]
             b_title, b_year = _pick_title_year(mt, best)
             if b_title: it.setdefault("title", b_title)
             if b_year and not it.get("year"): it["year"] = b_year
-            details = tmdb.get_details(mt, int(tmdb_id))
+            bundle = _fetch_title(mt, int(tmdb_id))
+            details = bundle.get("details") or {}
             if details: tel.details_ok += 1
             tel.used_search_multi += 1
         else:
@@ -119,32 +151,34 @@ def _enrich_one(item: Dict[str, Any], tel: Telemetry) -> Optional[Dict[str, Any]
         return None
 
     _apply_details(mt, it, details)
+    tid = int(tmdb_id)
 
     try:
-        credits = tmdb.get_credits(mt, int(tmdb_id))
+        credits = _part(bundle, "credits", lambda: tmdb.get_credits(mt, tid))
         if credits:
             it.update({k: v for k, v in credits.items() if v})
             tel.credits_ok += 1
     except Exception: pass
 
     try:
-        kws = tmdb.get_keywords(mt, int(tmdb_id))
+        kws = _part(bundle, "keywords", lambda: tmdb.get_keywords(mt, tid))
         if kws:
             it["keywords"] = kws
             tel.keywords_ok += 1
     except Exception: pass
 
     try:
-        ex = tmdb.get_external_ids(mt, int(tmdb_id))
+        ex = _part(bundle, "external_ids", lambda: tmdb.get_external_ids(mt, tid))
         if ex:
             it.update(ex)
             tel.externals_ok += 1
     except Exception: pass
 
     try:
-        provs = tmdb.get_title_watch_providers(mt, int(tmdb_id), region=REGION)
+        provs = _part(bundle, "providers", lambda: tmdb.get_title_watch_providers(mt, tid, region=REGION))
+        # keep an empty list too: it tells summarize the lookup already happened
+        it["providers"] = provs or []
         if provs:
-            it["providers"] = provs
             tel.providers_ok += 1
     except Exception: pass
 
@@ -154,12 +188,36 @@ def _enrich_one(item: Dict[str, Any], tel: Telemetry) -> Optional[Dict[str, Any]
         if y: it["year"] = y
     return it
 
-def enrich_items(items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Telemetry]:
-    tel = Telemetry(items_in=len(items))
-    out: List[Dict[str, Any]] = []
+def _enrich_one_isolated(item: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Telemetry]:
+    # each call counts into its own Telemetry so workers never share counters
+    tel = Telemetry()
+    with trace.span("enrich_one", "enrich", tmdb_id=item.get("tmdb_id") or item.get("id"),
+                    title=item.get("title") or item.get("name")) as span_args:
+        out = _enrich_one(item, tel)
+        span_args["ok"] = out is not None
+    return out, tel
+
+def enrich_items(items: List[Dict[str, Any]], workers: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Telemetry]:
+    """
+    Enrich up to ENRICH_SCORING_TOP_N items. With workers > 1 the per-title TMDB
+    calls run on a bounded thread pool; output keeps the input order either way.
+    """
+    n_workers = max(1, int(workers or ENRICH_WORKERS))
+    tel = Telemetry(items_in=len(items), workers=n_workers)
     work = items[:ENRICH_SCORING_TOP_N] if ENRICH_SCORING_TOP_N > 0 else items
-    for it in work:
-        e = _enrich_one(it, tel)
+    t0 = time.perf_counter()
+    if n_workers == 1 or len(work) <= 1:
+        results = [_enrich_one_isolated(it) for it in work]
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="enrich") as ex:
+            results = list(ex.map(_enrich_one_isolated, work))
+    elapsed = time.perf_counter() - t0
+    tel.elapsed_s = round(elapsed, 3)
+    tel.items_per_s = round(len(work) / elapsed, 2) if elapsed > 0 else 0.0
+
+    out: List[Dict[str, Any]] = []
+    for e, item_tel in results:
+        tel.merge(item_tel)
         if e: out.append(e)
     tel.items_out = len(out)
     return out, tel
@@ -189,13 +247,16 @@ def _append_tel_to_diag(run_dir: Path, tel: Telemetry) -> None:
         "enrich_used_search_multi": tel.used_search_multi,
         "enrich_search_multi_no_match": tel.search_multi_no_match,
         "enrich_empty_after_all": tel.empty_after_all,
+        "enrich_workers": tel.workers,
+        "enrich_elapsed_s": tel.elapsed_s,
+        "enrich_items_per_s": tel.items_per_s,
     })
     diag["counts"] = counts
     _write_json(diag_path, diag)
 
-def write_enriched(*, items_in_path: Path, out_path: Path, run_dir: Optional[Path] = None) -> Path:
+def write_enriched(*, items_in_path: Path, out_path: Path, run_dir: Optional[Path] = None, workers: Optional[int] = None) -> Path:
     raw = _read_json(items_in_path) or []
-    enriched, tel = enrich_items(list(raw))
+    enriched, tel = enrich_items(list(raw), workers=workers)
     _write_json(out_path, enriched)
     if run_dir:
         _append_tel_to_diag(run_dir, tel)
@@ -207,12 +268,14 @@ def _parse_args():
     ap.add_argument("--in", dest="inp", required=True, help="items.discovered.json")
     ap.add_argument("--out", dest="out", required=True, help="items.enriched.json")
     ap.add_argument("--run-dir", dest="run_dir", default=None, help="run directory for diag.json")
+    ap.add_argument("--workers", dest="workers", type=int, default=None, help="enrichment worker threads (default ENRICH_WORKERS)")
     return ap.parse_args()
 
 def main():
     args = _parse_args()
     run_dir = Path(args.run_dir) if args.run_dir else None
-    write_enriched(items_in_path=Path(args.inp), out_path=Path(args.out), run_dir=run_dir)
+    write_enriched(items_in_path=Path(args.inp), out_path=Path(args.out), run_dir=run_dir, workers=args.workers)
+    tmdb.drain_refreshes()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,45 +1,37 @@
-import hashlib
-import json
 import os
-import time
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 
-import requests
+from . import cache_backend
+from . import cache_keys
+from . import sessions
 
 JSON = Dict[str, Any]
 
 class DiskCache:
-    def __init__(self, root: str):
-        self.root = Path(root)
-        self.root.mkdir(parents=True, exist_ok=True)
-
-    def _path_for(self, group: str, key: str) -> Path:
-        h = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
-        p = self.root / group
-        p.mkdir(parents=True, exist_ok=True)
-        return p / f"{h}.json"
-
-    def get(self, group: str, key: str, ttl_min: int) -> Optional[JSON]:
-        path = self._path_for(group, key)
-        if not path.exists():
-            return None
+    """
+    TTL'd view over the cache store. Without a root (or with the store's own
+    root) it is the process-wide engine.cache_backend store, shared with the
+    other TMDB clients; keys are engine.cache_keys canonical keys.
+    """
+    def __init__(self, root: Optional[str] = None):
+        self.store = cache_backend.store_at(Path(root) if root is not None else None)
+
+    def get(self, ns: str, key: str, ttl_min: int) -> Optional[JSON]:
         try:
-            with path.open("r", encoding="utf-8") as f:
-                payload = json.load(f)
-            fetched_at = payload.get("_fetched_ts", 0)
-            age_min = (time.time() - fetched_at) / 60.0
-            if age_min <= ttl_min:
-                return payload.get("data")
-            return None
+            entry = self.store.get(ns, key)
         except Exception:
             return None
+        # meta["proj"]: a trimmed engine.tmdb projection, not the full response
+        if entry is None or entry.status != "ok" or entry.meta.get("proj"):
+            return None
+        if entry.age() / 60.0 <= ttl_min:
+            cache_backend.note_hit(ns, entry.age())
+            return entry.data
+        return None
 
-    def put(self, group: str, key: str, data: JSON) -> None:
-        path = self._path_for(group, key)
-        payload = {"_fetched_ts": time.time(), "data": data}
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False)
+    def put(self, ns: str, key: str, data: JSON, ttl_min: int = 0) -> None:
+        self.store.put(ns, key, data, ttl_s=ttl_min * 60 if ttl_min else None)
 
 class TMDB:
     def __init__(self, api_key: str, region: str, language: str, cache: Optional[DiskCache]):
@@ -49,28 +41,27 @@ class TMDB:
         self.cache = cache
         self.base = "https://api.themoviedb.org/3"
 
-    def _mk_key(self, path: str, params: Dict[str, Any]) -> str:
-        items = sorted((k, "" if v is None else str(v)) for k, v in params.items())
-        return f"{path}?{items}"
-
     def _get(self, path: str, params: Dict[str, Any],
              cache_group: Optional[str] = None,
              ttl_min: int = 0) -> JSON:
+        # cache_group only switches caching on; entries live in the shared tmdb
+        # namespace under the canonical key (api_key and the "cb" buster excluded)
+        url = f"{self.base}{path}"
+        key = cache_keys.canonical_key(url, params)
         params = {**params, "api_key": self.api_key}
-        key = self._mk_key(path, params)
 
         if cache_group and self.cache:
-            cached = self.cache.get(cache_group, key, ttl_min)
+            # offline: any age will do
+            cached = self.cache.get(cache_keys.TMDB_NS, key, 10**9 if sessions.ENGINE_OFFLINE else ttl_min)
             if cached is not None:
                 return cached
 
-        url = f"{self.base}{path}"
-        r = requests.get(url, params=params, timeout=20)
+        r = sessions.get(url, params=params, timeout=20)
         r.raise_for_status()
         data = r.json()
 
         if cache_group and self.cache:
-            self.cache.put(cache_group, key, data)
+            self.cache.put(cache_keys.TMDB_NS, key, data, ttl_min)
         return data
 
     def providers_map(self, country: str, cache_ttl_min: int = 10080) -> Dict[str, int]:
@@ -1,6 +1,8 @@
 # engine/imdb_bulk.py
 from __future__ import annotations
-import csv, gzip, io, os, pathlib, time, requests
+import csv, gzip, io, os, pathlib, time
+
+from . import sessions
 
 IMDB_BASE = "https://datasets.imdbws.com"
 CACHE = pathlib.Path("data/cache/imdb")
@@ -17,7 +19,7 @@ def _fresh(p: pathlib.Path, ttl_h: int) -> bool:
         return False
 
 def _dl(url: str, dest: pathlib.Path):
-    r = requests.get(url, timeout=60)
+    r = sessions.get(url, timeout=60)
     r.raise_for_status()
     dest.write_bytes(r.content)
 
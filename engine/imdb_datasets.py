@@ -1,9 +1,11 @@
 # engine/imdb_datasets.py
 from __future__ import annotations
-import csv, gzip, io, os, time, pathlib, typing, hashlib, requests
+import csv, gzip, io, os, time, pathlib, typing, hashlib
 from typing import Dict, Optional, Tuple, List
 from rich import print as rprint
 
+from . import sessions
+
 # IMDb official weekly dumps (no key needed)
 _BASICS_URL  = "https://datasets.imdbws.com/title.basics.tsv.gz"
 _RATINGS_URL = "https://datasets.imdbws.com/title.ratings.tsv.gz"
@@ -25,11 +27,11 @@ def _download(url: str, name: str, ttl_days: int) -> bytes:
     Returns the raw bytes (still gzipped).
     """
     gz_path = _path(name)
-    if _fresh(gz_path, ttl_days):
+    if _fresh(gz_path, ttl_days) or (sessions.ENGINE_OFFLINE and gz_path.exists()):
         return gz_path.read_bytes()
 
     rprint(f"[cyan][IMDb TSV] GET {url}[/cyan]")
-    r = requests.get(url, timeout=60)
+    r = sessions.get(url, timeout=60)
     r.raise_for_status()
     gz_path.write_bytes(r.content)
     return r.content
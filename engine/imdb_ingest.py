@@ -2,9 +2,10 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import List, Optional
-import requests
 from bs4 import BeautifulSoup
 
+from . import sessions
+
 @dataclass
 class IMDbItem:
     title: str
@@ -21,15 +22,14 @@ def scrape_imdb_ratings(url: str, max_pages: int = 20, timeout: int = 20) -> Lis
     seen_pages = 0
     next_url = url
 
-    session = requests.Session()
-    session.headers.update({
+    headers = {
         "User-Agent": "Mozilla/5.0 (compatible; imdb-recos/1.0)",
         "Accept-Language": "en-US,en;q=0.8",
-    })
+    }
 
     while next_url and seen_pages < max_pages:
         seen_pages += 1
-        r = session.get(next_url, timeout=timeout)
+        r = sessions.get(next_url, headers=headers, timeout=timeout)
         r.raise_for_status()
         soup = BeautifulSoup(r.text, "lxml")
 
@@ -7,6 +7,8 @@ from pathlib import Path
 import requests
 from bs4 import BeautifulSoup
 
+from . import sessions
+
 # ---------- Config ----------
 UA = os.getenv("IMDB_PUBLIC_UA", "Mozilla/5.0 (compatible; RecoBot/1.0)")
 BASE = "https://www.imdb.com"
@@ -21,7 +23,8 @@ def _read_cache(user_id: str) -> Optional[dict]:
     p = _cache_path(user_id)
     if not p.exists(): return None
     try:
-        if time.time() - p.stat().st_mtime > TTL_SECONDS:
+        # offline, an expired copy still beats an empty seen list
+        if time.time() - p.stat().st_mtime > TTL_SECONDS and not sessions.ENGINE_OFFLINE:
             return None
         return json.loads(p.read_text(encoding="utf-8"))
     except Exception:
@@ -39,19 +42,13 @@ def _norm_title(s: str) -> str:
     return re.sub(r"[^a-z0-9]+", " ", (s or "").strip().lower()).strip()
 
 def _get(url: str) -> Optional[str]:
-    for attempt in range(3):
-        try:
-            r = requests.get(url, headers={"User-Agent": UA, "Accept": "text/html"}, timeout=20)
-            if r.status_code in (429, 503):
-                time.sleep(0.6 + 0.6 * attempt)
-                continue
-            r.raise_for_status()
-            return r.text
-        except requests.RequestException:
-            if attempt == 2:
-                return None
-            time.sleep(0.4 + 0.4 * attempt)
-    return None
+    # 429/503 and connection failures are retried by sessions.get
+    try:
+        r = sessions.get(url, headers={"User-Agent": UA, "Accept": "text/html"}, timeout=20)
+        r.raise_for_status()
+        return r.text
+    except requests.RequestException:
+        return None
 
 _TCONST_RX = re.compile(r"/title/(tt\d+)/")
 _YEAR_RX   = re.compile(r"\b(19|20)\d{2}\b")
@@ -133,6 +130,12 @@ def fetch_user_ratings(user_id: str, *, public_url: Optional[str] = None, max_pa
         if cached is not None:
             return cached
 
+    if sessions.ENGINE_OFFLINE:
+        # nothing to fetch from; the cache was checked above (whatever its age)
+        cached = _read_cache(user_id or "url")
+        sessions.note_offline("imdb_public", stale=cached is not None)
+        return cached or {"user_id": user_id or "(url)", "pages_fetched": 0, "imdb_ids": [], "title_year_keys": []}
+
     url = _start_url(user_id or "", public_url)
     pages = 0
     ids: List[str] = []
@@ -1,68 +1,86 @@
 # engine/imdb_scrape.py
 from __future__ import annotations
-import json, os, re, time
-from typing import Dict, Any, Optional, List
+import json, os, re
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 import requests
 from bs4 import BeautifulSoup
 
+from . import cache_backend
+from . import revalidate
+from . import sessions
+
 # ------------ Config & cache ------------
 UA = os.getenv("IMDB_SCRAPE_UA", "Mozilla/5.0 (compatible; RecoBot/1.0)")
 BASE_MOBILE = "https://m.imdb.com/title"
 BASE_DESKTOP = "https://www.imdb.com/title"
 
-CACHE_DIR = Path(os.getenv("IMDB_SCRAPE_CACHE_DIR", "data/cache/imdb"))
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
+# Entries live in the shared cache store under imdb/{title,keywords}; an explicit
+# IMDB_SCRAPE_CACHE_DIR keeps a dedicated store rooted there instead.
+_CUSTOM_DIR = os.getenv("IMDB_SCRAPE_CACHE_DIR", "")
+CACHE_DIR = Path(_CUSTOM_DIR or "data/cache/imdb")
 TTL_SECONDS = int(os.getenv("IMDB_SCRAPE_CACHE_TTL_SECONDS", str(14 * 24 * 3600)))  # 14 days
+_custom_store = None
 
-def _cache_path(kind: str, key: str) -> Path:
+def _store_ns(kind: str):
     # kind: "title" | "keywords"
-    # key : imdb_id (e.g., "tt1234567")
-    p = CACHE_DIR / kind
-    p.mkdir(parents=True, exist_ok=True)
-    return p / f"{key.strip()}.json"
-
-def _cache_read(kind: str, key: str) -> Optional[dict]:
-    path = _cache_path(kind, key)
-    if not path.exists():
-        return None
+    global _custom_store
+    if not _CUSTOM_DIR:
+        return cache_backend.store(), f"imdb/{kind}"
+    if _custom_store is None:
+        _custom_store = cache_backend.open_backend(cache_backend.CACHE_BACKEND, CACHE_DIR)
+    return _custom_store, kind
+
+def _cache_entry(kind: str, key: str):
+    # key : imdb_id (e.g., "tt1234567"); returned whatever its age so an
+    # expired entry's validators can be used for a conditional refresh
     try:
-        if time.time() - path.stat().st_mtime > TTL_SECONDS:
-            return None
-        return json.loads(path.read_text(encoding="utf-8"))
+        store, ns = _store_ns(kind)
+        return store.get(ns, key.strip())
     except Exception:
         return None
 
-def _atomic_write(path: Path, data: dict) -> None:
+def _cache_write(kind: str, key: str, data: dict, meta: Optional[dict] = None) -> None:
     try:
-        tmp = path.with_suffix(path.suffix + ".tmp")
-        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
-        tmp.replace(path)
+        store, ns = _store_ns(kind)
+        meta = {**(meta or {}), **revalidate.jitter_meta()}
+        store.put(ns, key.strip(), data, ttl_s=revalidate.effective_ttl(meta, TTL_SECONDS), meta=meta)
     except Exception:
         pass
 
-def _cache_write(kind: str, key: str, data: dict) -> None:
-    _atomic_write(_cache_path(kind, key), data)
+def _cache_touch(kind: str, key: str) -> None:
+    try:
+        store, ns = _store_ns(kind)
+        store.touch(ns, key.strip())
+    except Exception:
+        pass
 
 # ------------ HTTP helpers ------------
-def _get(url: str) -> Optional[str]:
-    for attempt in range(3):
-        try:
-            r = requests.get(
-                url,
-                headers={"User-Agent": UA, "Accept": "text/html"},
-                timeout=15,
-            )
-            if r.status_code in (429, 503):
-                time.sleep(0.7 + 0.7 * attempt)
-                continue
-            r.raise_for_status()
-            return r.text
-        except requests.RequestException:
-            if attempt == 2:
-                return None
-            time.sleep(0.5 + 0.5 * attempt)
-    return None
+def _get_validated(url: str, meta: Optional[dict] = None) -> Tuple[Optional[str], Optional[dict], bool]:
+    """
+    GET with conditional headers from a previous response's validators.
+    Returns (html, validators, unchanged); unchanged is True on a 304 or when
+    the body hashes the same as before, in which case html is None.
+    """
+    headers = {"User-Agent": UA, "Accept": "text/html", **revalidate.conditional_headers(meta, url)}
+    if len(headers) > 2:
+        revalidate.note("imdb_scrape", "conditional")
+    # 429/503 and connection failures are retried by sessions.get
+    try:
+        r = sessions.get(url, headers=headers, timeout=15)
+        if r.status_code == 304 and meta:
+            revalidate.note("imdb_scrape", "not_modified", int(meta.get("bytes") or 0))
+            return None, meta, True
+        r.raise_for_status()
+    except requests.RequestException:
+        return None, None, False
+    body = r.content
+    if revalidate.unchanged(meta, body):
+        revalidate.note("imdb_scrape", "same_hash", len(body))
+        return None, meta, True
+    if meta:
+        revalidate.note("imdb_scrape", "changed")
+    return r.text, revalidate.validators_from(r, body, url), False
 
 # ------------ Parsing helpers ------------
 def _iso_duration_to_minutes(s: str) -> Optional[int]:
@@ -111,12 +129,18 @@ def fetch_title(imdb_id: str) -> Dict[str, Any]:
         return {}
 
     # Cache hit?
-    cached = _cache_read("title", imdb_id)
-    if cached is not None:
-        return cached
+    entry = _cache_entry("title", imdb_id)
+    if entry is not None and entry.age() <= revalidate.effective_ttl(entry.meta, TTL_SECONDS):
+        return entry.data
 
-    html = _get(f"{BASE_MOBILE}/{imdb_id}/")
+    html, validators, unchanged = _get_validated(f"{BASE_MOBILE}/{imdb_id}/", entry.meta if entry else None)
+    if unchanged:
+        _cache_touch("title", imdb_id)
+        return entry.data
     if not html:
+        if sessions.ENGINE_OFFLINE:
+            sessions.note_offline("imdb_scrape", stale=entry is not None)
+            return entry.data if entry is not None else {}
         return {}
 
     soup = BeautifulSoup(html, "lxml")
@@ -177,7 +201,7 @@ def fetch_title(imdb_id: str) -> Dict[str, Any]:
         "imdb_url": f"{BASE_DESKTOP}/{imdb_id}/",
     }
 
-    _cache_write("title", imdb_id, data)
+    _cache_write("title", imdb_id, data, meta=validators)
     return data
 
 # ---------- Keywords scraping (cached) ----------
@@ -214,18 +238,26 @@ def fetch_keywords(imdb_id: str, limit: int = 30) -> List[str]:
         return []
 
     # Cache hit?
-    cached = _cache_read("keywords", imdb_id)
-    if cached is not None:
-        all_kws = cached.get("keywords") or []
+    entry = _cache_entry("keywords", imdb_id)
+    if entry is not None and entry.age() <= revalidate.effective_ttl(entry.meta, TTL_SECONDS):
+        all_kws = entry.data.get("keywords") or []
         return all_kws[: max(0, int(limit))]
 
-    # Try desktop first (usually richer), then mobile fallback
-    html = _get(f"{BASE_DESKTOP}/{imdb_id}/keywords")
+    # Try desktop first (usually richer), then mobile fallback; validators only
+    # apply to the URL they were recorded for
+    meta = entry.meta if entry else None
+    html, validators, unchanged = _get_validated(f"{BASE_DESKTOP}/{imdb_id}/keywords", meta)
+    if not html and not unchanged:
+        html, validators, unchanged = _get_validated(f"{BASE_MOBILE}/{imdb_id}/keywords", meta)
+    if unchanged:
+        _cache_touch("keywords", imdb_id)
+        return (entry.data.get("keywords") or [])[: max(0, int(limit))]
     if not html:
-        html = _get(f"{BASE_MOBILE}/{imdb_id}/keywords")
-        if not html:
-            return []
+        if sessions.ENGINE_OFFLINE:
+            sessions.note_offline("imdb_scrape", stale=entry is not None)
+            return (entry.data.get("keywords") or [])[: max(0, int(limit))] if entry is not None else []
+        return []
 
     kws = _extract_keywords_from_html(html)
-    _cache_write("keywords", imdb_id, {"keywords": kws})
+    _cache_write("keywords", imdb_id, {"keywords": kws}, meta=validators)
     return kws[: max(0, int(limit))]
\ No newline at end of file
@@ -8,9 +8,10 @@ from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-import requests
 from bs4 import BeautifulSoup
 
+from . import sessions
+
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "data"
 USER_DIR = DATA_DIR / "user"
@@ -116,7 +117,7 @@ def fetch_user_ratings_web(user_id: str, ttl_days: int = 3) -> List[Dict[str, An
     items: List[Dict[str, Any]] = []
 
     try:
-        r = requests.get(url, headers=headers, timeout=(5, 20))
+        r = sessions.get(url, headers=headers, timeout=(5, 20))
         r.raise_for_status()
         soup = BeautifulSoup(r.text, "lxml")
 
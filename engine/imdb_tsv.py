@@ -1,9 +1,10 @@
 # engine/imdb_tsv.py
 from __future__ import annotations
-import gzip, io, json, os, time
+import gzip, io, json, os
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
-import requests
+
+from . import sessions
 
 IMDB_HOST = "https://datasets.imdbws.com"
 TMDB_API = "https://api.themoviedb.org/3"
@@ -13,7 +14,7 @@ def download(name: str, cache_dir: Path) -> Path:
     dest = cache_dir / name
     if dest.exists() and dest.stat().st_size > 0:
         return dest
-    r = requests.get(f"{IMDB_HOST}/{name}", timeout=60)
+    r = sessions.get(f"{IMDB_HOST}/{name}", timeout=60)
     r.raise_for_status()
     dest.write_bytes(r.content)
     return dest
@@ -43,7 +44,6 @@ def _tmdb_params() -> Dict[str, str]:
 
 def hydrate_imdb_ids_to_tmdb(imdb_ids: List[str], limit: int) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
-    session = requests.Session()
     headers = _tmdb_headers()
     params = _tmdb_params()
     mapped = 0
@@ -51,7 +51,7 @@ def hydrate_imdb_ids_to_tmdb(imdb_ids: List[str], limit: int) -> List[Dict[str,
         if mapped >= limit:
             break
         try:
-            data = session.get(
+            data = sessions.get(
                 f"{TMDB_API}/find/{tid}",
                 params={**params, "external_source": "imdb_id", "language": "en-US"},
                 headers=headers, timeout=20
@@ -80,5 +80,4 @@ def hydrate_imdb_ids_to_tmdb(imdb_ids: List[str], limit: int) -> List[Dict[str,
             out.append(norm_movie(r)); found = True; mapped += 1
         for r in data.get("tv_results") or []:
             out.append(norm_tv(r)); found = True; mapped += 1
-        time.sleep(0.06)
     return out
\ No newline at end of file
@@ -0,0 +1,70 @@
+# engine/memcache.py
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+class LRUCache:
+    """
+    Thread-safe LRU bounded by entry count and by approximate bytes.
+    Callers pass the size (usually the length of the JSON text the value was
+    decoded from), so accounting costs nothing on the hot path.
+    """
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self._data: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                self.counts["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self.counts["hits"] += 1
+            return hit[0]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Like get, but leaves recency and the hit/miss counters alone (bookkeeping reads)."""
+        with self._lock:
+            hit = self._data.get(key)
+        return hit[0] if hit is not None else None
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        size = max(0, int(size))
+        if not self.max_entries or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, sz) = self._data.popitem(last=False)
+                self._bytes -= sz
+                self.counts["evictions"] += 1
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.counts)
+            out["entries"] = len(self._data)
+            out["bytes"] = self._bytes
+        looked = out["hits"] + out["misses"]
+        out["hit_ratio"] = round(out["hits"] / looked, 4) if looked else 0.0
+        return out
@@ -1,29 +1,40 @@
-import os, json, time, requests, hashlib
+import hashlib
 
-def _cache_dir():
-    p = "data/cache/omdb"; os.makedirs(p, exist_ok=True); return p
+import requests
 
-def _cache_path(imdb_id: str) -> str:
-    h = hashlib.md5(imdb_id.encode("utf-8")).hexdigest()
-    return os.path.join(_cache_dir(), f"{h}.json")
+from . import cache_backend
+from . import sessions
+
+def _cache_key(imdb_id: str) -> str:
+    return hashlib.md5(imdb_id.encode("utf-8")).hexdigest()
 
 def fetch_omdb(imdb_id: str, api_key: str) -> dict:
     if not imdb_id or not api_key: return {}
-    cp = _cache_path(imdb_id)
-    if os.path.exists(cp):
-        try:
-            return json.load(open(cp,"r",encoding="utf-8"))
-        except Exception:
-            pass
+    key = _cache_key(imdb_id)
+    try:
+        hit = cache_backend.store().get("omdb", key)
+        if hit is not None:
+            cache_backend.note_hit("omdb", hit.age())
+            return hit.data
+    except Exception:
+        pass
+    if sessions.ENGINE_OFFLINE:
+        sessions.note_offline("omdb", stale=False)
+        return {}
     url = f"http://www.omdbapi.com/?apikey={api_key}&i={imdb_id}&tomatoes=true"
-    for _ in range(2):
-        r = requests.get(url, timeout=20)
-        if r.status_code == 200:
-            try:
-                data = r.json()
-                json.dump(data, open(cp,"w"), indent=2)
-                return data
-            except Exception:
-                pass
-        time.sleep(0.5)
-    return {}
\ No newline at end of file
+    # 429/503 are retried by the host scheduler in sessions.get
+    try:
+        r = sessions.get(url, timeout=20)
+    except requests.RequestException:
+        return {}
+    if r.status_code != 200:
+        return {}
+    try:
+        data = r.json()
+    except Exception:
+        return {}
+    try:
+        cache_backend.store().put("omdb", key, data)
+    except Exception:
+        pass
+    return data
@@ -0,0 +1,201 @@
+# engine/perf_history.py
+"""
+Per-stage performance history and a regression gate.
+
+Every engine.runner run appends one compact line to PERF_HISTORY
+(data/out/perf_history.jsonl): per stage, wall seconds, HTTP requests, TMDB
+cache hit rate and peak RSS, taken from diag.json["stages"]. Only the last
+PERF_HISTORY_MAX runs are kept.
+
+  python -m engine.perf_history check            # exit 1 on a regression
+  python -m engine.perf_history check --warn-only
+  python -m engine.perf_history table            # markdown trend table
+
+check compares the newest run against the median of the PERF_GATE_WINDOW
+runs before it (same mode only: live, offline and cassette replays are not
+compared with each other). A stage regresses when a metric is worse than the
+median by more than PERF_GATE_THRESHOLD (0.25 = 25%). Wall time below
+PERF_GATE_MIN_S on both sides, or a request count within PERF_GATE_MIN_REQ
+of the median, is noise and never flagged. With fewer than
+PERF_GATE_MIN_RUNS earlier runs there is no verdict.
+"""
+from __future__ import annotations
+import argparse, json, os, statistics, sys, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+def _int(n: str, d: int) -> int:
+    try: return int(os.getenv(n, "") or d)
+    except Exception: return d
+def _float(n: str, d: float) -> float:
+    try: return float(os.getenv(n, "") or d)
+    except Exception: return d
+
+PERF_HISTORY        = (os.getenv("PERF_HISTORY", "data/out/perf_history.jsonl") or "").strip()
+PERF_HISTORY_MAX    = _int("PERF_HISTORY_MAX", 200)
+PERF_GATE_WINDOW    = _int("PERF_GATE_WINDOW", 7)
+PERF_GATE_THRESHOLD = _float("PERF_GATE_THRESHOLD", 0.25)
+PERF_GATE_MIN_RUNS  = _int("PERF_GATE_MIN_RUNS", 3)
+PERF_GATE_MIN_S     = _float("PERF_GATE_MIN_S", 0.5)
+PERF_GATE_MIN_REQ   = _int("PERF_GATE_MIN_REQ", 10)
+
+# metric -> +1 when higher is worse, -1 when lower is worse
+METRICS: Dict[str, int] = {"wall_s": 1, "http_requests": 1, "peak_rss_mb": 1, "cache_hit_rate": -1}
+
+_SPARK = "▁▂▃▄▅▆▇█"
+
+def _mode(diag: Dict[str, Any]) -> str:
+    if (diag.get("offline") or {}).get("enabled"):
+        return "offline"
+    cas = diag.get("cassette") or {}
+    if cas.get("mode") == "replay":
+        return "replay"
+    return "live"
+
+def from_diag(diag: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The history record for a finished run's diag.json, or None without stage metrics."""
+    stages = (diag.get("stages") or {}).get("stages") or {}
+    if not stages:
+        return None
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, st in stages.items():
+        lookups = st.get("cache_lookups") or 0
+        out[name] = {
+            "wall_s": round(float(st.get("wall_s") or 0.0), 3),
+            "http_requests": int(st.get("http_requests") or 0),
+            "cache_hit_rate": round((st.get("cache_hits") or 0) / lookups, 4) if lookups else None,
+            "peak_rss_mb": round(float(st.get("peak_rss_mb") or 0.0), 1),
+            "items_out": st.get("items_out"),
+        }
+    ts = (diag.get("timestamps") or {}).get("finished") or time.time()
+    return {
+        "ts": round(float(ts), 1),
+        "run": os.getenv("GITHUB_RUN_ID") or None,
+        "commit": (os.getenv("GITHUB_SHA") or "")[:7] or None,
+        "mode": _mode(diag),
+        "total_wall_s": (diag.get("stages") or {}).get("total_wall_s"),
+        "stages": out,
+    }
+
+def load(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    p = Path(path or PERF_HISTORY)
+    if not p.exists():
+        return []
+    out: List[Dict[str, Any]] = []
+    with p.open("r", encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            try:
+                rec = json.loads(line)
+            except Exception:
+                continue
+            if isinstance(rec, dict) and rec.get("stages"):
+                out.append(rec)
+    return out
+
+def record(diag: Dict[str, Any], path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Append this run to the history (trimmed to PERF_HISTORY_MAX lines)."""
+    path = path or PERF_HISTORY
+    rec = from_diag(diag)
+    if not path or rec is None:
+        return None
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    history = load(path)[-(max(1, PERF_HISTORY_MAX) - 1):] + [rec]
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    tmp.write_text("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in history), encoding="utf-8")
+    tmp.replace(p)
+    return rec
+
+def _baseline(history: List[Dict[str, Any]], window: int) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    if not history:
+        return None, []
+    latest = history[-1]
+    prior = [r for r in history[:-1] if r.get("mode", "live") == latest.get("mode", "live")]
+    return latest, prior[-window:]
+
+def _median(prior: List[Dict[str, Any]], stage: str, metric: str) -> Optional[float]:
+    vals = [r["stages"][stage][metric] for r in prior
+            if stage in r.get("stages", {}) and r["stages"][stage].get(metric) is not None]
+    return float(statistics.median(vals)) if vals else None
+
+def check(history: List[Dict[str, Any]], *, window: int = PERF_GATE_WINDOW, threshold: float = PERF_GATE_THRESHOLD,
+          min_runs: int = PERF_GATE_MIN_RUNS, min_s: float = PERF_GATE_MIN_S) -> Dict[str, Any]:
+    latest, prior = _baseline(history, window)
+    if latest is None or len(prior) < min_runs:
+        return {"verdict": "insufficient_history", "baseline_runs": len(prior), "regressions": []}
+    regressions: List[Dict[str, Any]] = []
+    for stage, cur in latest["stages"].items():
+        for metric, sign in METRICS.items():
+            now, med = cur.get(metric), _median(prior, stage, metric)
+            if now is None or med is None:
+                continue
+            if metric == "wall_s" and max(now, med) < min_s:
+                continue
+            if metric == "http_requests" and abs(now - med) < PERF_GATE_MIN_REQ:
+                continue
+            worse = now > med * (1.0 + threshold) if sign > 0 else now < med * (1.0 - threshold)
+            change = (now - med) / med if med else None
+            if worse:
+                regressions.append({"stage": stage, "metric": metric, "value": now, "median": round(med, 4),
+                                    "change": round(change, 3) if change is not None else None})
+    return {"verdict": "regressed" if regressions else "ok", "baseline_runs": len(prior),
+            "mode": latest.get("mode"), "regressions": regressions}
+
+def _spark(vals: List[float]) -> str:
+    if not vals:
+        return ""
+    lo, hi = min(vals), max(vals)
+    span = (hi - lo) or 1.0
+    return "".join(_SPARK[min(len(_SPARK) - 1, int((v - lo) / span * (len(_SPARK) - 1)))] for v in vals)
+
+def trend_markdown(history: List[Dict[str, Any]], *, window: int = PERF_GATE_WINDOW, points: int = 10) -> List[str]:
+    """Markdown lines: per-stage wall time against the rolling median, with a sparkline."""
+    latest, prior = _baseline(history, window)
+    if latest is None:
+        return []
+    flagged = {(r["stage"], r["metric"]) for r in check(history, window=window)["regressions"]}
+    same_mode = [r for r in history if r.get("mode", "live") == latest.get("mode", "live")][-points:]
+    lines = [f"**Stage timings** ({latest.get('mode', 'live')}, last run vs median of {len(prior)})", "",
+             "| stage | wall s | median s | Δ | requests | cache hit | peak RSS MB | trend |",
+             "|---|---:|---:|---:|---:|---:|---:|---|"]
+    for stage, cur in latest["stages"].items():
+        med = _median(prior, stage, "wall_s")
+        delta = f"{(cur['wall_s'] - med) / med:+.0%}" if med else "–"
+        hit = f"{cur['cache_hit_rate']:.0%}" if cur.get("cache_hit_rate") is not None else "–"
+        trend = _spark([r["stages"][stage]["wall_s"] for r in same_mode if stage in r["stages"]])
+        mark = " ⚠️" if any((stage, m) in flagged for m in METRICS) else ""
+        med_s = f"{med:.2f}" if med is not None else "–"
+        lines.append(f"| {stage}{mark} | {cur['wall_s']:.2f} | {med_s} | {delta} | {cur['http_requests']} | "
+                     f"{hit} | {cur['peak_rss_mb']:.0f} | {trend} |")
+    lines.append("")
+    return lines
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Per-stage performance history and regression gate")
+    ap.add_argument("cmd", choices=["check", "table", "record"])
+    ap.add_argument("--history", default=None, help=f"history file (default {PERF_HISTORY})")
+    ap.add_argument("--diag", default="data/out/latest/diag.json", help="record: diag.json to append")
+    ap.add_argument("--window", type=int, default=PERF_GATE_WINDOW)
+    ap.add_argument("--threshold", type=float, default=PERF_GATE_THRESHOLD)
+    ap.add_argument("--warn-only", action="store_true", help="check: report but exit 0")
+    args = ap.parse_args()
+
+    if args.cmd == "record":
+        diag = json.loads(Path(args.diag).read_text(encoding="utf-8"))
+        print(json.dumps(record(diag, args.history), indent=2))
+        return
+    history = load(args.history)
+    if args.cmd == "table":
+        print("\n".join(trend_markdown(history, window=args.window)))
+        return
+    res = check(history, window=args.window, threshold=args.threshold)
+    print(json.dumps(res, indent=2))
+    for r in res["regressions"]:
+        pct = f"{r['change']:+.0%}" if r.get("change") is not None else "n/a"
+        print(f"[perf] REGRESSION {r['stage']}.{r['metric']}: {r['value']} vs median {r['median']} ({pct})",
+              file=sys.stderr)
+    if res["verdict"] == "regressed" and not args.warn_only:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
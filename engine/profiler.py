@@ -0,0 +1,159 @@
+# engine/profiler.py
+"""
+Per-stage CPU and allocation profiles for engine.runner.
+
+  ENGINE_PROFILE=cpu|mem|both python -m engine.runner
+
+Each runner stage (engine.stages) runs under cProfile and/or between two
+tracemalloc snapshots. Per stage, data/out/latest/profile/ gets
+  <stage>.pstats     raw cProfile stats (python -m pstats, snakeviz, ...)
+  <stage>.cpu.txt    top functions by own time and by cumulative time
+  <stage>.mem.txt    top allocation sites (net growth over the stage) and peak
+plus index.json listing the files and each stage's heaviest entries. A stage
+entered more than once accumulates into one cProfile; its memory report gets
+one section per call.
+
+cProfile only sees the thread that enabled it, so enrichment work done on
+ENRICH_WORKERS threads shows up as waits in the enrich stage; profile with
+ENRICH_WORKERS=1 to see those frames. tracemalloc covers all threads but
+slows allocation-heavy code down noticeably.
+
+  ENGINE_PROFILE_TOP_N       rows per table (default 40)
+  ENGINE_PROFILE_MEM_FRAMES  frames kept per allocation (default 8)
+  ENGINE_PROFILE_DIR         output dir (default data/out/latest/profile)
+"""
+from __future__ import annotations
+import cProfile, io, json, os, pstats, shutil, threading, tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+def _int(n: str, d: int) -> int:
+    try: return int(os.getenv(n, "") or d)
+    except Exception: return d
+
+ENGINE_PROFILE            = (os.getenv("ENGINE_PROFILE", "") or "").strip().lower()
+ENGINE_PROFILE_TOP_N      = _int("ENGINE_PROFILE_TOP_N", 40)
+ENGINE_PROFILE_MEM_FRAMES = _int("ENGINE_PROFILE_MEM_FRAMES", 8)
+ENGINE_PROFILE_DIR        = Path(os.getenv("ENGINE_PROFILE_DIR", "") or "data/out/latest/profile")
+
+CPU = ENGINE_PROFILE in {"cpu", "both"}
+MEM = ENGINE_PROFILE in {"mem", "both"}
+
+_lock = threading.Lock()
+_prepared = False
+_cpu: Dict[str, cProfile.Profile] = {}
+_mem_calls: Dict[str, int] = {}
+_index: Dict[str, Dict[str, Any]] = {}
+
+def enabled() -> bool:
+    return CPU or MEM
+
+def _prepare() -> None:
+    # a fresh directory per run, so stale stages from an earlier run never linger
+    global _prepared
+    with _lock:
+        if _prepared:
+            return
+        shutil.rmtree(ENGINE_PROFILE_DIR, ignore_errors=True)
+        ENGINE_PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        _prepared = True
+    if MEM and not tracemalloc.is_tracing():
+        tracemalloc.start(max(1, ENGINE_PROFILE_MEM_FRAMES))
+
+def _top_funcs(stats: pstats.Stats, sort: str, n: int) -> List[Dict[str, Any]]:
+    rows = []
+    for (fname, line, func), (cc, nc, tt, ct, _callers) in stats.stats.items():  # type: ignore[attr-defined]
+        rows.append({"func": f"{func} ({os.path.basename(fname)}:{line})", "calls": nc,
+                     "tottime_s": round(tt, 4), "cumtime_s": round(ct, 4)})
+    key = "tottime_s" if sort == "tottime" else "cumtime_s"
+    return sorted(rows, key=lambda r: r[key], reverse=True)[:n]
+
+def _write_cpu(name: str, prof: cProfile.Profile) -> Dict[str, Any]:
+    base = ENGINE_PROFILE_DIR / name
+    prof.dump_stats(str(base) + ".pstats")
+    buf = io.StringIO()
+    buf.write(f"# {name}: cProfile (calling thread only; see engine/profiler.py)\n\n")
+    for sort in ("tottime", "cumulative"):
+        buf.write(f"## sorted by {sort}\n")
+        pstats.Stats(prof, stream=buf).strip_dirs().sort_stats(sort).print_stats(ENGINE_PROFILE_TOP_N)
+    Path(str(base) + ".cpu.txt").write_text(buf.getvalue(), encoding="utf-8")
+    return {"pstats": f"{name}.pstats", "cpu_txt": f"{name}.cpu.txt",
+            "top_tottime": _top_funcs(pstats.Stats(prof), "tottime", 10)}
+
+# the profilers' own bookkeeping is not the stage's; dropped from the results
+# rather than with Snapshot.filter_traces, which is far slower on big heaps
+_OWN_FILES = {tracemalloc.__file__, cProfile.__file__, pstats.__file__, __file__}
+
+def _own(tb: tracemalloc.Traceback) -> bool:
+    return tb[0].filename in _OWN_FILES
+
+def _write_mem(name: str, call: int, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot,
+               peak: int) -> Dict[str, Any]:
+    diff = [d for d in after.compare_to(before, "lineno") if not _own(d.traceback)]
+    growth = sum(d.size_diff for d in diff)
+    lines = [f"# {name} call {call}: tracemalloc, net growth {growth / 1024:.1f} KiB, "
+             f"traced peak {peak / 1024 / 1024:.2f} MiB", "",
+             f"## top {ENGINE_PROFILE_TOP_N} sites by net growth"]
+    lines += [str(d) for d in diff[:ENGINE_PROFILE_TOP_N]]
+    lines += ["", f"## top {min(10, ENGINE_PROFILE_TOP_N)} live tracebacks at stage end"]
+    live = [st for st in after.statistics("traceback") if not _own(st.traceback)]
+    for st in live[:min(10, ENGINE_PROFILE_TOP_N)]:
+        lines.append(f"{st.size / 1024:.1f} KiB in {st.count} blocks")
+        lines += [f"    {ln}" for ln in st.traceback.format()]
+    path = ENGINE_PROFILE_DIR / f"{name}.mem.txt"
+    with path.open("a" if call > 1 else "w", encoding="utf-8") as fh:
+        fh.write("\n".join(lines) + "\n\n")
+    return {"mem_txt": path.name, "net_growth_kb": round(growth / 1024, 1), "peak_mb": round(peak / 1024 / 1024, 2),
+            "top_growth": [{"site": str(d.traceback), "size_diff_kb": round(d.size_diff / 1024, 1)} for d in diff[:10]]}
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Profile the block as stage `name`; a no-op unless ENGINE_PROFILE is set."""
+    if not enabled():
+        yield
+        return
+    _prepare()
+    prof: Optional[cProfile.Profile] = None
+    before: Optional[tracemalloc.Snapshot] = None
+    if MEM:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+    if CPU:
+        prof = _cpu.setdefault(name, cProfile.Profile())
+        try:
+            prof.enable()
+        except ValueError:  # another profiler is already active on this thread
+            prof = None
+    try:
+        yield
+    finally:
+        if prof is not None:
+            prof.disable()
+        after: Optional[tracemalloc.Snapshot] = None
+        peak = 0
+        if before is not None:
+            # snapshot before the reports are written, so their allocations stay out of it
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+        entry = _index.setdefault(name, {})
+        try:
+            if prof is not None:
+                entry.update(_write_cpu(name, prof))
+            if before is not None and after is not None:
+                call = _mem_calls[name] = _mem_calls.get(name, 0) + 1
+                mem = _write_mem(name, call, before, after, peak)
+                prev = entry.get("mem") or {}
+                mem["calls"] = call
+                mem["net_growth_kb"] = round(mem["net_growth_kb"] + prev.get("net_growth_kb", 0.0), 1)
+                mem["peak_mb"] = max(mem["peak_mb"], prev.get("peak_mb", 0.0))
+                entry["mem"] = mem
+            (ENGINE_PROFILE_DIR / "index.json").write_text(
+                json.dumps({"mode": ENGINE_PROFILE, "top_n": ENGINE_PROFILE_TOP_N, "stages": _index}, indent=2),
+                encoding="utf-8")
+        except Exception as e:
+            print(f"[profile] {name}: writing profile failed: {e}")
+
+def stats() -> Dict[str, Any]:
+    return {"mode": ENGINE_PROFILE or None, "dir": str(ENGINE_PROFILE_DIR) if enabled() else None,
+            "stages": sorted(_index)}
@@ -0,0 +1,198 @@
+# engine/ratelimit.py
+from __future__ import annotations
+import os, threading, time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+from .config import Config
+
+def _int(n: str, d: int) -> int:
+    try: return int(os.getenv(n, "") or d)
+    except Exception: return d
+def _float(n: str, d: float) -> float:
+    try: return float(os.getenv(n, "") or d)
+    except Exception: return d
+
+HTTP_429_RETRIES     = _int("HTTP_429_RETRIES", 4)
+HTTP_429_MAX_WAIT_S  = _float("HTTP_429_MAX_WAIT_S", 60.0)
+RAMP_AFTER_OK        = _int("RATE_RAMP_AFTER_OK", 20)   # healthy responses before +1 concurrency
+
+@dataclass
+class HostPolicy:
+    rate: float              # sustained requests/s; 0 disables the bucket
+    burst: int               # tokens that may be spent back-to-back
+    concurrency: int         # starting number of in-flight requests
+    max_concurrency: int     # ceiling the adaptive limiter may ramp up to
+
+def _policy_from_delay(prefix: str, delay_d: float, conc_d: int, max_d: int) -> HostPolicy:
+    delay = _float(f"{prefix}_MIN_DELAY_S", delay_d)
+    conc = max(1, _int(f"{prefix}_CONCURRENCY", conc_d))
+    return HostPolicy(
+        rate=(1.0 / delay) if delay > 0 else 0.0,
+        burst=max(1, conc),
+        concurrency=conc,
+        max_concurrency=max(conc, _int(f"{prefix}_MAX_CONCURRENCY", max_d)),
+    )
+
+def _default_policies() -> Dict[str, HostPolicy]:
+    tmdb = _policy_from_delay("TMDB", Config.tmdb_min_delay_s, Config.tmdb_concurrency, 16)
+    imdb = _policy_from_delay("IMDB", 0.5, 2, 4)
+    omdb = _policy_from_delay("OMDB", 0.12, 2, 4)
+    return {
+        "api.themoviedb.org": tmdb,
+        "www.imdb.com": imdb,
+        "m.imdb.com": imdb,
+        "www.omdbapi.com": omdb,
+        "omdbapi.com": omdb,
+    }
+
+_UNLIMITED = HostPolicy(rate=0.0, burst=1, concurrency=64, max_concurrency=64)
+
+class TokenBucket:
+    """Classic token bucket; pause() blocks every caller until a deadline (Retry-After)."""
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = float(rate)
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + max(0.0, seconds))
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self.rate <= 0:
+                    return waited
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                    self._stamp = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return waited
+                    delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency gate: halves the in-flight limit on throttling and adds
+    one slot after RAMP_AFTER_OK consecutive healthy responses.
+    """
+    def __init__(self, start: int, ceiling: int) -> None:
+        self.limit = max(1, start)
+        self.ceiling = max(self.limit, ceiling)
+        self._in_flight = 0
+        self._ok_streak = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._ok_streak += 1
+            if self._ok_streak >= RAMP_AFTER_OK and self.limit < self.ceiling:
+                self.limit += 1
+                self._ok_streak = 0
+                self._cond.notify()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self._ok_streak = 0
+
+class HostScheduler:
+    def __init__(self, host: str, policy: HostPolicy) -> None:
+        self.host = host
+        self.policy = policy
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.limiter = AdaptiveLimiter(policy.concurrency, policy.max_concurrency)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, Any] = {"requests": 0, "throttled": 0, "retry_after_s": 0.0, "queued_s": 0.0}
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.limiter.acquire()
+        try:
+            waited = self.bucket.acquire()
+            with self._lock:
+                self.counts["requests"] += 1
+                self.counts["queued_s"] += waited
+            yield
+        finally:
+            self.limiter.release()
+
+    def ok(self) -> None:
+        self.limiter.on_success()
+
+    def throttled(self, wait_s: float) -> None:
+        self.limiter.on_throttle()
+        self.bucket.pause(wait_s)
+        with self._lock:
+            self.counts["throttled"] += 1
+            self.counts["retry_after_s"] += wait_s
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.counts)
+        out["queued_s"] = round(out["queued_s"], 3)
+        out["retry_after_s"] = round(out["retry_after_s"], 3)
+        out["rate"] = self.policy.rate
+        out["concurrency"] = self.limiter.limit
+        return out
+
+def retry_after_s(headers: Any, attempt: int) -> float:
+    """Seconds to wait from a Retry-After header (delta or HTTP-date), else exponential backoff."""
+    raw = (headers or {}).get("Retry-After") if headers is not None else None
+    wait: Optional[float] = None
+    if raw:
+        try:
+            wait = float(raw)
+        except ValueError:
+            try:
+                wait = parsedate_to_datetime(raw).timestamp() - time.time()
+            except Exception:
+                wait = None
+    if wait is None:
+        wait = 1.0 * (2 ** attempt)
+    return max(0.0, min(HTTP_429_MAX_WAIT_S, wait))
+
+_lock = threading.Lock()
+_policies = _default_policies()
+_schedulers: Dict[str, HostScheduler] = {}
+
+def for_url(url: str) -> HostScheduler:
+    host = (urlsplit(url).hostname or "").lower()
+    s = _schedulers.get(host)
+    if s is not None:
+        return s
+    with _lock:
+        s = _schedulers.get(host)
+        if s is None:
+            s = _schedulers[host] = HostScheduler(host, _policies.get(host, _UNLIMITED))
+        return s
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    with _lock:
+        scheds = list(_schedulers.values())
+    return {s.host: s.snapshot() for s in scheds}
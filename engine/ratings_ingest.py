@@ -1,10 +1,11 @@
 # File: engine/ratings_ingest.py
-import os, io, csv, time, requests, re
+import os, io, csv, time, re
 from dataclasses import dataclass, asdict
 from typing import List, Dict, Tuple, Set
 from bs4 import BeautifulSoup
 from rich import print as rprint
 from .cache import get_fresh, set as cache_set
+from . import sessions
 
 UA = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36"}
 
@@ -70,7 +71,7 @@ def load_from_local_csv() -> List[Dict]:
 def load_from_csv_url() -> List[Dict]:
     url = os.environ.get("IMDB_RATINGS_CSV_URL","").strip()
     if not url: return []
-    r = requests.get(url, headers=UA, timeout=30); r.raise_for_status()
+    r = sessions.get(url, headers=UA, timeout=30); r.raise_for_status()
     reader = csv.DictReader(io.StringIO(r.text))
     rows = [asdict(x) for x in _parse_csv_rows(reader)]
     rprint(f"[green][IMDb CSV URL] Loaded {len(rows)} ratings from {url}[/green]")
@@ -84,7 +85,7 @@ def _ratings_url_from_env() -> str:
     return ""
 
 def _scrape_page(url: str):
-    r = requests.get(url, headers=UA, timeout=30)
+    r = sessions.get(url, headers=UA, timeout=30)
     status = f"[IMDb] GET {url}\n→ {r.status_code}"
     if r.status_code != 200: return ("", [], status)
     soup = BeautifulSoup(r.text, "lxml")
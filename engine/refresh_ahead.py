@@ -0,0 +1,97 @@
+# engine/refresh_ahead.py
+"""
+Refresh-ahead for TMDB title entries.
+
+Entries that expire together make one run refetch thousands of titles while
+the neighbouring runs fetch almost nothing. After scoring, this spends a fixed
+per-run request budget on the ranked titles whose cached hydration request
+expires within the horizon, so the next runs find them fresh:
+
+  priority = likelihood of being shown (score relative to the top score)
+             x closeness to expiry (1 - remaining / horizon)
+
+Refreshes are conditional where validators exist (engine.revalidate), go
+through the per-host rate limiter, and already-expired entries are left to
+the normal on-demand path.
+"""
+from __future__ import annotations
+import os, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import sessions, tmdb
+
+def _bool(n: str, d: bool) -> bool:
+    v = (os.getenv(n, "") or "").strip().lower()
+    if v in {"1","true","yes","on"}: return True
+    if v in {"0","false","no","off"}: return False
+    return d
+def _int(n: str, d: int) -> int:
+    try: return int(os.getenv(n, "") or d)
+    except Exception: return d
+
+TMDB_REFRESH_AHEAD_BUDGET    = _int("TMDB_REFRESH_AHEAD_BUDGET", 40)             # requests per run; 0 disables
+TMDB_REFRESH_AHEAD_HORIZON_S = _int("TMDB_REFRESH_AHEAD_HORIZON_S", 3 * 24 * 3600)
+TMDB_REFRESH_AHEAD_WORKERS   = _int("TMDB_REFRESH_AHEAD_WORKERS", 4)
+ENRICH_HYDRATE               = _bool("ENRICH_HYDRATE", True)
+
+Candidate = Tuple[float, str, Dict[str, Any], int, float, str]   # (priority, url, params, ttl_s, remaining_s, project)
+
+def _likelihood(it: Dict[str, Any], rank: int, top: float) -> float:
+    try:
+        sc = float(it.get("score") or 0.0)
+    except (TypeError, ValueError):
+        sc = 0.0
+    if top > 0:
+        return max(0.0, sc) / top
+    return 1.0 / (1.0 + rank)
+
+def plan(ranked: List[Dict[str, Any]], *, budget: int, horizon_s: int,
+         hydrate: bool = ENRICH_HYDRATE) -> Tuple[List[Candidate], int]:
+    """Pick up to budget title requests to refresh; also returns how many were expiring."""
+    top = 0.0
+    for it in ranked:
+        try: top = max(top, float(it.get("score") or 0.0))
+        except (TypeError, ValueError): pass
+    cands: List[Candidate] = []
+    seen = set()
+    # the projection get_title_bundle / get_details store the entry in
+    project = "title" if hydrate else "details"
+    for rank, it in enumerate(ranked):
+        kind = (it.get("media_type") or it.get("type") or "").lower()
+        tid = it.get("tmdb_id") or it.get("id")
+        if kind not in {"movie","tv"} or not tid or (kind, tid) in seen:
+            continue
+        seen.add((kind, tid))
+        url, params, ttl_s = tmdb.title_request(kind, int(tid), hydrate=hydrate)
+        remaining = tmdb.time_to_expiry(url, params, ttl_s, project=project)
+        if remaining is None or remaining <= 0 or remaining > horizon_s:
+            continue
+        prio = _likelihood(it, rank, top) * (1.0 - remaining / horizon_s)
+        cands.append((prio, url, params, ttl_s, remaining, project))
+    expiring = len(cands)
+    cands.sort(key=lambda c: c[0], reverse=True)
+    return cands[:max(0, budget)], expiring
+
+def run(ranked: List[Dict[str, Any]], *, budget: Optional[int] = None,
+        horizon_s: Optional[int] = None, workers: Optional[int] = None) -> Dict[str, Any]:
+    budget = TMDB_REFRESH_AHEAD_BUDGET if budget is None else budget
+    horizon_s = TMDB_REFRESH_AHEAD_HORIZON_S if horizon_s is None else horizon_s
+    if budget <= 0 or horizon_s <= 0:
+        return {"budget": budget, "skipped": True}
+    if sessions.ENGINE_OFFLINE:
+        return {"budget": budget, "skipped": "offline"}
+    t0 = time.perf_counter()
+    picked, expiring = plan(ranked, budget=budget, horizon_s=horizon_s)
+    n_workers = max(1, min(workers or TMDB_REFRESH_AHEAD_WORKERS, len(picked) or 1))
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        list(pool.map(lambda c: tmdb.refresh(c[1], c[2], ttl_s=c[3], project=c[5]), picked))
+    return {
+        "budget": budget,
+        "horizon_s": horizon_s,
+        "candidates": len(ranked),
+        "expiring": expiring,
+        "refreshed": len(picked),
+        "min_remaining_s": int(min((c[4] for c in picked), default=0)),
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+    }
@@ -0,0 +1,163 @@
+# engine/revalidate.py
+"""
+Conditional refresh of expired cache entries.
+
+Cached clients keep the validators of the response an entry was built from
+in the entry's meta:
+
+  {"etag": ..., "last_modified": ..., "sha": <content hash>, "bytes": <body length>, "url": ...}
+
+On refresh they send If-None-Match / If-Modified-Since. A 304, or a 200 whose
+content hashes to the stored "sha", means the entry is still good: the client
+extends its TTL (store.touch) instead of re-writing it. The content hash is
+of the raw body, or, for engine.tmdb, of the projected payload it stores
+(payload_hash): TMDB bodies carry fields like popularity and vote_count that
+move on every fetch, but nothing the engine reads.
+stats() reports what that saved per client for diag.json.
+
+Adaptive TTLs: every refresh tells us whether the payload changed, so the
+entry's TTL is learned per key (only from hashes of the same kind). Unchanged refreshes stretch it by
+CACHE_TTL_GROW, changed ones cut it by CACHE_TTL_SHRINK, always within
+[base * CACHE_TTL_FLOOR_FACTOR, base * CACHE_TTL_CEIL_FACTOR] and the
+absolute CACHE_TTL_MIN_S / CACHE_TTL_MAX_S, where base is the endpoint's
+configured TTL. The learned value lives in meta["ttl"].
+
+TTL jitter: entries written on the same night would otherwise all expire on
+the same later night. Each write draws a factor in 1 +/- CACHE_TTL_JITTER
+(meta["jitter"]) that scales the entry's effective TTL for its lifetime.
+"""
+from __future__ import annotations
+import hashlib, json, os, random, threading
+from typing import Any, Dict, Optional
+
+def _bool(n: str, d: bool) -> bool:
+    v = (os.getenv(n, "") or "").strip().lower()
+    if v in {"1","true","yes","on"}: return True
+    if v in {"0","false","no","off"}: return False
+    return d
+def _float(n: str, d: float) -> float:
+    try: return float(os.getenv(n, "") or d)
+    except Exception: return d
+
+CACHE_ADAPTIVE_TTL     = _bool("CACHE_ADAPTIVE_TTL", True)
+CACHE_TTL_GROW         = _float("CACHE_TTL_GROW", 1.5)
+CACHE_TTL_SHRINK       = _float("CACHE_TTL_SHRINK", 0.5)
+CACHE_TTL_FLOOR_FACTOR = _float("CACHE_TTL_FLOOR_FACTOR", 0.25)
+CACHE_TTL_CEIL_FACTOR  = _float("CACHE_TTL_CEIL_FACTOR", 4.0)
+CACHE_TTL_MIN_S        = _float("CACHE_TTL_MIN_S", 3600.0)
+CACHE_TTL_MAX_S        = _float("CACHE_TTL_MAX_S", 120 * 86400.0)
+CACHE_TTL_JITTER       = max(0.0, min(0.5, _float("CACHE_TTL_JITTER", 0.1)))
+
+def body_hash(body: bytes) -> str:
+    return hashlib.sha1(body or b"").hexdigest()
+
+# payload hashes are tagged so they never compare equal to a raw body hash
+_PAYLOAD_TAG = "p1:"
+
+def payload_hash(data: Any) -> str:
+    """Hash of a parsed payload in canonical form (key order and whitespace don't count)."""
+    raw = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return _PAYLOAD_TAG + hashlib.sha1(raw).hexdigest()
+
+def has_payload_hash(meta: Optional[Dict[str, Any]]) -> bool:
+    return bool(meta) and str(meta.get("sha") or "").startswith(_PAYLOAD_TAG)
+
+def validators_from(resp: Any, body: bytes, url: Optional[str] = None, *, payload: Any = None) -> Dict[str, Any]:
+    """Validators of a response; with payload, "sha" is payload_hash(payload) instead of the body hash."""
+    sha = payload_hash(payload) if payload is not None else body_hash(body)
+    meta: Dict[str, Any] = {"sha": sha, "bytes": len(body or b"")}
+    etag = resp.headers.get("ETag") if resp is not None else None
+    last_mod = resp.headers.get("Last-Modified") if resp is not None else None
+    if etag: meta["etag"] = etag
+    if last_mod: meta["last_modified"] = last_mod
+    if url: meta["url"] = url
+    return meta
+
+def conditional_headers(meta: Optional[Dict[str, Any]], url: Optional[str] = None) -> Dict[str, str]:
+    """Validator headers for a refresh; empty when meta came from a different URL."""
+    if not meta or (url and meta.get("url") and meta["url"] != url):
+        return {}
+    h: Dict[str, str] = {}
+    if meta.get("etag"): h["If-None-Match"] = str(meta["etag"])
+    if meta.get("last_modified"): h["If-Modified-Since"] = str(meta["last_modified"])
+    return h
+
+def unchanged(meta: Optional[Dict[str, Any]], body: bytes) -> bool:
+    return bool(meta and meta.get("sha")) and meta["sha"] == body_hash(body)
+
+def unchanged_payload(meta: Optional[Dict[str, Any]], data: Any) -> bool:
+    return has_payload_hash(meta) and meta["sha"] == payload_hash(data)  # type: ignore[index]
+
+def _clamp_ttl(ttl: float, base_ttl: float) -> int:
+    lo = max(CACHE_TTL_MIN_S, base_ttl * CACHE_TTL_FLOOR_FACTOR)
+    hi = max(lo, min(CACHE_TTL_MAX_S, base_ttl * CACHE_TTL_CEIL_FACTOR))
+    return int(min(hi, max(lo, ttl)))
+
+def _learned_ttl(meta: Optional[Dict[str, Any]], base_ttl: int) -> int:
+    if not CACHE_ADAPTIVE_TTL or not meta or not meta.get("ttl"):
+        return base_ttl
+    try:
+        return _clamp_ttl(float(meta["ttl"]), base_ttl)
+    except (TypeError, ValueError):
+        return base_ttl
+
+def effective_ttl(meta: Optional[Dict[str, Any]], base_ttl: int) -> int:
+    """The TTL an entry actually lives for: learned (re-clamped against the current base) times its jitter."""
+    ttl = _learned_ttl(meta, base_ttl)
+    try:
+        return int(ttl * float((meta or {}).get("jitter") or 1.0))
+    except (TypeError, ValueError):
+        return ttl
+
+def jitter_meta() -> Dict[str, Any]:
+    """meta fields for a fresh write: a per-entry TTL scale drawn once."""
+    if not CACHE_TTL_JITTER:
+        return {}
+    return {"jitter": round(1.0 + random.uniform(-CACHE_TTL_JITTER, CACHE_TTL_JITTER), 4)}
+
+def adapt_ttl(prev: Optional[Dict[str, Any]], base_ttl: int, changed: Optional[bool]) -> Dict[str, Any]:
+    """
+    meta fields ({"ttl", "changes"}) for an entry after a refresh. Without a
+    previous content hash there is nothing to learn from and the base applies;
+    changed=None (hashes not comparable) keeps the learned TTL as it is.
+    """
+    if not CACHE_ADAPTIVE_TTL:
+        return {}
+    if not prev or not prev.get("sha"):
+        return {"ttl": int(base_ttl), "changes": 0}
+    cur = _learned_ttl(prev, base_ttl)
+    if changed is None:
+        return {"ttl": cur, "changes": int(prev.get("changes") or 0)}
+    ttl = _clamp_ttl(cur * (CACHE_TTL_SHRINK if changed else CACHE_TTL_GROW), base_ttl)
+    with _lock:
+        _adaptive["shrunk" if ttl < cur else "grown" if ttl > cur else "at_bound"] += 1
+    return {"ttl": ttl, "changes": int(prev.get("changes") or 0) + (1 if changed else 0)}
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+_adaptive: Dict[str, int] = {"grown": 0, "shrunk": 0, "at_bound": 0}
+
+def note(client: str, outcome: str, nbytes: int = 0) -> None:
+    """
+    outcome: "conditional" (validators sent), "not_modified" (304; nbytes =
+    cached body not downloaded), "same_hash" (200, identical body; nbytes =
+    write avoided) or "changed".
+    """
+    with _lock:
+        st = _stats.setdefault(client, {
+            "conditional": 0, "not_modified": 0, "same_hash": 0, "changed": 0,
+            "bytes_saved": 0, "bytes_not_rewritten": 0,
+        })
+        st[outcome] = st.get(outcome, 0) + 1
+        if outcome == "not_modified":
+            st["bytes_saved"] += int(nbytes or 0)
+        elif outcome == "same_hash":
+            st["bytes_not_rewritten"] += int(nbytes or 0)
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        out: Dict[str, Any] = {k: dict(v) for k, v in _stats.items()}
+        adaptive = dict(_adaptive)
+    out["bytes_saved"] = sum(v["bytes_saved"] for v in out.values())
+    out["adaptive_ttl"] = adaptive
+    return out
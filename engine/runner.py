@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import os
 import sys
+import time
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -11,7 +12,21 @@ from . import enrich
 from . import profile
 from . import scoring
 from . import filtering
+from . import perf_history
 from . import recency  # ensure rotation file exists when marking
+from . import cache_backend
+from . import cache_gc
+from . import cassette
+from . import diag
+from . import profiler
+from . import ratelimit
+from . import refresh_ahead
+from . import revalidate
+from . import sessions
+from . import stages
+from . import tmdb
+from . import trace
+from .logging_utils import HeartbeatLogger
 
 RUN_ROOT = Path("data/out")
 LATEST   = RUN_ROOT / "latest"
@@ -65,38 +80,77 @@ def main() -> None:
     for line in _self_check():
         print(line)
 
-    if not (os.getenv("TMDB_API_KEY") or os.getenv("TMDB_BEARER") or os.getenv("TMDB_ACCESS_TOKEN")):
+    tape = cassette.active()
+    if sessions.ENGINE_OFFLINE:
+        print("[env] ENGINE_OFFLINE: answering from caches only; no network requests will be made.")
+    elif tape is not None and not tape.recording:
+        print(f"[env] HTTP_CASSETTE: replaying {tape.path}; no network requests will be made.")
+    elif not (os.getenv("TMDB_API_KEY") or os.getenv("TMDB_BEARER") or os.getenv("TMDB_ACCESS_TOKEN")):
         print("[env] Missing required environment: TMDB_API_KEY or TMDB_BEARER. Set these and re-run.", file=sys.stderr)
         sys.exit(2)
 
+    # every stage streams begin/end to heartbeat.log and lands in diag.json["stages"]
+    started_ts = time.time()
+    try:
+        (run_dir / "heartbeat.log").unlink()
+    except FileNotFoundError:
+        pass
+    rec = stages.StageRecorder(HeartbeatLogger(run_dir))
+
     # 1) Catalog
-    pool_items = catalog_builder.build_catalog(env)
+    with rec.stage("catalog") as st:
+        pool_items = catalog_builder.build_catalog(env)
+        st["items_out"] = len(pool_items)
     pool_tel = env.get("POOL_TELEMETRY", {})
     disc_path = run_dir / "items.discovered.json"
-    _write_json(disc_path, pool_items)
+    with rec.stage("write_discovered", items_in=len(pool_items)):
+        _write_json(disc_path, pool_items)
 
     # 2) Seen index → strict filter
     ratings_csv = Path("data/user/ratings.csv")
     imdb_public_seen = Path("data/cache/imdb_public/seen.json")
-    seen_index = filtering.build_seen_index(ratings_csv, imdb_public_seen if imdb_public_seen.exists() else None)
-    eligible_pre, seen_counts_pre = filtering.filter_seen(pool_items, seen_index)
-    _write_json(run_dir / "assistant_feed.json", eligible_pre)
+    with rec.stage("seen_index") as st:
+        seen_index = filtering.build_seen_index(ratings_csv, imdb_public_seen if imdb_public_seen.exists() else None)
+        st["items_out"] = len(seen_index.imdb_ids)
+    with rec.stage("filter", items_in=len(pool_items)) as st:
+        eligible_pre, seen_counts_pre = filtering.filter_seen(pool_items, seen_index)
+        st["items_out"] = len(eligible_pre)
+    with rec.stage("write_feed", items_in=len(eligible_pre)):
+        _write_json(run_dir / "assistant_feed.json", eligible_pre)
 
     # 3) Enrich (search_multi fallback inside)
     enriched_path = run_dir / "items.enriched.json"
-    enrich.write_enriched(items_in_path=disc_path, out_path=enriched_path, run_dir=run_dir)
+    with rec.stage("enrich", items_in=len(pool_items)) as st:
+        enrich.write_enriched(items_in_path=disc_path, out_path=enriched_path, run_dir=run_dir)
+        enriched = _read_json(enriched_path) or []
+        st["items_out"] = len(enriched)
 
     # 4) Re-apply seen on enriched
-    enriched = _read_json(enriched_path) or []
-    eligible, seen_counts = filtering.filter_seen(enriched, seen_index)
+    with rec.stage("filter", items_in=len(enriched)) as st:
+        eligible, seen_counts = filtering.filter_seen(enriched, seen_index)
+        st["items_out"] = len(eligible)
 
     # 5) User profile DNA
     exports_dir = run_dir / "exports"
-    user_model = profile.build_user_model(ratings_csv, exports_dir)
+    with rec.stage("profile"):
+        user_model = profile.build_user_model(ratings_csv, exports_dir)
 
     # 6) Score
-    ranked = scoring.score_items(eligible, user_model, env)
-    _write_json(enriched_path, ranked)
+    with rec.stage("score", items_in=len(eligible)) as st:
+        ranked = scoring.score_items(eligible, user_model, env)
+        st["items_out"] = len(ranked)
+    with rec.stage("write_ranked", items_in=len(ranked)):
+        _write_json(enriched_path, ranked)
+
+    # spend the refresh-ahead budget on soon-to-expire titles most likely to be shown
+    with rec.stage("refresh_ahead", items_in=len(ranked)) as st:
+        refresh_tel = refresh_ahead.run(ranked)
+        # background stale-while-revalidate refreshes must land before the cache is closed
+        tmdb.drain_refreshes()
+        st["items_out"] = refresh_tel.get("refreshed", 0)
+
+    with rec.stage("cache_gc"):
+        gc_tel = cache_gc.run()
 
     # 7) Diagnostics
     counts = {
@@ -111,9 +165,33 @@ def main() -> None:
     }
     diag_path = run_dir / "diag.json"
     prior_diag = _read_json(diag_path) or {}
-    prior_diag["counts"] = {**prior_diag.get("counts", {}), **counts}
     prior_diag["pool"] = pool_tel
+    prior_diag["http"] = sessions.stats()
+    prior_diag["rate_limit"] = ratelimit.stats()
+    prior_diag["cache"] = tmdb.cache_stats()
+    prior_diag["revalidation"] = revalidate.stats()
+    prior_diag["refresh_ahead"] = refresh_tel
+    prior_diag["cache_gc"] = gc_tel
+    prior_diag["offline"] = sessions.offline_stats()
+    prior_diag["cassette"] = cassette.stats()
+    prior_diag["stages"] = rec.to_dict()
+    prior_diag["trace"] = trace.stats()
+    prior_diag["profile"] = profiler.stats()
+    # base record (timestamps, headline counts, env) from engine.diag; the sections above go on top
+    diag.write_diag(run_dir, discovered=len(pool_items), eligible=len(eligible), above_cut=len(ranked),
+                    started_ts=started_ts, finished_ts=time.time())
+    base = _read_json(diag_path) or {}
+    base["counts"] = {**prior_diag.get("counts", {}), **base.get("counts", {}), **counts}
+    prior_diag.update(base)
     _write_json(diag_path, prior_diag)
+    try:
+        perf_history.record(prior_diag)
+    except Exception as e:
+        print(f"[perf] history not updated: {e}", file=sys.stderr)
+    cache_backend.close_all()
+    sessions.close_all()
+    cassette.close()
+    trace.flush()
 
     print(" | catalog:begin")
     print(f" | catalog:end kept={len(pool_items)}")
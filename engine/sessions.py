@@ -0,0 +1,145 @@
+# engine/sessions.py
+from __future__ import annotations
+import os, threading
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import cassette
+from . import ratelimit
+from . import trace
+
+def _bool(n: str, d: bool) -> bool:
+    v = (os.getenv(n, "") or "").strip().lower()
+    if v in {"1","true","yes","on"}: return True
+    if v in {"0","false","no","off"}: return False
+    return d
+def _int(n: str, d: int) -> int:
+    try: return int(os.getenv(n, "") or d)
+    except Exception: return d
+def _float(n: str, d: float) -> float:
+    try: return float(os.getenv(n, "") or d)
+    except Exception: return d
+
+# Pool size should cover the enrich worker count; retries here only cover
+# connection-level failures, HTTP status handling stays with the callers.
+HTTP_POOL_MAXSIZE     = _int("HTTP_POOL_MAXSIZE", 16)
+HTTP_RETRY_CONNECT    = _int("HTTP_RETRY_CONNECT", 2)
+HTTP_RETRY_BACKOFF_S  = _float("HTTP_RETRY_BACKOFF_S", 0.3)
+
+# Offline mode: get() raises OfflineError before touching the network, so a
+# run (or a local benchmark) works purely from caches. Cached clients catch it
+# and serve whatever they hold regardless of age; note_offline() records per
+# client whether that was a stale entry or a miss.
+ENGINE_OFFLINE = _bool("ENGINE_OFFLINE", False)
+
+class OfflineError(requests.ConnectionError):
+    """A request attempted while ENGINE_OFFLINE is set."""
+
+_lock = threading.Lock()
+_sessions: Dict[str, requests.Session] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+_skipped: Dict[str, int] = {}
+_offline_clients: Dict[str, Dict[str, int]] = {}
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+def _new_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_RETRY_CONNECT,
+        connect=HTTP_RETRY_CONNECT,
+        read=1,
+        status=0,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        backoff_factor=HTTP_RETRY_BACKOFF_S,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers["Connection"] = "keep-alive"
+    return s
+
+def session_for(url: str) -> requests.Session:
+    """Keep-alive session shared by every caller talking to the same scheme://host."""
+    key = _host_key(url)
+    s = _sessions.get(key)
+    if s is not None:
+        return s
+    with _lock:
+        s = _sessions.get(key)
+        if s is None:
+            s = _sessions[key] = _new_session()
+            _stats[key] = {"requests": 0, "bytes": 0}
+        return s
+
+def _throttled(r: requests.Response) -> bool:
+    # a bare 503 backs off exponentially like a 429 without Retry-After
+    return r.status_code in (429, 503)
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    """
+    Drop-in for requests.get() that reuses the pooled per-host session and
+    goes through the host's rate-limit scheduler, retrying 429s and 503s
+    after Retry-After (or an exponential backoff without one). The last response is returned if throttling persists.
+    With HTTP_CASSETTE set, responses are recorded or replayed (engine.cassette).
+    """
+    if ENGINE_OFFLINE:
+        host = _host_key(url)
+        with _lock:
+            _skipped[host] = _skipped.get(host, 0) + 1
+        raise OfflineError(f"ENGINE_OFFLINE set; not fetching {url}")
+    sched = ratelimit.for_url(url)
+    sess = session_for(url)
+    tape = cassette.active()
+    send = tape.wrap(sess.get) if tape is not None else sess.get
+    parts = urlsplit(url)
+    with trace.span(f"GET {parts.netloc}", "http", host=parts.netloc, path=parts.path) as span_args:
+        for attempt in range(ratelimit.HTTP_429_RETRIES + 1):
+            with sched.slot():
+                r = send(url, **kwargs)
+            if not _throttled(r):
+                sched.ok()
+                break
+            sched.throttled(ratelimit.retry_after_s(r.headers, attempt))
+        span_args.update(status=r.status_code, bytes=len(r.content or b""), attempts=attempt + 1)
+    st = _stats.get(_host_key(url))
+    if st is not None:
+        with _lock:
+            st["requests"] += 1
+            st["bytes"] += len(r.content or b"")
+    return r
+
+def stats() -> Dict[str, Dict[str, int]]:
+    with _lock:
+        return {k: dict(v) for k, v in _stats.items()}
+
+def note_offline(client: str, *, stale: bool) -> None:
+    """A lookup the client answered offline: from an expired entry (stale) or not at all."""
+    with _lock:
+        st = _offline_clients.setdefault(client, {"stale_served": 0, "misses": 0})
+        st["stale_served" if stale else "misses"] += 1
+
+def offline_stats() -> Dict[str, Any]:
+    with _lock:
+        skipped = dict(_skipped)
+        clients = {k: dict(v) for k, v in _offline_clients.items()}
+    return {"enabled": ENGINE_OFFLINE, "skipped_requests": sum(skipped.values()),
+            "skipped_by_host": skipped, "clients": clients}
+
+def close_all() -> None:
+    """Close every session and reset the counters, so the next run starts from zero."""
+    with _lock:
+        for s in _sessions.values():
+            try: s.close()
+            except Exception: pass
+        _sessions.clear()
+        _stats.clear()
+        _skipped.clear()
+        _offline_clients.clear()
@@ -0,0 +1,65 @@
+# engine/singleflight.py
+from __future__ import annotations
+import threading
+from typing import Any, Callable, Dict, Optional
+
+class _Call:
+    __slots__ = ("event", "value", "exc")
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.exc: Optional[BaseException] = None
+
+class Group:
+    """
+    Coalesces duplicate work by key: while one caller runs fn(), concurrent
+    callers with the same key wait for its result instead of repeating it.
+    Completed results are memoized for the rest of the process (one run).
+    Exceptions are propagated to every waiter and never memoized.
+    """
+    def __init__(self, memo: bool = True) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._memo: Optional[Dict[str, Any]] = {} if memo else None
+        self.counts: Dict[str, int] = {"calls": 0, "memo_hits": 0, "coalesced": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            if self._memo is not None and key in self._memo:
+                self.counts["memo_hits"] += 1
+                return self._memo[key]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.counts["calls"] += 1
+            else:
+                self.counts["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.exc is not None:
+                raise call.exc
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.exc = e
+            raise
+        finally:
+            with self._lock:
+                if call.exc is None and self._memo is not None:
+                    self._memo[key] = call.value
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            if self._memo is not None:
+                self._memo.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
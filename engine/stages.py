@@ -0,0 +1,104 @@
+# engine/stages.py
+"""
+Per-stage accounting for engine.runner.
+
+  rec = StageRecorder(heartbeat)
+  with rec.stage("score", items_in=len(eligible)) as st:
+      ranked = scoring.score_items(...)
+      st["items_out"] = len(ranked)
+
+Each stage gets wall and CPU seconds, how far it pushed the process's peak
+RSS, items in/out (when the caller sets them), HTTP requests/bytes sent
+through engine.sessions and TMDB cache hits (memory + disk tiers) while it
+ran. A stage entered more than once (the seen filter runs twice) is summed.
+Every stage start/end is also pinged to the run's heartbeat.log (NDJSON),
+with ENGINE_TRACE set each call is a span in the trace (engine.trace), and
+with ENGINE_PROFILE set it is profiled (engine.profiler).
+"""
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None  # type: ignore[assignment]
+
+from . import profiler, sessions, tmdb, trace
+from .logging_utils import HeartbeatLogger
+
+def _peak_rss_kb() -> int:
+    if resource is None:
+        return 0
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+def _probe() -> Dict[str, float]:
+    http = sessions.stats().values()
+    tiers = tmdb.cache_stats()["tiers"]
+    return {
+        "wall": time.perf_counter(),
+        "cpu": time.process_time(),
+        "rss_kb": _peak_rss_kb(),
+        "http_requests": sum(v.get("requests", 0) for v in http),
+        "http_bytes": sum(v.get("bytes", 0) for v in http),
+        "cache_hits": tiers.get("mem_hits", 0) + tiers.get("disk_hits", 0),
+        "cache_lookups": tiers.get("lookups", 0),
+    }
+
+class StageRecorder:
+    def __init__(self, heartbeat: Optional[HeartbeatLogger] = None) -> None:
+        self.heartbeat = heartbeat
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str, *, items_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        io: Dict[str, Any] = {"items_in": items_in, "items_out": None}
+        if self.heartbeat is not None:
+            self.heartbeat.ping(f"{name}:begin", items_in=items_in)
+        before = _probe()
+        ok = False
+        with trace.span(name, "stage") as span_args:
+            try:
+                with profiler.stage(name):
+                    yield io
+                ok = True
+            finally:
+                after = _probe()
+                self._record(name, io, before, after, ok)
+                span_args.update(items_in=io.get("items_in"), items_out=io.get("items_out"),
+                                 http_requests=int(after["http_requests"] - before["http_requests"]))
+
+    def _record(self, name: str, io: Dict[str, Any], before: Dict[str, float], after: Dict[str, float],
+                ok: bool) -> None:
+        rec = self.stages.setdefault(name, {
+            "calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_rss_delta_mb": 0.0, "peak_rss_mb": 0.0,
+            "items_in": None, "items_out": None, "http_requests": 0, "http_bytes": 0,
+            "cache_hits": 0, "cache_lookups": 0, "failed": 0,
+        })
+        rec["calls"] += 1
+        rec["failed"] += 0 if ok else 1
+        rec["wall_s"] = round(rec["wall_s"] + after["wall"] - before["wall"], 4)
+        rec["cpu_s"] = round(rec["cpu_s"] + after["cpu"] - before["cpu"], 4)
+        rec["peak_rss_delta_mb"] = round(rec["peak_rss_delta_mb"] + (after["rss_kb"] - before["rss_kb"]) / 1024.0, 2)
+        rec["peak_rss_mb"] = round(after["rss_kb"] / 1024.0, 2)
+        for k in ("http_requests", "http_bytes", "cache_hits", "cache_lookups"):
+            rec[k] += int(after[k] - before[k])
+        for k in ("items_in", "items_out"):
+            if io.get(k) is not None:
+                rec[k] = (rec[k] or 0) + int(io[k])
+        if self.heartbeat is not None:
+            self.heartbeat.ping(f"{name}:end", ok=ok, items_out=io.get("items_out"),
+                                wall_s=round(after["wall"] - before["wall"], 3),
+                                cpu_s=round(after["cpu"] - before["cpu"], 3),
+                                http=int(after["http_requests"] - before["http_requests"]),
+                                rss_mb=rec["peak_rss_mb"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        total_wall = sum(r["wall_s"] for r in self.stages.values())
+        return {
+            "stages": {k: dict(v) for k, v in self.stages.items()},
+            "total_wall_s": round(total_wall, 3),
+            "total_cpu_s": round(sum(r["cpu_s"] for r in self.stages.values()), 3),
+            "slowest": max(self.stages, key=lambda k: self.stages[k]["wall_s"]) if self.stages else None,
+        }
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional
 from datetime import date, datetime
 
+from . import perf_history
 from . import recency
 from . import tmdb
 
@@ -139,7 +140,8 @@ def _ensure_providers(it: Dict[str, Any], region: str) -> None:
     kind=(it.get("media_type") or "").lower()
     tid = it.get("tmdb_id")
     if not kind or not tid: return
-    if it.get("providers"): return
+    # enrich stores [] when TMDB had no providers; only fetch when never resolved
+    if "providers" in it: return
     try:
         provs = tmdb.get_title_watch_providers(kind, int(tid), region)
         if provs: it["providers"] = provs
@@ -199,11 +201,19 @@ def _build_lines(ranked_items: List[Dict[str,Any]], *, region: str, allowed_prov
             extras=[it for it in ranked_items if (it.get("media_type") or "").lower()=="tv" and (it.get("score") or 0)>=tmin and it not in shows]
             shows = (shows + extras)[:max(EMAIL_TOP_TV, len(shows))]
 
+    # Provider display is needed for rendering and for the breakdown; resolve once per item
+    prov_memo: Dict[int, List[str]] = {}
+    def providers_for(it: Dict[str,Any]) -> List[str]:
+        k = id(it)
+        if k not in prov_memo:
+            prov_memo[k] = _providers_display_for_item(it, allowed_provider_slugs, region)
+        return prov_memo[k]
+
     # Enforce provider restriction at render time
     def render_items(items: List[Dict[str,Any]], top_n: int) -> List[str]:
         out=[]
         for it in items:
-            providers = _providers_display_for_item(it, allowed_provider_slugs, region)
+            providers = providers_for(it)
             if not providers:
                 continue
             rec = _recency_label(it)
@@ -225,7 +235,7 @@ def _build_lines(ranked_items: List[Dict[str,Any]], *, region: str, allowed_prov
         "anime_excluded": len([it for it in ranked_items if _is_anime_like(it)]),
         "feedback_suppressed": 0,  # deprecated, kept for telemetry continuity
         "rotation_cooldown": 0,    # computed elsewhere; placeholder
-        "no_allowed_provider": len([it for it in ranked_items if not _providers_display_for_item(it, allowed_provider_slugs, region)]),
+        "no_allowed_provider": len([it for it in ranked_items if not providers_for(it)]),
         "selected_movies": len(movie_lines)//3,
         "selected_tv": len(show_lines)//3,
     }
@@ -245,6 +255,8 @@ def _build_lines(ranked_items: List[Dict[str,Any]], *, region: str, allowed_prov
         lines.append(f"- Region: **{region}**")
         lines.append(f"- SUBS_INCLUDE: `{subs}`")
         lines.append("")
+        if _bool("EMAIL_PERF_TREND", False):
+            lines.extend(perf_history.trend_markdown(perf_history.load()))
 
     body = "\n".join(lines)
     return body, breakdown
@@ -1,13 +1,99 @@
 # engine/tmdb.py
 from __future__ import annotations
-import os, json, time, hashlib, pathlib
+import os, time, threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+from . import cache_backend
+from . import cache_keys
+from . import revalidate
+from . import sessions
+from . import trace
+from .memcache import LRUCache
+from .singleflight import Group
 
 _TMDb_V3 = "https://api.themoviedb.org/3"
-_CACHE_DIR = pathlib.Path("data/cache/tmdb")
-_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+_NS = cache_keys.TMDB_NS   # data/cache/tmdb/ with the files backend
+
+def _bool(n: str, d: bool) -> bool:
+    v = (os.getenv(n, "") or "").strip().lower()
+    if v in {"1","true","yes","on"}: return True
+    if v in {"0","false","no","off"}: return False
+    return d
+def _int(n: str, d: int) -> int:
+    try: return int(os.getenv(n, "") or d)
+    except Exception: return d
+
+# Two-tier response cache keyed by the hashed request: a bounded in-process
+# LRU of decoded (data, fetched_ts, status, meta) tuples in front of the
+# cache_backend store; meta holds the response validators (engine.revalidate).
+# Identical in-flight misses are coalesced so only one worker reads/fetches.
+TMDB_MEM_CACHE_ENTRIES = _int("TMDB_MEM_CACHE_ENTRIES", 4096)
+TMDB_MEM_CACHE_MB      = _int("TMDB_MEM_CACHE_MB", 64)
+_mem = LRUCache(TMDB_MEM_CACHE_ENTRIES, TMDB_MEM_CACHE_MB * 1024 * 1024)
+_flight = Group(memo=False)
+_Hit = Tuple[Any, float, str, Dict[str, Any]]
+_tier_lock = threading.Lock()
+_tier_counts: Dict[str, int] = {
+    "lookups": 0, "mem_hits": 0, "disk_lookups": 0, "disk_hits": 0,
+    "network": 0, "network_errors": 0, "negative_hits": 0, "negative_stored": 0,
+    "swr_served": 0, "swr_refreshes": 0, "refresh_ahead": 0,
+    "reprojected": 0, "schema_refetch": 0,
+}
+
+# Negative entries: known-missing resources are cached as {} with a status
+# and their own TTL (independent of the caller's), so they cost no request
+# until it runs out. "error" covers timeouts/5xx and only lives long enough
+# to stop the rest of a run from retrying the same URL.
+TMDB_NOT_FOUND_TTL_S = _int("TMDB_NOT_FOUND_TTL_S", 3 * 24 * 3600)
+TMDB_EMPTY_TTL_S     = _int("TMDB_EMPTY_TTL_S", 24 * 3600)
+TMDB_ERROR_TTL_S     = _int("TMDB_ERROR_TTL_S", 30 * 60)
+_NEGATIVE_TTL = {"not_found": TMDB_NOT_FOUND_TTL_S, "empty": TMDB_EMPTY_TTL_S, "error": TMDB_ERROR_TTL_S}
+
+# Stale-while-revalidate (opt-in): an entry past its TTL by at most
+# TMDB_SWR_MAX_STALE_S is returned as-is and refetched on a background pool.
+# Refreshes go through sessions.get, so the host rate limiter bounds them;
+# drain_refreshes() waits for the queue before the run exits.
+TMDB_SWR             = _bool("TMDB_SWR", False)
+TMDB_SWR_MAX_STALE_S = _int("TMDB_SWR_MAX_STALE_S", 7 * 24 * 3600)
+TMDB_SWR_WORKERS     = _int("TMDB_SWR_WORKERS", 4)
+_swr_lock = threading.Lock()
+_swr_pool: Optional[ThreadPoolExecutor] = None
+_swr_pending: Dict[str, Future] = {}
+
+# Projection-on-write: callers that only normalize a payload name a projection
+# (_PROJECTIONS) and the entry is stored with just the fields the normalizer
+# reads, tagged meta["proj"] = "<name>@<TMDB_PROJECTION_VERSION>". Projected
+# entries live under their own key (_cache_key with project), never under the
+# canonical key other clients read full payloads from; a full entry already
+# cached there seeds the projected one on first read. An entry written under
+# another version is a miss and gets refetched, so bump the version whenever
+# a projection drops a field a normalizer starts to need.
+TMDB_PROJECT            = _bool("TMDB_PROJECT", True)
+TMDB_PROJECTION_VERSION = 1
+
+def _count(name: str) -> None:
+    with _tier_lock:
+        _tier_counts[name] += 1
+
+def _ttl_for(hit: _Hit, ttl_s: int) -> int:
+    # negatives use their own TTL; positives the one learned for the key (engine.revalidate)
+    if hit[2] != "ok":
+        return _NEGATIVE_TTL.get(hit[2], ttl_s)
+    return revalidate.effective_ttl(hit[3], ttl_s)
+
+def _fresh(hit: _Hit, ttl_s: int) -> bool:
+    return (time.time() - hit[1]) <= _ttl_for(hit, ttl_s)
+
+def _servable_stale(hit: _Hit, ttl_s: int) -> bool:
+    return TMDB_SWR and hit[2] == "ok" and (time.time() - hit[1]) <= _ttl_for(hit, ttl_s) + TMDB_SWR_MAX_STALE_S
+
+def _proj_tag(project: str) -> str:
+    return f"{project}@{TMDB_PROJECTION_VERSION}"
+
+def _current(hit: _Hit, project: Optional[str]) -> bool:
+    """False when hit holds a positive payload in another shape than the caller's projection (or full payload)."""
+    return hit[2] != "ok" or (hit[3] or {}).get("proj") == (_proj_tag(project) if project else None)
 
 _API_KEY = (os.getenv("TMDB_API_KEY") or "").strip()
 _BEARER  = (os.getenv("TMDB_BEARER") or os.getenv("TMDB_ACCESS_TOKEN") or "").strip()
@@ -23,34 +109,255 @@ def _with_key(params: Dict[str, Any]) -> Dict[str, Any]:
         params = {**params, "api_key": _API_KEY}
     return params
 
-def _cache_path(url: str, params: Dict[str, Any]) -> pathlib.Path:
-    sig = json.dumps({"u": url, "p": params}, sort_keys=True, ensure_ascii=False)
-    key = hashlib.sha256(sig.encode("utf-8")).hexdigest()[:32]
-    return _CACHE_DIR / f"{key}.json"
-
-def _get_json(url: str, params: Dict[str, Any], *, ttl_s: int = 3600, timeout: int = 16) -> Dict[str, Any]:
+def _cache_key(url: str, params: Dict[str, Any], project: Optional[str] = None) -> str:
+    # credentials are not part of the key (engine.cache_keys), so key rotation keeps the cache;
+    # a projection gets a key of its own so full-payload readers never see it
+    key = cache_keys.canonical_key(url, params)
+    return f"{key}.{project}" if project and TMDB_PROJECT else key
+
+def _cache_age(url: str, params: Dict[str, Any], project: Optional[str] = None) -> Optional[float]:
+    """Seconds since the cached response for (url, params) was fetched, or None."""
+    key = _cache_key(url, _with_key(params or {}), project)
+    hit = _mem.peek(key)
+    if hit is not None:
+        return time.time() - hit[1]
+    entry = cache_backend.store().get(_NS, key)
+    return entry.age() if entry is not None else None
+
+def _get_json(url: str, params: Dict[str, Any], *, ttl_s: int = 3600, timeout: int = 16,
+              empty_is_negative: bool = False, project: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Cached GET. With empty_is_negative, a 200 whose "results" list is empty is
+    stored as a negative "empty" entry (TMDB_EMPTY_TTL_S) instead of data.
+    With project, the payload is stored (and returned) in that projection.
+    """
     params = _with_key(params or {})
-    cp = _cache_path(url, params)
-    if cp.exists():
-        try:
-            if (time.time() - cp.stat().st_mtime) <= ttl_s:
-                return json.loads(cp.read_text(encoding="utf-8", errors="replace"))
-        except Exception:
-            pass
+    project = project if TMDB_PROJECT else None
+    key = _cache_key(url, params, project)
+    opts = {"ttl_s": ttl_s, "timeout": timeout, "empty_is_negative": empty_is_negative, "project": project}
+    _count("lookups")
+    with trace.span("tmdb.cache", "cache", path=url[len(_TMDb_V3):] if url.startswith(_TMDb_V3) else url) as span_args:
+        hit = _mem.get(key)
+        if hit is not None and not _current(hit, project):
+            hit = None
+        if hit is not None and _fresh(hit, ttl_s):
+            _count("mem_hits")
+            if hit[2] != "ok":
+                _count("negative_hits")
+            span_args["result"] = "mem_hit"
+            return hit[0]
+        if hit is not None and _servable_stale(hit, ttl_s):
+            if not sessions.ENGINE_OFFLINE:
+                _revalidate(key, url, params, hit, opts)
+            span_args["result"] = "mem_stale"
+            return hit[0]
+        span_args["result"] = "mem_miss"
+        return _flight.do(key, lambda: _load_or_fetch(key, url, params, **opts))
+
+def _read_store(key: str) -> Optional[_Hit]:
+    try:
+        entry = cache_backend.store().get(_NS, key)
+    except Exception:
+        return None
+    if entry is None:
+        return None
+    hit = (entry.data, entry.fetched_at, entry.status, entry.meta)
+    _mem.put(key, hit, entry.raw_size)
+    return hit
+
+def _store_put(key: str, data: Any, *, ttl_s: int, status: str = "ok", meta: Optional[Dict[str, Any]] = None,
+               fetched_at: Optional[float] = None) -> None:
+    now = fetched_at or time.time()
+    try:
+        size = cache_backend.store().put(_NS, key, data, fetched_at=now, ttl_s=ttl_s, status=status, meta=meta)
+    except Exception:
+        size = 0
+    _mem.put(key, (data, now, status, meta or {}), size)
+    if status != "ok":
+        _count("negative_stored")
+
+def _store_touch(key: str, hit: _Hit, ttl_s: int) -> Any:
+    """
+    The stale entry was revalidated: restart its TTL (stretched, since it did
+    not change) and keep the payload as it is.
+    """
+    now = time.time()
+    meta = hit[3]
+    learned = revalidate.adapt_ttl(meta, ttl_s, changed=False)
+    if learned and learned.get("ttl") != meta.get("ttl"):
+        meta = {**meta, **learned}
+        update: Dict[str, Any] = {"ttl_s": revalidate.effective_ttl(meta, ttl_s), "meta": meta}
+    else:
+        update = {}
+    try:
+        cache_backend.store().touch(_NS, key, now, **update)
+    except Exception:
+        pass
+    _mem.put(key, (hit[0], now, hit[2], meta), int(meta.get("bytes") or 0))
+    return hit[0]
+
+def _project_shared(key: str, url: str, params: Dict[str, Any], project: str, ttl_s: int) -> Optional[_Hit]:
+    """
+    Seed the projected entry from a full payload cached under the canonical
+    key (by an older run or another client), keeping its age and validators.
+    The full entry itself is left as it is.
+    """
+    try:
+        entry = cache_backend.store().get(_NS, _cache_key(url, params))
+    except Exception:
+        return None
+    if entry is None or entry.status != "ok" or (entry.meta or {}).get("proj"):
+        return None
+    _count("reprojected")
+    data = _PROJECTIONS[project](entry.data)
+    meta = {**(entry.meta or {}), "proj": _proj_tag(project), "sha": revalidate.payload_hash(data)}
+    _store_put(key, data, ttl_s=revalidate.effective_ttl(meta, ttl_s), meta=meta, fetched_at=entry.fetched_at)
+    return (data, entry.fetched_at, entry.status, meta)
+
+def _load_or_fetch(key: str, url: str, params: Dict[str, Any], *, ttl_s: int, timeout: int,
+                   empty_is_negative: bool = False, project: Optional[str] = None) -> Dict[str, Any]:
+    opts = {"ttl_s": ttl_s, "timeout": timeout, "empty_is_negative": empty_is_negative, "project": project}
+    _count("disk_lookups")
+    with trace.span("tmdb.store", "cache") as span_args:
+        disk = _read_store(key)
+        if disk is None and project:
+            disk = _project_shared(key, url, params, project, ttl_s)
+        if disk is not None and not _current(disk, project):
+            _count("schema_refetch")
+            span_args["result"] = "schema_refetch"
+            return _fetch(key, url, params, disk, **opts)
+        if disk is not None and _fresh(disk, ttl_s):
+            _count("disk_hits")
+            cache_backend.note_hit(_NS, time.time() - disk[1])
+            if disk[2] != "ok":
+                _count("negative_hits")
+            span_args["result"] = "disk_hit"
+            return disk[0]
+        if disk is not None and _servable_stale(disk, ttl_s):
+            # offline there is nothing to revalidate against; the stale value is the answer
+            if not sessions.ENGINE_OFFLINE:
+                _revalidate(key, url, params, disk, opts)
+            span_args["result"] = "disk_stale"
+            return disk[0]
+        span_args["result"] = "miss"
+        return _fetch(key, url, params, disk, **opts)
+
+def _fetch(key: str, url: str, params: Dict[str, Any], stale: Optional[_Hit], *,
+           ttl_s: int, timeout: int, empty_is_negative: bool = False, project: Optional[str] = None) -> Dict[str, Any]:
+    valid = stale if stale is not None and stale[2] == "ok" else None
+    # validators and the body hash only vouch for the stored payload if it is in the wanted shape
+    same = valid if valid is not None and _current(valid, project) else None
+    headers = _headers()
+    if same is not None:
+        cond = revalidate.conditional_headers(same[3])
+        if cond:
+            headers.update(cond)
+            revalidate.note("tmdb", "conditional")
     try:
-        r = requests.get(url, headers=_headers(), params=params, timeout=timeout)
+        if not sessions.ENGINE_OFFLINE:
+            _count("network")
+        r = sessions.get(url, headers=headers, params=params, timeout=timeout)
+        if r.status_code == 304 and same is not None:
+            revalidate.note("tmdb", "not_modified", int(same[3].get("bytes") or 0))
+            return _store_touch(key, same, ttl_s)
+        if r.status_code == 404:
+            _store_put(key, {}, ttl_s=TMDB_NOT_FOUND_TTL_S, status="not_found")
+            return {}
         r.raise_for_status()
+        body = r.content
         data = r.json()
-        cp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        if empty_is_negative and isinstance(data, dict) and not data.get("results"):
+            _store_put(key, {}, ttl_s=TMDB_EMPTY_TTL_S, status="empty")
+            return {}
+        if project:
+            data = _PROJECTIONS[project](data)
+        # "changed" means changed in what the engine stores, not in the raw body
+        # (popularity and vote counts move on every fetch)
+        if same is not None and revalidate.unchanged_payload(same[3], data):
+            revalidate.note("tmdb", "same_hash", len(body))
+            return _store_touch(key, same, ttl_s)
+        if same is not None:
+            revalidate.note("tmdb", "changed")
+        meta = revalidate.validators_from(r, body, payload=data)
+        meta["req"] = cache_keys.canonical_request(url, params)
+        if project:
+            meta["proj"] = _proj_tag(project)
+        # entries hashed before payload hashing can't tell a real change apart
+        changed = True if same is not None and revalidate.has_payload_hash(same[3]) else None
+        meta.update(revalidate.adapt_ttl(same[3] if same is not None else None, ttl_s, changed=changed))
+        meta.update(revalidate.jitter_meta())
+        _store_put(key, data, ttl_s=revalidate.effective_ttl(meta, ttl_s), meta=meta)
         return data
+    except sessions.OfflineError:
+        # answer from the cache whatever its age; nothing is written, not even an error entry
+        sessions.note_offline("tmdb", stale=valid is not None)
+        return valid[0] if valid is not None else {}
     except Exception:
-        if cp.exists():
-            try:
-                return json.loads(cp.read_text(encoding="utf-8", errors="replace"))
-            except Exception:
-                pass
+        _count("network_errors")
+        if valid is not None:
+            return valid[0]
+        _store_put(key, {}, ttl_s=TMDB_ERROR_TTL_S, status="error")
         return {}
 
+def _revalidate(key: str, url: str, params: Dict[str, Any], stale: _Hit, opts: Dict[str, Any]) -> None:
+    """Queue a background refetch of key (once); the caller serves the stale value."""
+    global _swr_pool
+    _count("swr_served")
+    with _swr_lock:
+        if key in _swr_pending:
+            return
+        if _swr_pool is None:
+            _swr_pool = ThreadPoolExecutor(max_workers=max(1, TMDB_SWR_WORKERS), thread_name_prefix="tmdb-swr")
+        _count("swr_refreshes")
+        _swr_pending[key] = _swr_pool.submit(_refresh, key, url, params, stale, opts)
+
+def _refresh(key: str, url: str, params: Dict[str, Any], stale: _Hit, opts: Dict[str, Any]) -> None:
+    try:
+        _fetch(key, url, params, stale, **opts)
+    finally:
+        with _swr_lock:
+            _swr_pending.pop(key, None)
+
+def drain_refreshes() -> None:
+    """Block until every queued stale-while-revalidate refresh has finished."""
+    global _swr_pool
+    with _swr_lock:
+        pool, _swr_pool = _swr_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+def time_to_expiry(url: str, params: Dict[str, Any], ttl_s: int, *, project: Optional[str] = None) -> Optional[float]:
+    """Seconds until the cached positive response for (url, params) goes stale; None if not cached."""
+    key = _cache_key(url, _with_key(params or {}), project)
+    hit = _mem.peek(key) or _read_store(key)
+    if hit is None or hit[2] != "ok":
+        return None
+    return _ttl_for(hit, ttl_s) - (time.time() - hit[1])
+
+def refresh(url: str, params: Dict[str, Any], *, ttl_s: int, timeout: int = 16,
+            project: Optional[str] = None) -> None:
+    """
+    Refetch (url, params) now regardless of freshness, conditionally when the
+    entry has validators; used by engine.refresh_ahead. A no-op offline.
+    """
+    if sessions.ENGINE_OFFLINE:
+        return
+    params = _with_key(params or {})
+    project = project if TMDB_PROJECT else None
+    key = _cache_key(url, params, project)
+    stale = _mem.peek(key) or _read_store(key)
+    _count("refresh_ahead")
+    _flight.do(key, lambda: _fetch(key, url, params, stale, ttl_s=ttl_s, timeout=timeout, project=project))
+
+def cache_stats() -> Dict[str, Any]:
+    with _tier_lock:
+        tiers: Dict[str, Any] = dict(_tier_counts)
+    mem = _mem.stats()
+    lookups = tiers["lookups"] or 0
+    tiers["mem_hit_ratio"] = round(tiers["mem_hits"] / lookups, 4) if lookups else 0.0
+    tiers["disk_hit_ratio"] = round(tiers["disk_hits"] / tiers["disk_lookups"], 4) if tiers["disk_lookups"] else 0.0
+    return {"backend": cache_backend.CACHE_BACKEND, "tiers": tiers, "mem": mem, "singleflight": _flight.stats()}
+
 # ---------- Normalizers ----------
 def _norm_company_names(companies: Any) -> List[str]:
     out: List[str] = []
@@ -149,57 +456,63 @@ def _page_params(page: int) -> Dict[str, Any]:
     return {"page": max(1, min(1000, p))}
 
 def discover_movie(*, page: int = 1, region: str = "US", langs: List[str] | None = None) -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/discover/movie", {"region": region, **_page_params(page), **({"with_original_language": langs[0]} if langs and len(langs)==1 else {})}, ttl_s=8*3600)
+    data = _get_json(f"{_TMDb_V3}/discover/movie", {"region": region, **_page_params(page), **({"with_original_language": langs[0]} if langs and len(langs)==1 else {})}, ttl_s=8*3600, project="results")
     return [_basic_from_result("movie", r) for r in (data.get("results") or [])]
 
 def discover_tv(*, page: int = 1, region: str = "US", langs: List[str] | None = None) -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/discover/tv", {"region": region, **_page_params(page), **({"with_original_language": langs[0]} if langs and len(langs)==1 else {})}, ttl_s=8*3600)
+    data = _get_json(f"{_TMDb_V3}/discover/tv", {"region": region, **_page_params(page), **({"with_original_language": langs[0]} if langs and len(langs)==1 else {})}, ttl_s=8*3600, project="results")
     return [_basic_from_result("tv", r) for r in (data.get("results") or [])]
 
 def popular_movie(*, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/movie/popular", {"region": region, **_page_params(page)}, ttl_s=8*3600)
+    data = _get_json(f"{_TMDb_V3}/movie/popular", {"region": region, **_page_params(page)}, ttl_s=8*3600, project="results")
     return [_basic_from_result("movie", r) for r in (data.get("results") or [])]
 
 def top_rated_movie(*, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/movie/top_rated", {"region": region, **_page_params(page)}, ttl_s=8*3600)
+    data = _get_json(f"{_TMDb_V3}/movie/top_rated", {"region": region, **_page_params(page)}, ttl_s=8*3600, project="results")
     return [_basic_from_result("movie", r) for r in (data.get("results") or [])]
 
 def now_playing_movie(*, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/movie/now_playing", {"region": region, **_page_params(page)}, ttl_s=4*3600)
+    data = _get_json(f"{_TMDb_V3}/movie/now_playing", {"region": region, **_page_params(page)}, ttl_s=4*3600, project="results")
     return [_basic_from_result("movie", r) for r in (data.get("results") or [])]
 
 def upcoming_movie(*, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/movie/upcoming", {"region": region, **_page_params(page)}, ttl_s=8*3600)
+    data = _get_json(f"{_TMDb_V3}/movie/upcoming", {"region": region, **_page_params(page)}, ttl_s=8*3600, project="results")
     return [_basic_from_result("movie", r) for r in (data.get("results") or [])]
 
 def trending_movie(*, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/trending/movie/day", _page_params(page), ttl_s=4*3600)
+    data = _get_json(f"{_TMDb_V3}/trending/movie/day", _page_params(page), ttl_s=4*3600, project="results")
     return [_basic_from_result("movie", r) for r in (data.get("results") or [])]
 
 def popular_tv(*, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/tv/popular", {"region": region, **_page_params(page)}, ttl_s=8*3600)
+    data = _get_json(f"{_TMDb_V3}/tv/popular", {"region": region, **_page_params(page)}, ttl_s=8*3600, project="results")
     return [_basic_from_result("tv", r) for r in (data.get("results") or [])]
 
 def top_rated_tv(*, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/tv/top_rated", {"region": region, **_page_params(page)}, ttl_s=8*3600)
+    data = _get_json(f"{_TMDb_V3}/tv/top_rated", {"region": region, **_page_params(page)}, ttl_s=8*3600, project="results")
     return [_basic_from_result("tv", r) for r in (data.get("results") or [])]
 
 def airing_today_tv(*, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/tv/airing_today", {"region": region, **_page_params(page)}, ttl_s=4*3600)
+    data = _get_json(f"{_TMDb_V3}/tv/airing_today", {"region": region, **_page_params(page)}, ttl_s=4*3600, project="results")
     return [_basic_from_result("tv", r) for r in (data.get("results") or [])]
 
 def on_the_air_tv(*, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/tv/on_the_air", {"region": region, **_page_params(page)}, ttl_s=4*3600)
+    data = _get_json(f"{_TMDb_V3}/tv/on_the_air", {"region": region, **_page_params(page)}, ttl_s=4*3600, project="results")
     return [_basic_from_result("tv", r) for r in (data.get("results") or [])]
 
 def trending_tv(*, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
-    data = _get_json(f"{_TMDb_V3}/trending/tv/day", _page_params(page), ttl_s=4*3600)
+    data = _get_json(f"{_TMDb_V3}/trending/tv/day", _page_params(page), ttl_s=4*3600, project="results")
     return [_basic_from_result("tv", r) for r in (data.get("results") or [])]
 
 # ---------- Per-title ----------
-def get_details(kind: str, tmdb_id: int) -> Dict[str, Any]:
-    if kind not in {"movie","tv"}: return {}
-    data = _get_json(f"{_TMDb_V3}/{kind}/{tmdb_id}", {"append_to_response": "content_ratings,release_dates"}, ttl_s=14*24*3600)
+# Freshness per resource; the hydrated call below is cached at the credits TTL
+# and falls back to the standalone providers endpoint once older than 2 days.
+_TTL_DETAILS   = 14*24*3600
+_TTL_CREDITS   = 14*24*3600
+_TTL_KEYWORDS  = 21*24*3600
+_TTL_EXTERNAL  = 60*24*3600
+_TTL_PROVIDERS = 2*24*3600
+
+def _norm_details(kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
     out: Dict[str, Any] = {}
     if kind == "movie":
         out["runtime"] = data.get("runtime")
@@ -225,9 +538,7 @@ def get_details(kind: str, tmdb_id: int) -> Dict[str, Any]:
     out["year"] = year
     return out
 
-def get_credits(kind: str, tmdb_id: int) -> Dict[str, Any]:
-    if kind not in {"movie","tv"}: return {}
-    data = _get_json(f"{_TMDb_V3}/{kind}/{tmdb_id}/credits", {}, ttl_s=14*24*3600)
+def _norm_credits(data: Dict[str, Any]) -> Dict[str, Any]:
     out: Dict[str, Any] = {"directors": [], "writers": [], "cast": []}
     crew = data.get("crew") or []; cast = data.get("cast") or []
 
@@ -255,14 +566,9 @@ def get_credits(kind: str, tmdb_id: int) -> Dict[str, Any]:
     out["cast"]=names[:8]
     return out
 
-def get_keywords(kind: str, tmdb_id: int) -> List[str]:
-    if kind not in {"movie","tv"}: return []
-    if kind=="movie":
-        data = _get_json(f"{_TMDb_V3}/movie/{tmdb_id}/keywords", {}, ttl_s=21*24*3600)
-        ks = data.get("keywords") or []
-    else:
-        data = _get_json(f"{_TMDb_V3}/tv/{tmdb_id}/keywords", {}, ttl_s=21*24*3600)
-        ks = data.get("results") or []
+def _norm_keywords(kind: str, data: Dict[str, Any]) -> List[str]:
+    # movies nest under "keywords", tv under "results"
+    ks = (data.get("keywords") if kind == "movie" else data.get("results")) or []
     out: List[str] = []
     for k in ks:
         name = k.get("name") if isinstance(k, dict) else None
@@ -273,17 +579,13 @@ def get_keywords(kind: str, tmdb_id: int) -> List[str]:
             seen.add(k); dedup.append(k)
     return dedup[:60]
 
-def get_external_ids(kind: str, tmdb_id: int) -> Dict[str, Any]:
-    if kind not in {"movie","tv"}: return {}
-    data = _get_json(f"{_TMDb_V3}/{kind}/{tmdb_id}/external_ids", {}, ttl_s=60*24*3600)
+def _norm_external_ids(data: Dict[str, Any]) -> Dict[str, Any]:
     out = {}
     imdb_id = data.get("imdb_id")
     if imdb_id: out["imdb_id"] = imdb_id
     return out
 
-def get_title_watch_providers(kind: str, tmdb_id: int, region: str = "US") -> List[str]:
-    if kind not in {"movie","tv"}: return []
-    data = _get_json(f"{_TMDb_V3}/{kind}/{tmdb_id}/watch/providers", {}, ttl_s=2*24*3600)
+def _norm_providers(data: Dict[str, Any], region: str) -> List[str]:
     res = (data.get("results") or {}).get(region.upper()) or {}
     slugs = _extract_provider_slugs(res)
     seen=set(); out=[]
@@ -292,6 +594,127 @@ def get_title_watch_providers(kind: str, tmdb_id: int, region: str = "US") -> Li
             seen.add(s); out.append(s)
     return out
 
+# ---------- Projections (what the normalizers above read) ----------
+_RESULT_FIELDS = ("id", "media_type", "title", "original_title", "name", "original_name",
+                  "release_date", "first_air_date", "popularity", "original_language")
+_DETAIL_FIELDS = ("id", "title", "original_title", "name", "original_name", "release_date",
+                  "first_air_date", "last_air_date", "runtime", "number_of_seasons",
+                  "episode_run_time", "original_language", "vote_average")
+
+def _keep(d: Any, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    return {k: d[k] for k in fields if k in d} if isinstance(d, dict) else {}
+
+def _keep_each(xs: Any, fields: Tuple[str, ...]) -> List[Any]:
+    return [_keep(x, fields) if isinstance(x, dict) else x for x in xs] if isinstance(xs, list) else []
+
+def _project_results(data: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: data[k] for k in ("page", "total_pages", "total_results") if k in data}
+    out["results"] = _keep_each(data.get("results"), _RESULT_FIELDS)
+    return out
+
+def _project_details(data: Dict[str, Any]) -> Dict[str, Any]:
+    out = _keep(data, _DETAIL_FIELDS)
+    for k in ("genres", "production_companies"):
+        out[k] = _keep_each(data.get(k), ("name",))
+    out["networks"] = _keep_each(data.get("networks"), ("name", "abbr", "network"))
+    return out
+
+def _project_credits(data: Dict[str, Any]) -> Dict[str, Any]:
+    # only the crew _norm_credits can pick and the 12 cast members it looks at
+    crew = [_keep(c, ("department", "job", "name")) for c in (data.get("crew") or [])
+            if isinstance(c, dict) and (c.get("department") or "").lower() in {"directing", "writing"}]
+    cast = sorted((c for c in (data.get("cast") or []) if isinstance(c, dict)),
+                  key=lambda x: int(x.get("order") or 9999))
+    return {"crew": crew, "cast": [_keep(c, ("name", "order")) for c in cast[:12]]}
+
+def _project_keywords(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: _keep_each(data[k], ("name",)) for k in ("keywords", "results") if k in data}
+
+def _project_external_ids(data: Dict[str, Any]) -> Dict[str, Any]:
+    return _keep(data, ("imdb_id",))
+
+def _project_providers(data: Dict[str, Any]) -> Dict[str, Any]:
+    res = data.get("results") if isinstance(data.get("results"), dict) else {}
+    return {"results": {region: {k: _keep_each(block.get(k), ("provider_name",)) for k in ("flatrate", "ads") if block.get(k)}
+                        for region, block in res.items() if isinstance(block, dict)}}
+
+def _project_title(data: Dict[str, Any]) -> Dict[str, Any]:
+    out = _project_details(data)
+    out["credits"] = _project_credits(data.get("credits") or {})
+    out["keywords"] = _project_keywords(data.get("keywords") or {})
+    out["external_ids"] = _project_external_ids(data.get("external_ids") or {})
+    out["watch/providers"] = _project_providers(data.get("watch/providers") or {})
+    return out
+
+_PROJECTIONS: Dict[str, Any] = {
+    "results": _project_results,
+    "details": _project_details,
+    "credits": _project_credits,
+    "keywords": _project_keywords,
+    "external_ids": _project_external_ids,
+    "providers": _project_providers,
+    "title": _project_title,
+}
+
+def title_request(kind: str, tmdb_id: int, *, hydrate: bool = False) -> Tuple[str, Dict[str, Any], int]:
+    """(url, params, ttl_s) of the request behind get_title_bundle (hydrate) or get_details."""
+    if hydrate:
+        return f"{_TMDb_V3}/{kind}/{tmdb_id}", {"append_to_response": _HYDRATE_APPEND}, _TTL_CREDITS
+    return f"{_TMDb_V3}/{kind}/{tmdb_id}", {"append_to_response": "content_ratings,release_dates"}, _TTL_DETAILS
+
+def get_details(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    if kind not in {"movie","tv"}: return {}
+    url, params, ttl_s = title_request(kind, tmdb_id)
+    data = _get_json(url, params, ttl_s=ttl_s, project="details")
+    return _norm_details(kind, data)
+
+def get_credits(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    if kind not in {"movie","tv"}: return {}
+    data = _get_json(f"{_TMDb_V3}/{kind}/{tmdb_id}/credits", {}, ttl_s=_TTL_CREDITS, project="credits")
+    return _norm_credits(data)
+
+def get_keywords(kind: str, tmdb_id: int) -> List[str]:
+    if kind not in {"movie","tv"}: return []
+    data = _get_json(f"{_TMDb_V3}/{kind}/{tmdb_id}/keywords", {}, ttl_s=_TTL_KEYWORDS, project="keywords")
+    return _norm_keywords(kind, data)
+
+def get_external_ids(kind: str, tmdb_id: int) -> Dict[str, Any]:
+    if kind not in {"movie","tv"}: return {}
+    data = _get_json(f"{_TMDb_V3}/{kind}/{tmdb_id}/external_ids", {}, ttl_s=_TTL_EXTERNAL, project="external_ids")
+    return _norm_external_ids(data)
+
+def get_title_watch_providers(kind: str, tmdb_id: int, region: str = "US") -> List[str]:
+    if kind not in {"movie","tv"}: return []
+    data = _get_json(f"{_TMDb_V3}/{kind}/{tmdb_id}/watch/providers", {}, ttl_s=_TTL_PROVIDERS, project="providers")
+    return _norm_providers(data, region)
+
+_HYDRATE_APPEND = "credits,keywords,external_ids,watch/providers,content_ratings,release_dates"
+
+def get_title_bundle(kind: str, tmdb_id: int, region: str = "US") -> Dict[str, Any]:
+    """
+    Hydrate a title in one request via append_to_response. Returns
+    {"details", "credits", "keywords", "external_ids", "providers"} in the same
+    normalized shapes as the per-endpoint getters above, or {} on failure.
+    """
+    if kind not in {"movie","tv"}: return {}
+    url, params, ttl_s = title_request(kind, tmdb_id, hydrate=True)
+    data = _get_json(url, params, ttl_s=ttl_s, project="title")
+    if not data:
+        return {}
+    out: Dict[str, Any] = {
+        "details": _norm_details(kind, data),
+        "credits": _norm_credits(data.get("credits") or {}),
+        "keywords": _norm_keywords(kind, data.get("keywords") or {}),
+        "external_ids": _norm_external_ids(data.get("external_ids") or {}),
+    }
+    age = _cache_age(url, params, "title")
+    if age is not None and age > _TTL_PROVIDERS:
+        # availability churns faster than credits; use the short-lived endpoint
+        out["providers"] = get_title_watch_providers(kind, tmdb_id, region=region)
+    else:
+        out["providers"] = _norm_providers(data.get("watch/providers") or {}, region)
+    return out
+
 # ---------- Multi-search (used by enrichment fallback) ----------
 def search_multi(query: str, *, page: int = 1, region: str = "US") -> List[Dict[str, Any]]:
     """
@@ -300,7 +723,8 @@ def search_multi(query: str, *, page: int = 1, region: str = "US") -> List[Dict[
     """
     if not (query or "").strip():
         return []
-    data = _get_json(f"{_TMDb_V3}/search/multi", {"query": query, **_page_params(page), "region": region}, ttl_s=2*3600)
+    data = _get_json(f"{_TMDb_V3}/search/multi", {"query": query, **_page_params(page), "region": region},
+                     ttl_s=2*3600, empty_is_negative=True, project="results")
     out: List[Dict[str, Any]] = []
     for r in data.get("results") or []:
         mt = (r.get("media_type") or "").lower()
@@ -4,7 +4,7 @@ from typing import Dict, Any, Optional, List
 from pathlib import Path
 import datetime as dt
 
-from .tmdb import _get_json, TMDB_BASE
+from .tmdb import _get_json, _TMDb_V3 as TMDB_BASE
 
 def _safe_year(datestr: str) -> Optional[int]:
     if not datestr:
@@ -33,7 +33,7 @@ def get_movie_details(tmdb_id: int, region: str) -> Dict[str, Any]:
         "append_to_response": "external_ids,watch/providers,release_dates,credits",
         "language": "en-US",
     }
-    d = _get_json("detail_movie", url, params, ttl_seconds=24*3600)
+    d = _get_json(url, params, ttl_s=24*3600)
     imdb_id = (d.get("external_ids") or {}).get("imdb_id")
     year = _safe_year(d.get("release_date") or "")
     genres = [g.get("name") for g in (d.get("genres") or []) if g.get("name")]
@@ -60,7 +60,7 @@ def get_tv_details(tmdb_id: int, region: str) -> Dict[str, Any]:
         "append_to_response": "external_ids,watch/providers,content_ratings,aggregate_credits",
         "language": "en-US",
     }
-    d = _get_json("detail_tv", url, params, ttl_seconds=24*3600)
+    d = _get_json(url, params, ttl_s=24*3600)
     imdb_id = (d.get("external_ids") or {}).get("imdb_id")
     year = _safe_year(d.get("first_air_date") or "")
     genres = [g.get("name") for g in (d.get("genres") or []) if g.get("name")]
@@ -0,0 +1,124 @@
+# engine/trace.py
+"""
+Optional span tracer, exported as Chrome trace-event JSON.
+
+  ENGINE_TRACE=data/out/latest/trace.json python -m engine.runner
+
+Open the file in chrome://tracing or https://ui.perfetto.dev. Spans cover the
+runner stages (engine.stages), each enrichment of a title, each TMDB cache
+lookup (memory tier, then store tier) and each outbound request made through
+engine.sessions, with host, status and bytes. Every thread gets its own
+track, so enrich workers show side by side. A path ending in .gz is written
+gzipped. With ENGINE_TRACE unset, span() is a no-op.
+
+  ENGINE_TRACE_MAX_EVENTS   cap on buffered spans (default 1,000,000);
+                            spans past the cap are counted, not kept
+"""
+from __future__ import annotations
+import atexit, gzip, json, os, threading, time
+from typing import Any, Dict, List, Optional
+
+def _int(n: str, d: int) -> int:
+    try: return int(os.getenv(n, "") or d)
+    except Exception: return d
+
+ENGINE_TRACE            = (os.getenv("ENGINE_TRACE", "") or "").strip()
+ENGINE_TRACE_MAX_EVENTS = _int("ENGINE_TRACE_MAX_EVENTS", 1_000_000)
+
+_lock = threading.Lock()
+_events: List[Dict[str, Any]] = []
+_threads: Dict[int, str] = {}
+_dropped = 0
+_t0 = time.perf_counter()
+_pid = os.getpid()
+
+def enabled() -> bool:
+    return bool(ENGINE_TRACE)
+
+def _us() -> float:
+    return round((time.perf_counter() - _t0) * 1e6, 1)
+
+def _emit(ev: Dict[str, Any]) -> None:
+    global _dropped
+    th = threading.current_thread()
+    tid = th.ident or 0
+    ev["pid"], ev["tid"] = _pid, tid
+    with _lock:
+        if tid not in _threads:
+            _threads[tid] = th.name
+        if len(_events) >= ENGINE_TRACE_MAX_EVENTS:
+            _dropped += 1
+            return
+        _events.append(ev)
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name: str, cat: str, args: Dict[str, Any]) -> None:
+        self.name, self.cat, self.args = name, cat, args
+        self.start = 0.0
+
+    def __enter__(self) -> Dict[str, Any]:
+        self.start = _us()
+        return self.args
+
+    def __exit__(self, et: Any, ev: Any, tb: Any) -> None:
+        end = _us()
+        if et is not None:
+            self.args["error"] = et.__name__
+        _emit({"name": self.name, "cat": self.cat, "ph": "X", "ts": self.start,
+               "dur": round(end - self.start, 1), "args": self.args})
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> Dict[str, Any]:
+        return {}
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+_NULL = _NullSpan()
+
+def span(name: str, cat: str = "engine", **args: Any) -> Any:
+    """
+    Context manager timing a block as one complete event. It yields the args
+    dict, so results known only at the end (status, bytes, hit/miss) can be
+    attached before it closes.
+    """
+    if not ENGINE_TRACE:
+        return _NULL
+    return _Span(name, cat, args)
+
+def instant(name: str, cat: str = "engine", **args: Any) -> None:
+    if ENGINE_TRACE:
+        _emit({"name": name, "cat": cat, "ph": "i", "s": "t", "ts": _us(), "args": args})
+
+def flush(path: Optional[str] = None) -> Optional[str]:
+    """Write everything recorded so far; returns the path written, if any."""
+    path = path or ENGINE_TRACE
+    if not path:
+        return None
+    with _lock:
+        events = list(_events)
+        threads = dict(_threads)
+        dropped = _dropped
+    meta = [{"name": "process_name", "ph": "M", "pid": _pid, "tid": 0, "args": {"name": "engine.runner"}}]
+    meta += [{"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid, "args": {"name": name}}
+             for tid, name in threads.items()]
+    doc = {"traceEvents": meta + events, "displayTimeUnit": "ms",
+           "otherData": {"events": len(events), "dropped": dropped}}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(tmp, "wt", encoding="utf-8") as fh:
+        json.dump(doc, fh, separators=(",", ":"))
+    os.replace(tmp, path)
+    return path
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        return {"enabled": enabled(), "path": ENGINE_TRACE or None, "events": len(_events), "dropped": _dropped}
+
+if ENGINE_TRACE:
+    atexit.register(flush)
@@ -4,9 +4,10 @@ from __future__ import annotations
 import hashlib
 import json
 import os
-import time
 from typing import Any, Optional
 
+from .. import cache_backend
+
 try:
     # lightweight, already in your requirements
     from bloom_filter2 import BloomFilter
@@ -16,41 +17,37 @@ except Exception:  # pragma: no cover
 class DiskCache:
     """
     Tiny JSON disk cache for API responses (URL+params key).
-    Files live under {root}/{prefix}/{sha}.json with mtime-based TTL.
+    Entries are stored through engine.cache_backend under {root}, grouped by
+    prefix, and expire on age (fetch time) against ttl_secs.
     """
     def __init__(self, root: str, ttl_secs: int):
         self.root = root
         self.ttl = ttl_secs
-        os.makedirs(root, exist_ok=True)
+        self.store = cache_backend.store_at(root)
 
-    def _key(self, prefix: str, url: str, params: dict | None) -> str:
+    def _key(self, url: str, params: dict | None) -> str:
         base = f"{url}|{json.dumps(params or {}, sort_keys=True)}".encode("utf-8")
-        return os.path.join(self.root, prefix, hashlib.sha256(base).hexdigest() + ".json")
+        return hashlib.sha256(base).hexdigest()
 
     def get(self, prefix: str, url: str, params: dict | None) -> Optional[Any]:
-        path = self._key(prefix, url, params)
-        if not os.path.exists(path):
+        key = self._key(url, params)
+        try:
+            entry = self.store.get(prefix, key)
+        except Exception:
+            return None
+        if entry is None:
             return None
-        age = time.time() - os.path.getmtime(path)
-        if self.ttl > 0 and age > self.ttl:
+        if self.ttl > 0 and entry.age() > self.ttl:
             try:
-                os.remove(path)
+                self.store.delete(prefix, key)
             except Exception:
                 pass
             return None
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return None
+        cache_backend.note_hit(prefix, entry.age())
+        return entry.data
 
     def set(self, prefix: str, url: str, params: dict | None, value: Any) -> None:
-        path = self._key(prefix, url, params)
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        tmp = path + ".tmp"
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(value, f, ensure_ascii=False)
-        os.replace(tmp, path)
+        self.store.put(prefix, self._key(url, params), value, ttl_s=self.ttl or None)
 
 
 class BloomSeen:
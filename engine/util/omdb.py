@@ -1,9 +1,9 @@
 # FILE: engine/util/omdb.py
 from __future__ import annotations
 from typing import Dict, Optional
-import requests
 
 from .cache import DiskCache
+from .. import sessions
 
 def _key(title: str, year: Optional[int], media_type: str) -> str:
     return f"omdb:{media_type}:{title.strip().lower()}:{year or ''}"
@@ -35,7 +35,7 @@ def fetch_omdb_enrich(
     # Try cache
     cached = cache.get("omdb_title", url, params)
     if cached is None:
-        r = requests.get(url, params=params, timeout=20)
+        r = sessions.get(url, params=params, timeout=20)
         if r.status_code != 200:
             return {}
         data = r.json()
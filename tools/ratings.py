@@ -1,10 +1,10 @@
 # tools/ratings.py
-import os, re, csv, json, time, pathlib, requests
+import os, re, csv, time
 from typing import List, Dict, Any, Optional
 
+from engine import cache_backend, sessions
+
 UA = {"User-Agent": "RecoEngine/2.13 (+github actions)"}
-OMDB_CACHE_DIR = pathlib.Path("data/cache/omdb")
-OMDB_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 # ---------------- IMDb ratings CSV loader ----------------
 
@@ -126,24 +126,27 @@ def _omdb_key() -> Optional[str]:
 def _omdb_cache_key(item: Dict[str, Any]) -> str:
     iid = (item.get("imdb_id") or "").strip().lower()
     if iid:
-        return f"byid_{iid}.json"
+        return f"byid_{iid}"
     title = (item.get("title") or "").strip().lower()
     year = str(item.get("year") or 0)
     itype = (item.get("type") or "").strip().lower()
     safe = re.sub(r"[^a-z0-9]+", "_", f"{title}_{year}_{itype}").strip("_")
-    return f"bytitle_{safe}.json" if safe else f"bytitle_{int(time.time()*1000)}.json"
+    return f"bytitle_{safe}" if safe else f"bytitle_{int(time.time()*1000)}"
 
-def _load_cache(p: pathlib.Path) -> Optional[Dict[str, Any]]:
-    if p.exists():
-        try:
-            return json.load(p.open("r"))
-        except Exception:
-            return None
-    return None
+def _load_cache(key: str) -> Optional[Dict[str, Any]]:
+    # same "omdb" namespace as engine.omdb; entries never expire here
+    try:
+        hit = cache_backend.store().get("omdb", key)
+    except Exception:
+        return None
+    if hit is None:
+        return None
+    cache_backend.note_hit("omdb", hit.age())
+    return hit.data
 
-def _save_cache(p: pathlib.Path, data: Dict[str, Any]) -> None:
+def _save_cache(key: str, data: Dict[str, Any]) -> None:
     try:
-        json.dump(data, p.open("w"))
+        cache_backend.store().put("omdb", key, data)
     except Exception:
         pass
 
@@ -171,7 +174,11 @@ def _omdb_fetch(item: Dict[str, Any]) -> Dict[str, Any]:
             params["type"] = "movie"
 
     url = "http://www.omdbapi.com/"
-    r = requests.get(url, params=params, headers=UA, timeout=30)
+    try:
+        r = sessions.get(url, params=params, headers=UA, timeout=30)
+    except sessions.OfflineError:
+        sessions.note_offline("omdb_ratings", stale=False)
+        return {"__error__": "offline"}
     if r.status_code != 200:
         return {"Response":"False","Error":f"HTTP {r.status_code}"}
     try:
@@ -232,17 +239,16 @@ def enrich_with_omdb(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Fills in imdb_id, imdb_rating, rt_pct, cert, langs/lang_names/lang_is_english,
     countries, and stores OMDb raw meta in item['omdb'].
-    Uses on-disk cache at data/cache/omdb to avoid re-fetching.
+    Uses the shared cache store ("omdb" namespace) to avoid re-fetching.
     """
     out: List[Dict[str, Any]] = []
     for it in items:
-        cache_name = _omdb_cache_key(it)
-        p = OMDB_CACHE_DIR / cache_name
-        data = _load_cache(p)
+        key = _omdb_cache_key(it)
+        data = _load_cache(key)
         if data is None:
-            data = _omdb_fetch(it)
-            _save_cache(p, data)
-            time.sleep(0.12)  # be nice to OMDb
+            data = _omdb_fetch(it)  # pacing is enforced by engine.ratelimit
+            if data.get("__error__") != "offline":
+                _save_cache(key, data)
         _merge_omdb_fields(it, data)
         out.append(it)
     return out
@@ -1,11 +1,10 @@
 # tools/tmdb_client.py
-import os, time, json, pathlib, requests
+import os
 from typing import Dict, List, Any, Tuple
 
-TMDB_API = "https://api.themoviedb.org/3"
+from engine import cache_backend, cache_keys, revalidate, sessions
+
 UA = {"User-Agent":"RecoEngine/2.13 (+github actions)"}
-CACHE_DIR = pathlib.Path("data/cache/tmdb")
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 def _key() -> str:
     k = os.environ.get("TMDB_API_KEY","").strip()
@@ -13,46 +12,45 @@ def _key() -> str:
         raise RuntimeError("TMDB_API_KEY is missing")
     return k
 
-def _cache_path(name: str) -> pathlib.Path:
-    return CACHE_DIR / name
-
 def _get(url: str, params: Dict[str, Any]) -> Dict[str, Any]:
     params = dict(params or {})
     params["api_key"] = _key()
-    r = requests.get(url, params=params, headers=UA, timeout=30)
-    if r.status_code == 429:
-        time.sleep(1.0)
-        r = requests.get(url, params=params, headers=UA, timeout=30)
+    r = sessions.get(url, params=params, headers=UA, timeout=30)
     if r.status_code != 200:
         return {"__error__": f"{r.status_code} {r.text[:200]}"}
     return r.json()
 
-def _cached_json(name: str, fetcher) -> Dict[str, Any]:
-    p = _cache_path(name)
-    if p.exists():
-        try:
-            return json.load(p.open("r"))
-        except Exception:
-            pass
-    data = fetcher()
+# per-endpoint freshness, the same as engine.tmdb uses for these endpoints
+_TTL_DISCOVER  = 8*3600
+_TTL_PROVIDERS = 2*24*3600
+
+def _cached_json(url: str, params: Dict[str, Any], *, ttl_s: int) -> Dict[str, Any]:
+    # shared TMDB cache namespace + canonical key, so engine.tmdb entries serve here too
+    key = cache_keys.canonical_key(url, params)
+    hit = None
     try:
-        json.dump(data, p.open("w"))
+        hit = cache_backend.store().get(cache_keys.TMDB_NS, key)
+        if hit is not None and hit.meta.get("proj"):
+            # a trimmed engine.tmdb projection, not the full response
+            hit = None
+        if hit is not None and hit.status == "ok" and hit.age() <= revalidate.effective_ttl(hit.meta, ttl_s):
+            cache_backend.note_hit(cache_keys.TMDB_NS, hit.age())
+            return hit.data
     except Exception:
         pass
+    try:
+        data = _get(url, params)
+    except sessions.OfflineError:
+        sessions.note_offline("tmdb_client", stale=hit is not None and hit.status == "ok")
+        return hit.data if hit is not None and hit.status == "ok" else {"__error__": "offline"}
+    if "__error__" not in data:
+        try:
+            cache_backend.store().put(cache_keys.TMDB_NS, key, data, ttl_s=ttl_s,
+                                      meta={"req": cache_keys.canonical_request(url, params)})
+        except Exception:
+            pass
     return data
 
-def _discover(kind: str, page: int, region: str, original_lang: str|None) -> Dict[str, Any]:
-    url = f"{TMDB_API}/discover/{'movie' if kind=='movie' else 'tv'}"
-    params = {
-        "page": page,
-        "sort_by": "popularity.desc",
-        "include_adult": "false",
-        "watch_region": region or "US"
-    }
-    if original_lang:
-        params["with_original_language"] = original_lang  # ISO-639-1, e.g., 'en'
-    return _get(url, params)
-
 def fetch_catalog(region: str, pages_movie: int, pages_tv: int, original_langs: List[str]) -> Tuple[List[Dict], Dict]:
     diag = {
         "movie_pages": pages_movie,
@@ -67,17 +65,16 @@ def fetch_catalog(region: str, pages_movie: int, pages_tv: int, original_langs:
     for kind, pages in (("movie", pages_movie), ("tv", pages_tv)):
         for lang in langs:
             for page in range(1, max(1, pages)+1):
-                cache_name = f"discover_{kind}_{lang or 'any'}_{region}_p{page}.json"
-                data = _cached_json(cache_name, lambda k=kind, p=page, l=lang: _discover(k, p, region, l))
+                where = f"discover_{kind}_{lang or 'any'}_{region}_p{page}"
+                data = _cached_json(*cache_keys.tmdb_discover_request(kind, page, region, lang), ttl_s=_TTL_DISCOVER)
                 if "__error__" in data:
-                    diag["errors"].append({ "where": cache_name, "error": data["__error__"] })
+                    diag["errors"].append({ "where": where, "error": data["__error__"] })
                     continue
                 results = data.get("results") or []
                 for r in results:
                     r["_kind"] = kind
                     items.append(r)
                 diag["counts"][kind] += len(results)
-                time.sleep(0.12)
 
     seen = set()
     deduped = []
@@ -90,8 +87,7 @@ def fetch_catalog(region: str, pages_movie: int, pages_tv: int, original_langs:
     return deduped, diag
 
 def fetch_providers(kind: str, tmdb_id: int, region: str) -> List[str]:
-    name = f"providers_{kind}_{tmdb_id}_{region}.json"
-    data = _cached_json(name, lambda: _get(f"{TMDB_API}/{kind}/{tmdb_id}/watch/providers", {}))
+    data = _cached_json(*cache_keys.tmdb_providers_request(kind, tmdb_id), ttl_s=_TTL_PROVIDERS)
     if "__error__" in data: 
         return []
     results = (data.get("results") or {}).get(region, {})